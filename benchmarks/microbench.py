@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+from tools.utils.utils import parse_bench_file, insert_key_gates, write_list_to_file
+from tools.utils.netlist import parse_netlist
+from tools.utils.simulate import compile_netlist, simulate, random_words
+from tools.utils.telemetry import git_commit
+from tools.utils.locking import GateBuilder
+import sarlock
+import antisat
+
+"""
+Micro-benchmarks for the hot paths of locking and simulation
+- parse, insert_key_gates, write_list_to_file, the shared lock-logic tree
+  builder and the SARLock/Anti-SAT logic, netlist compile and bit-parallel simulate
+- Every design in data/ at every key size of config/circuits.json
+- Reports min/median time and peak traced memory per case
+- Results are stored as benchmarks/results/<commit>.json; --baseline flags
+  cases whose median got slower than the threshold
+"""
+
+DATA_FOLDER = ROOT / "data"
+CONFIG_FILE = ROOT / "config" / "circuits.json"
+RESULTS_FOLDER = ROOT / "benchmarks" / "results"
+SIM_WORDS = 16
+# Ignore differences below this, they are timer noise
+NOISE_FLOOR = 0.0005
+
+
+def key_sizes():
+    """Design name -> key sizes, from the campaign config (same defaults as the campaign)."""
+    sizes = {}
+    if CONFIG_FILE.exists():
+        with open(CONFIG_FILE) as f:
+            for circuit in json.load(f)["circuits"]:
+                sizes[circuit["name"]] = circuit["key_sizes"]
+    for path in DATA_FOLDER.glob("*.bench"):
+        sizes.setdefault(path.stem, [16, 32] if path.stem.startswith("c") else [128, 256])
+    return sizes
+
+
+def measure(setup, func, repeat):
+    """Time func(*setup()) `repeat` times (setup excluded), then once more under tracemalloc."""
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    args = setup()
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"min": round(min(times), 6), "median": round(statistics.median(times), 6),
+            "repeat": repeat, "peak_kb": round(peak / 1024, 1)}
+
+
+def cases(designs, sizes, scratch):
+    """Yield (case name, setup, func); setup builds fresh inputs so mutating ops stay comparable."""
+    tree_sizes = sorted({k for d in designs for k in sizes[d.stem]})
+    for k in tree_sizes:
+        wires = [f"w{i}" for i in range(k)]
+        yield f"GateBuilder.tree|k={k}", lambda w=wires: ("AND", w), lambda *a: GateBuilder("bench").tree(*a)
+        yield f"sarlock.sarlock_logic|k={k}", lambda w=wires: (w, w, "01" * (k // 2), ["out"]), sarlock.sarlock_logic
+        yield f"antisat.antisat_logic|k={k}", lambda w=wires: (w, w, None, ["out"]), antisat.antisat_logic
+
+    for path in designs:
+        name = path.stem
+        inputs, outputs, gates, _ = parse_bench_file(path)
+        yield f"parse_bench_file|{name}", lambda p=path: (p,), parse_bench_file
+        yield f"parse_netlist|{name}", lambda p=path: (p,), parse_netlist
+
+        for k in sizes[name]:
+            rng = random.Random(k)
+            key = [rng.randint(0, 1) for _ in range(k)]
+
+            def insert_setup(g=gates, k=k, key=key):
+                random.seed(k)
+                return key, list(g), 0
+
+            yield f"insert_key_gates|{name}|k={k}", insert_setup, insert_key_gates
+
+            locked = insert_key_gates(key, list(gates), 0)
+            lines = ([f"INPUT({i})" for i in inputs] + [f"INPUT(keyinput{i})" for i in range(k)]
+                     + [f"OUTPUT({o})" for o in outputs] + locked)
+            out_file = os.path.join(scratch, f"{name}_K{k}.bench")
+            yield f"write_list_to_file|{name}|k={k}", lambda l=lines, o=out_file, key=key: (l, o, key), write_list_to_file
+
+        netlist = parse_netlist(path)
+        yield f"compile_netlist|{name}", lambda n=netlist: (n,), compile_netlist
+        compiled = compile_netlist(netlist)
+        words = random_words(len(compiled.inputs), SIM_WORDS, np.random.default_rng(0))
+        yield f"simulate|{name}|words={SIM_WORDS}", lambda c=compiled, w=words: (c, w), simulate
+
+
+def compare(results, baseline, threshold):
+    """Cases whose median slowed down by more than `threshold` (relative) versus the baseline."""
+    regressions = []
+    for case, row in results.items():
+        base = baseline.get(case)
+        if base is None:
+            continue
+        delta = row["median"] - base["median"]
+        if delta > NOISE_FLOOR and row["median"] > base["median"] * (1 + threshold):
+            regressions.append((case, base["median"], row["median"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--designs", nargs="*", default=None,
+                        help="Design names from data/ (default: all)")
+    parser.add_argument("--only", default=None, help="Run only cases whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--baseline", type=Path, default=None, help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown of the median that counts as a regression")
+    args = parser.parse_args()
+
+    designs = sorted(DATA_FOLDER.glob("*.bench"))
+    if args.designs:
+        designs = [d for d in designs if d.stem in args.designs]
+    sizes = key_sizes()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        for case, setup, func in cases(designs, sizes, scratch):
+            if args.only and args.only not in case:
+                continue
+            results[case] = measure(setup, func, args.repeat)
+            row = results[case]
+            print(f"{case:45s} median={row['median'] * 1000:9.3f} ms  min={row['min'] * 1000:9.3f} ms  "
+                  f"peak={row['peak_kb']:10.1f} KB")
+
+    commit = git_commit()
+    output = args.output or RESULTS_FOLDER / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"commit": commit, "timestamp": time.time(), "python": sys.version.split()[0],
+                   "results": results}, f, indent=2)
+    print(f"Results saved to: {output}")
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.threshold)
+        for case, before, after in regressions:
+            print(f"REGRESSION {case}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms")
+        print(f"{len(regressions)} regressions against {baseline['commit']}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
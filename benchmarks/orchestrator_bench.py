@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from tools.utils.telemetry import git_commit
+
+"""
+End-to-end throughput benchmark of the campaign orchestrator
+- Runs scripts/autoparallel_sat_attack.py in a scratch working directory with
+  the deterministic sld/lcmp stand-ins from benchmarks/stubs (latency and
+  output set through STUB_* environment variables)
+- Reads the campaign's per-task event log and reports tasks/second, queue wait
+  (scheduling latency) per stage, and per-stage overhead: stage wall time
+  minus the time spent doing the work (locking, sld, lcmp)
+Extra arguments after `--` are passed to the campaign unchanged.
+"""
+
+STUBS_FOLDER = ROOT / "benchmarks" / "stubs"
+RESULTS_FOLDER = ROOT / "benchmarks" / "results"
+CAMPAIGN = ROOT / "scripts" / "autoparallel_sat_attack.py"
+# Event fields holding the time spent on actual work, per stage
+WORK_TIME = {
+    "lock": ("lock_time", "extract_time"),
+    "attack": ("sld_time", "sensitization_time"),
+    "verify": ("lcmp_time",),
+}
+
+
+def percentiles(values):
+    if not values:
+        return None
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return {"mean": round(statistics.mean(values), 6), "p50": pick(0.50), "p95": pick(0.95),
+            "max": values[-1]}
+
+
+def summarize(events, wall_time):
+    ok = [e for e in events if e["status"] == "ok"]
+    report = {"tasks": len(events), "failed": len(events) - len(ok), "wall_time": round(wall_time, 3),
+              "tasks_per_second": round(len(ok) / wall_time, 3) if wall_time else None, "stages": {}}
+    for stage in ("lock", "attack", "verify"):
+        rows = [e["stages"][stage] for e in ok if stage in e["stages"]]
+        overhead = [round(r["wall_time"] - sum(r.get(k, 0) for k in WORK_TIME[stage]), 6) for r in rows]
+        report["stages"][stage] = {
+            "queue_wait": percentiles([r["queue_wait"] for r in rows]),
+            "wall_time": percentiles([r["wall_time"] for r in rows]),
+            "overhead": percentiles(overhead),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--design", default="c432", help="Design from data/ to lock for every task")
+    parser.add_argument("--key-size", type=int, default=16)
+    parser.add_argument("--sld-latency", type=float, default=0.0, help="Seconds each stub sld run takes")
+    parser.add_argument("--sld-iterations", type=int, default=3, help="Progress lines printed by stub sld")
+    parser.add_argument("--lcmp-latency", type=float, default=0.0, help="Seconds each stub lcmp run takes")
+    parser.add_argument("--lcmp-result", default="equivalent", help="Output of stub lcmp")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Report file (default: benchmarks/results/orchestrator_<commit>.json)")
+    parser.add_argument("campaign_args", nargs=argparse.REMAINDER,
+                        help="Arguments for the campaign, after --")
+    args = parser.parse_args()
+    campaign_args = [a for a in args.campaign_args if a != "--"]
+
+    env = dict(os.environ, STUB_SLD_LATENCY=str(args.sld_latency), STUB_SLD_ITERATIONS=str(args.sld_iterations),
+               STUB_LCMP_LATENCY=str(args.lcmp_latency), STUB_LCMP_RESULT=args.lcmp_result)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        (workdir / "config").mkdir()
+        os.symlink(ROOT / "data", workdir / "data")
+        config = workdir / "config" / "circuits.json"
+        with open(config, "w") as f:
+            json.dump({"circuits": [{"name": args.design, "file": f"{args.design}.bench",
+                                     "key_sizes": [args.key_size]}],
+                       "iterations": args.tasks}, f)
+        events_file = workdir / "results" / "campaign_events.jsonl"
+
+        start = time.time()
+        subprocess.run([sys.executable, str(CAMPAIGN), "--config", str(config), "--tools-dir", str(STUBS_FOLDER),
+                        "--events", str(events_file), "--no-report", *campaign_args],
+                       cwd=workdir, env=env, check=True)
+        wall_time = time.time() - start
+
+        with open(events_file) as f:
+            events = [json.loads(line) for line in f]
+
+    report = summarize(events, wall_time)
+    report.update(commit=git_commit(), design=args.design, key_size=args.key_size,
+                  sld_latency=args.sld_latency, lcmp_latency=args.lcmp_latency, campaign_args=campaign_args)
+
+    print(f"{report['tasks']} tasks ({report['failed']} failed) in {report['wall_time']}s: "
+          f"{report['tasks_per_second']} tasks/s")
+    for stage, row in report["stages"].items():
+        if row["wall_time"] is None:
+            continue
+        print(f"{stage:7s} queue wait p50={row['queue_wait']['p50']:.4f}s p95={row['queue_wait']['p95']:.4f}s  "
+              f"overhead p50={row['overhead']['p50']:.4f}s p95={row['overhead']['p95']:.4f}s")
+
+    output = args.output or RESULTS_FOLDER / f"orchestrator_{report['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,44 @@
 import os
 import json
-import subprocess
-import time
 import csv
 import logging
 import shlex
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import argparse
+import asyncio
+import sys
+import time
+import random
+import resource
+from pathlib import Path
+from contextlib import nullcontext
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 
-# Setup Logging (set to WARNING to reduce logging overhead)
-os.makedirs("results", exist_ok=True)
-log_file = os.path.join("results", "sat_attack_parallel.log")
-logging.basicConfig(filename=log_file, level=logging.WARNING, 
-                    format="%(asctime)s - %(levelname)s - %(message)s")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+import RLL
+from tools.utils.runner import run_stage, SldProgress
+from tools.utils.pipeline import Stage, run_pipeline
+from tools.utils.scratch import Scratch
+from tools.utils.telemetry import StageTimer, EventLog, git_commit
+from tools.utils.results_store import SCHEME_LABELS, ResultsStore, verdict
+from tools.utils.netlist import netlist_stats
+from tools.utils.profiling import Profiler, merge, dump, current
+from tools.utils.adaptive import AdaptiveScheduler
+from tools.utils.planner import load_spec, expand
+from tools.utils.shared_netlist import SharedDesigns
+from tools.utils.golden_cache import GoldenCache, key_error_rate
+from extract_cone import extract
+import sarlock
+import antisat
+import caclock
+import sarlock_trojan
+import antisat_trojan
+import cac_trojan
+from insert_trojan import insert_trojan
+from sensitization_attack import attack as sensitization_attack
+from gen_circuits_json import generate as generate_config
 
 # Define Folders
 CONFIG_FILE = os.path.join("config", "circuits.json")
@@ -21,121 +47,457 @@ LOCKED_FOLDER = "locked_circuits"
 RESULTS_FOLDER = "results"
 TOOLS_FOLDER = "tools"
 
-os.makedirs(LOCKED_FOLDER, exist_ok=True)
-os.makedirs(RESULTS_FOLDER, exist_ok=True)
-
 results_file = os.path.join(RESULTS_FOLDER, "sat_attack_parallel_results.csv")
+log_file = os.path.join(RESULTS_FOLDER, "sat_attack_parallel.log")
+
+def setup():
+    """Output folders, logging and the CSV header; done when a campaign starts, not on import."""
+    os.makedirs(LOCKED_FOLDER, exist_ok=True)
+    os.makedirs(RESULTS_FOLDER, exist_ok=True)
+    # Set to WARNING to reduce logging overhead
+    logging.basicConfig(filename=log_file, level=logging.WARNING,
+                        format="%(asctime)s - %(levelname)s - %(message)s")
+    ensure_results_header(RESULTS_HEADER)
+
+def load_config(config_file=CONFIG_FILE):
+    # Auto-update config if not present
+    if not os.path.exists(config_file):
+        generate_config(DATA_FOLDER, config_file)
+        logging.info("Generated config file.")
+
+    # Load config
+    with open(config_file, "r") as f:
+        return json.load(f)
 
-# Auto-update config if not present
-if not os.path.exists(CONFIG_FILE):
-    circuits = []
-    for filename in os.listdir(DATA_FOLDER):
-        if filename.endswith(".bench"):
-            name = os.path.splitext(filename)[0]
-            key_sizes = [16, 32] if name.startswith("c") else [128, 256]
-            circuits.append({"name": name, "file": filename, "key_sizes": key_sizes})
-    with open(CONFIG_FILE, "w") as f:
-        json.dump({"circuits": circuits, "iterations": 10}, f, indent=4)
-    logging.info("Generated config file.")
-
-# Load config
-with open(CONFIG_FILE, "r") as f:
-    config = json.load(f)
-
-circuits = config["circuits"]
-iterations = config["iterations"]
-
-# Create CSV with header if it does not exist
-if not os.path.exists(results_file):
-    with open(results_file, "w", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow(["Circuit", "Locked File", "Key Size", "SAT Attack Runtime (s)", "Iterations", "Key Correct"])
-
-def run_command(command, use_shell=False):
+RESULTS_HEADER = ["Circuit", "Locked File", "Key Size", "SAT Attack Runtime (s)", "Iterations", "Key Correct"]
+# Results are committed to the store in batches of this many tasks
+STORE_BATCH = 100
+# Random 64-pattern words a recovered key is screened on before lcmp
+SCREEN_WORDS = 16
+SENSITIZATION_HEADER = ["Sensitization Runtime (s)", "Sensitization Key Correct"]
+
+def ensure_results_header(header):
+    """Create the CSV, or widen an older header that is a prefix of `header`."""
+    if not os.path.exists(results_file):
+        with open(results_file, "w", newline="") as file:
+            csv.writer(file).writerow(header)
+        return
+    with open(results_file, "r", newline="") as file:
+        lines = file.readlines()
+    current = next(csv.reader(lines[:1]), [])
+    if len(current) < len(header) and header[:len(current)] == current:
+        with open(results_file, "w", newline="") as file:
+            csv.writer(file).writerow(header)
+            file.writelines(lines[1:])
+
+def append_results(rows):
+    """Write all result rows to the CSV at once."""
+    with open(results_file, "a", newline="") as file:
+        csv.writer(file).writerows(rows)
+
+async def run_command(command, on_line=None, timeout=None):
     """
-    Run an external command and return (output, runtime).
-    If use_shell is False, command is split using shlex.split.
+    Run an external command on the event loop and return (output, runtime, usage).
+    The command is split using shlex.split; stdout lines are passed to
+    `on_line` as they arrive. `usage` is the child's rusage plus its return
+    code (None on timeout).
     """
-    start_time = time.time()
-    try:
-        if use_shell:
-            result = subprocess.run(command, shell=True, capture_output=True, text=True, check=True)
-        else:
-            args = shlex.split(command)
-            result = subprocess.run(args, capture_output=True, text=True, check=True)
-        output = result.stdout
-    except subprocess.CalledProcessError as e:
-        output = e.stdout + e.stderr
-        logging.error(f"Command failed: {command}\nError: {output}")
-    return output, round(time.time() - start_time, 3)
+    output, runtime, returncode, usage = await run_stage(shlex.split(command), on_line=on_line, timeout=timeout)
+    return output, runtime, dict(usage, returncode=returncode)
 
 def generate_key(key_size):
     """Generate a key string like '1010...' based on key_size."""
     return "10" * (key_size // 2) + ("1" if key_size % 2 else "")
 
-def process_lock_and_attack(name, bench_file, key_size, iteration):
+def rll_lock(bench_file, key_size, locked_file):
     key = generate_key(key_size)
-    locked_file = os.path.join(LOCKED_FOLDER, f"{name}_RLL_K{key_size}_{iteration}.bench")
-
-    # Generate locked file using RLL.py
-    rll_command = f"python3 {TOOLS_FOLDER}/RLL.py --bench_path {bench_file} --key {key} --save_path {locked_file} --iter 1"
-    run_command(rll_command, use_shell=False)
-
-    # Run SAT attack
-    sat_command = f"{TOOLS_FOLDER}/sld {locked_file} {bench_file}"
-    sat_output, sat_time = run_command(sat_command, use_shell=False)
-
-    recovered_key = None
-    iterations_found = None
-    for line in sat_output.splitlines():
-        if line.startswith("key="):
-            recovered_key = line.replace("key=", "").strip()
-        elif line.startswith("iteration="):
+    RLL.run(bench_file, [int(k) for k in key], locked_file)
+    return key
+
+# Locking scheme -> (file name label, lock(bench_file, key_size, locked_file) -> key)
+LOCKERS = {
+    "rll": rll_lock,
+    "sarlock": sarlock.lock,
+    "antisat": antisat.lock,
+    "cac": caclock.lock,
+    "troll-sarlock": sarlock_trojan.lock,
+    "troll-antisat": antisat_trojan.lock,
+    "troll-cac": cac_trojan.lock,
+}
+# scheme -> (file name label, lock function); labels are shared with the store and report
+SCHEMES = {scheme: (SCHEME_LABELS[scheme], lock) for scheme, lock in LOCKERS.items()}
+
+def lock_circuit(scheme, bench_file, key_size, locked_file, cone_dir=None, profile=False, seed=None,
+                 original_stats=None):
+    """
+    Python-side work for one task; runs in the locking process pool.
+    Returns (key, attack_locked, attack_original, telemetry).
+    `seed` makes the scheme's random choices reproducible; `original_stats`
+    are the design's sizes when the planner already has them.
+    """
+    if seed is not None:
+        random.seed(seed)
+    profiler = Profiler() if profile else None
+    with profiler or nullcontext():
+        start = time.time()
+        key = SCHEMES[scheme][1](bench_file, key_size, locked_file)
+        telemetry = {"lock_time": round(time.time() - start, 3),
+                     "sizes": {"original": original_stats or netlist_stats(bench_file),
+                               "locked": netlist_stats(locked_file)}}
+        attack_locked, attack_original = locked_file, bench_file
+        # Attack and verify only the key-dependent cone; the other outputs are
+        # proven structurally identical to the original during extraction
+        if cone_dir is not None:
+            start = time.time()
+            with current().phase("extract"):
+                attack_locked, attack_original, _ = extract(locked_file, bench_file, cone_dir)
+            telemetry["extract_time"] = round(time.time() - start, 3)
+            telemetry["sizes"]["locked_cone"] = netlist_stats(attack_locked)
+    telemetry["worker_max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if profiler is not None:
+        telemetry["profile"] = profiler.snapshot()
+    return key, attack_locked, attack_original, telemetry
+
+class Campaign:
+    """
+    Lock -> attack -> verify, each stage with its own worker pool joined by
+    bounded queues, so locking the next circuit overlaps long SAT attacks
+    and cheap lcmp checks never wait behind them.
+    """
+
+    def __init__(self, args, lock_pool, scratch, designs=None):
+        self.args = args
+        self.lock_pool = lock_pool
+        self.scratch = scratch
+        # Originals published once into shared memory for the workers' oracles
+        self.designs = designs
+        self.published = {}
+        self.progress = {}
+        self.profiles = []
+
+    async def lock(self, task):
+        task.setdefault("scheme", self.args.scheme)
+        label = SCHEMES[task["scheme"]][0]
+        task["locked_file"] = self.scratch.path(f"{task['name']}_{label}_K{task['key_size']}_{task['iteration']}.bench")
+        cone_dir = os.path.join(self.scratch.root, "cones") if self.args.extract_cone else None
+        loop = asyncio.get_running_loop()
+        timing = task["timer"].start("lock")
+        task["key"], task["attack_locked"], task["attack_original"], telemetry = await loop.run_in_executor(
+            self.lock_pool, lock_circuit, task["scheme"], task["bench_file"], task["key_size"],
+            task["locked_file"], cone_dir, self.args.profile is not None, task.get("seed"), task.get("original_stats"))
+        task["sizes"] = telemetry.pop("sizes")
+        if "profile" in telemetry:
+            self.profiles.append(telemetry.pop("profile"))
+        timing.update(telemetry)
+        task["timer"].stop("lock")
+        return task
+
+    async def attack(self, task):
+        locked_file = task["locked_file"]
+        # Run SAT attack, parsing sld's output as it streams in
+        sat_command = f"{self.args.tools_dir}/sld {task['attack_locked']} {task['attack_original']}"
+        solver = SldProgress()
+
+        def on_line(line):
+            solver.feed(line)
+            if solver.iterations is not None:
+                self.progress[locked_file] = solver.iterations
+
+        timing = task["timer"].start("attack")
+        try:
+            _, task["sat_time"], usage = await run_command(sat_command, on_line=on_line, timeout=self.args.timeout)
+        finally:
+            self.progress.pop(locked_file, None)
+        task["recovered_key"], task["iterations"] = solver.key, solver.iterations
+        timing.update(usage, sld_time=task["sat_time"], iterations=solver.iterations)
+
+        # Second attack column: in-process key sensitization against the same locked file
+        if "sensitization" in task.get("engines", ["sensitization"] if self.args.sensitization else []):
+            loop = asyncio.get_running_loop()
+            shared = await self.shared_original(task["bench_file"]) if self.designs is not None else None
+            task["sensitization"] = await loop.run_in_executor(
+                self.lock_pool, partial(sensitization_attack, locked_file, task["bench_file"], shared=shared,
+                                        golden_cache=self.args.golden_cache))
+            timing["sensitization_time"] = task["sensitization"]["runtime"]
+        task["timer"].stop("attack")
+        return task
+
+    async def shared_original(self, bench_file):
+        """Handle of the published original; parsing and compiling it runs off the event loop, once per design."""
+        if bench_file not in self.published:
+            loop = asyncio.get_running_loop()
+            self.published[bench_file] = loop.run_in_executor(None, self.designs.publish, bench_file)
+        return await self.published[bench_file]
+
+    async def verify(self, task):
+        key_correct = "N/A"
+        timing = task["timer"].start("verify")
+        screen = None
+        if task["recovered_key"] and self.args.golden_cache is not None:
+            # A key that already differs on the cached golden patterns is wrong; lcmp only proves the rest
+            loop = asyncio.get_running_loop()
             try:
-                iterations_found = int(line.split(";")[0].split("=")[1].strip())
-            except Exception:
-                iterations_found = None
+                screen = await loop.run_in_executor(
+                    self.lock_pool, key_error_rate, task["attack_locked"], task["attack_original"],
+                    task["recovered_key"], SCREEN_WORDS, 0, GoldenCache(self.args.golden_cache))
+                timing["screen_error_rate"] = screen
+            except (ValueError, KeyError, OSError) as e:
+                logging.warning(f"Golden screen failed for {task['attack_locked']}: {e}")
+        if screen:
+            key_correct = "NO"
+        elif task["recovered_key"]:
+            lcmp_command = f"{self.args.tools_dir}/lcmp {task['attack_original']} {task['attack_locked']} key={task['recovered_key']}"
+            lcmp_output, lcmp_time, usage = await run_command(lcmp_command)
+            key_correct = "YES" if "equivalent" in lcmp_output else "NO"
+            timing.update(usage, lcmp_time=lcmp_time)
+
+        locked_file = task["locked_file"]
+        if self.args.keep_locked:
+            locked_file = self.scratch.keep(locked_file)
+        elif self.scratch.in_ram:
+            # Scratch copy is deleted below; record just the name
+            locked_file = os.path.basename(locked_file)
+        self.discard(task)
+
+        row = [task["name"] + ".bench", locked_file, task["key_size"], task["sat_time"],
+               task["iterations"], key_correct]
+        if self.args.sensitization:
+            sensitization = task.get("sensitization") or {"runtime": None, "key_correct": "N/A"}
+            row += [sensitization["runtime"], sensitization["key_correct"]]
+        task["row"] = row
+        task["timer"].stop("verify")
+        return task
+
+    def record(self, task):
+        """Typed row for the results store."""
+        sensitization = task.get("sensitization") or {}
+        return {
+            "circuit": task["name"], "scheme": task.get("scheme", self.args.scheme), "key_size": task["key_size"],
+            "iteration": task["iteration"], "seed": task.get("seed"), "locked_file": task["row"][1],
+            "sat_time": task["sat_time"],
+            "iterations": task["iterations"], "key_correct": verdict(task["row"][5]),
+            "sensitization_time": sensitization.get("runtime"),
+            "sensitization_correct": verdict(sensitization.get("key_correct")),
+        }
+
+    def discard(self, task):
+        """Free a task's scratch files once it is verified (or has failed)."""
+        self.scratch.release(task.get("locked_file"), task.get("attack_locked"), task.get("attack_original"))
+
+    def event(self, task, error=None):
+        """Telemetry record for one finished (or failed) task."""
+        return {
+            "circuit": task["name"], "scheme": task.get("scheme", self.args.scheme), "key_size": task["key_size"],
+            "iteration": task["iteration"], "locked_file": task["row"][1] if "row" in task else task.get("locked_file"),
+            "status": "error" if error else "ok", "error": error, "key_correct": task["row"][5] if "row" in task else None,
+            "stages": task["timer"].stages, "sizes": task.get("sizes"),
+        }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--extract-cone", action="store_true",
+                        help="Attack and verify only the fan-in cone of key-dependent outputs")
+    parser.add_argument("--sensitization", action="store_true",
+                        help="Also run the in-process key-sensitization attack on every locked file")
+    parser.add_argument("--lock-workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes for Python-side locking (and cone extraction/sensitization)")
+    parser.add_argument("--attack-workers", type=int, default=8,
+                        help="Concurrent sld attacks; they mostly wait on external processes")
+    parser.add_argument("--verify-workers", type=int, default=4, help="Concurrent lcmp checks")
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="Capacity of the queues between stages (default: 2x the next stage's workers)")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-attack timeout in seconds")
+    parser.add_argument("--scheme", choices=sorted(SCHEMES), default="rll", help="Locking scheme to attack")
+    parser.add_argument("--scratch", choices=["disk", "ram"], default="disk",
+                        help="Where locked netlists are handed to sld/lcmp; 'ram' uses tmpfs and deletes them after verify")
+    parser.add_argument("--keep-locked", action="store_true",
+                        help="With --scratch ram, still copy every locked netlist to locked_circuits/")
+    parser.add_argument("--events", default=os.path.join(RESULTS_FOLDER, "campaign_events.jsonl"),
+                        help="JSONL log of per-task stage timings, child CPU time/peak RSS and netlist sizes")
+    parser.add_argument("--profile", default=None, metavar="PATH",
+                        help="Profile locking in every worker and write the merged JSON report to PATH")
+    parser.add_argument("--config", default=CONFIG_FILE, help="Campaign config (circuits, key sizes, iterations)")
+    parser.add_argument("--tools-dir", default=TOOLS_FOLDER, help="Folder holding the sld and lcmp binaries")
+    parser.add_argument("--no-report", action="store_true", help="Skip the PDF report at the end")
+    parser.add_argument("--golden-cache", default=os.path.join(RESULTS_FOLDER, "golden_cache"),
+                        help="Cached golden responses that recovered keys are screened against before lcmp, "
+                             "and that the sensitization attack checks its key with ('none' to disable)")
+    parser.add_argument("--store", default=os.path.join(RESULTS_FOLDER, "results.db"),
+                        help="SQLite results store (query it with scripts/results_query.py)")
+    parser.add_argument("--run-label", default=None,
+                        help="Run name in the store (default: git commit); rerunning a label replaces its rows")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Run each circuit/key size until its attack time and iteration count are measured "
+                             "precisely enough, instead of a fixed number of iterations")
+    parser.add_argument("--min-iterations", type=int, default=3, help="With --adaptive, runs every cell gets")
+    parser.add_argument("--max-iterations", type=int, default=30, help="With --adaptive, most runs one cell gets")
+    parser.add_argument("--ci-width", type=float, default=0.1,
+                        help="With --adaptive, target 95%% CI half-width relative to the mean")
+    parser.add_argument("--budget", type=int, default=None,
+                        help="With --adaptive, total tasks for the campaign (default: what the config's "
+                             "fixed iteration count would run)")
+    parser.add_argument("--spec", default=None, metavar="PATH",
+                        help="Campaign spec (designs, schemes, key sizes, seeds, engines, Trojans, budget) "
+                             "to plan and run instead of --config")
+    parser.add_argument("--plan-only", action="store_true", help="With --spec, print the plan and its cost and stop")
+    parser.add_argument("--force", action="store_true",
+                        help="With --spec, also rerun tasks that already have results in the store")
+    args = parser.parse_args(argv)
+    if args.spec and args.adaptive:
+        parser.error("--adaptive cannot be combined with --spec")
+    if args.plan_only and not args.spec:
+        parser.error("--plan-only needs --spec")
+    if args.golden_cache == "none":
+        args.golden_cache = None
+    return args
+
+def build_plan(args):
+    """Expand --spec, drop work that is already done and print what is left and its cost."""
+    spec = load_spec(args.spec, SCHEMES)
+    if args.sensitization and "sensitization" not in spec["attacks"]:
+        # --sensitization adds the engine to every planned variant, as it does for --config runs
+        spec["attacks"].append("sensitization")
+    plan = expand(spec)
+    budget = spec.get("budget", {})
+    with ResultsStore(args.store) as store:
+        if not args.force:
+            plan.skip_done(store.completed())
+        history = {(r["circuit"], r["scheme"], r["key_size"]): r["mean"] for r in store.summary()}
+    if not args.force:
+        plan.skip_trojans(LOCKED_FOLDER)
+    if budget.get("max_tasks") is not None:
+        plan.limit(budget["max_tasks"])
+    if args.timeout is None:
+        args.timeout = budget.get("timeout")
+    if "sensitization" in spec["attacks"]:
+        args.sensitization = True
 
-    key_correct = "N/A"
-    if recovered_key:
-        lcmp_command = f"{TOOLS_FOLDER}/lcmp {bench_file} {locked_file} key={recovered_key}"
-        lcmp_output, _ = run_command(lcmp_command, use_shell=False)
-        key_correct = "YES" if "equivalent" in lcmp_output else "NO"
+    cost = plan.estimate(history, args.timeout, args.attack_workers)
+    print(f"Plan: {cost['designs']} designs, {cost['locks']} locked variants, {cost['attacks']} attacks, "
+          f"{cost['trojans']} Trojan insertions ({cost['skipped']} already done)")
+    print(f"Estimated attack time: {cost['attack_seconds']}s, ~{cost['wall_seconds']}s wall with "
+          f"{args.attack_workers} attack workers"
+          + (f"; {cost['no_history']} attacks have no history" if cost["no_history"] else ""))
+    return plan
 
-    return [name + ".bench", locked_file, key_size, sat_time, iterations_found, key_correct]
+def config_source(args):
+    """Tasks from --config: (source, total, scheduler), adaptive or a fixed count per cell."""
+    config = load_config(args.config)
+    circuits, iterations = config["circuits"], config["iterations"]
+    templates = [
+        {"name": circuit["name"], "bench_file": os.path.join(DATA_FOLDER, circuit["file"]), "key_size": key_size}
+        for circuit in circuits
+        for key_size in circuit["key_sizes"]
+    ]
+    if args.adaptive:
+        budget = args.budget if args.budget is not None else iterations * len(templates)
+        scheduler = AdaptiveScheduler(templates, args.min_iterations, args.max_iterations, args.ci_width, budget)
+        return scheduler, budget, scheduler
+    source = (dict(template, iteration=i) for template in templates for i in range(iterations))
+    return source, iterations * len(templates), None
 
-def main():
+async def run_tasks(args, plan=None):
     results = []
-    total_tasks = sum(len(circuit["key_sizes"]) * iterations for circuit in circuits)
-    # Increase max_workers if the tasks are mostly waiting on external processes
-    max_workers = 8
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = []
-        for circuit in circuits:
-            bench_file = os.path.join(DATA_FOLDER, circuit["file"])
-            name = circuit["name"]
-            for key_size in circuit["key_sizes"]:
-                for i in range(iterations):
-                    futures.append(executor.submit(process_lock_and_attack, name, bench_file, key_size, i))
-
-        # Wrap the as_completed iterator with tqdm to show progress
-        for future in tqdm(as_completed(futures), total=total_tasks, desc="Processing tasks"):
-            try:
-                result_row = future.result()
-                results.append(result_row)
-            except Exception as e:
-                logging.error(f"Task failed: {e}")
+    if plan is not None:
+        source, scheduler = plan.tasks(), None
+        total = len(source)
+    else:
+        source, total, scheduler = config_source(args)
 
-    # Write all results to CSV at once
-    with open(results_file, "a", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerows(results)
+    async def feed():
+        # Queue wait of the lock stage counts from when a task is handed to the pipeline
+        if scheduler is None:
+            for task in source:
+                task["timer"] = StageTimer()
+                yield task
+        else:
+            async for task in source:
+                task["timer"] = StageTimer()
+                yield task
+
+    with Scratch(args.scratch, LOCKED_FOLDER) as scratch, EventLog(args.events) as events, \
+            ResultsStore(args.store) as store, SharedDesigns() as designs, \
+            ProcessPoolExecutor(max_workers=args.lock_workers) as lock_pool, \
+            tqdm(total=total, desc="Processing tasks") as bar:
+        campaign = Campaign(args, lock_pool, scratch, designs)
+        run_id = store.run(args.run_label or git_commit(), args=vars(args))
+        pending = []
+        stages = [
+            Stage("lock", campaign.lock, args.lock_workers, args.queue_size),
+            Stage("attack", campaign.attack, args.attack_workers, args.queue_size),
+            Stage("verify", campaign.verify, args.verify_workers, args.queue_size),
+        ]
+
+        # Progress bar also shows the live DIP count of the longest-running attack
+        def on_done(task):
+            results.append(task["row"])
+            events.write(campaign.event(task))
+            pending.append(campaign.record(task))
+            if scheduler is not None:
+                scheduler.record(task)
+            if len(pending) >= STORE_BATCH:
+                store.add(run_id, pending)
+                pending.clear()
+            bar.update(1)
+            if campaign.progress:
+                bar.set_postfix(max_dip=max(campaign.progress.values()))
+
+        def on_error(stage, task, e):
+            logging.error(f"Task {task['name']} K={task['key_size']} iter={task['iteration']} failed in {stage.name}: {e}")
+            campaign.discard(task)
+            events.write(campaign.event(task, error=f"{stage.name}: {e}"))
+            if scheduler is not None:
+                scheduler.record(task, failed=True)
+            bar.update(1)
+
+        # Trojan insertions share the locking pool with the pipeline
+        loop = asyncio.get_running_loop()
+        trojans = asyncio.gather(*(
+            loop.run_in_executor(lock_pool, insert_trojan, Path(node.params["bench_file"]),
+                                 node.params["trigger_size"], node.params["count"], Path(LOCKED_FOLDER))
+            for node in (plan.of_kind("trojan") if plan is not None else [])), return_exceptions=True)
+
+        await run_pipeline(feed(), stages, on_done, on_error)
+        store.add(run_id, pending)
+        # Written before the pools and shared memory are torn down, so a failing teardown cannot lose them
+        append_results(results)
+        for error in await trojans:
+            if isinstance(error, Exception):
+                logging.error(f"Trojan insertion failed: {error}")
+        if scheduler is not None:
+            # Cells that converged early leave part of the budget unused
+            bar.total = scheduler.issued
+            bar.refresh()
+            for cell in scheduler.summary():
+                events.write({"adaptive": cell, "scheme": args.scheme})
+
+    if scheduler is not None:
+        for cell in scheduler.summary():
+            print(f"{cell['name']} K={cell['key_size']}: {cell['runs']} runs, "
+                  f"sat_time {cell['sat_time_mean']}s \u00b1{cell['sat_time_ci']:.0%}, "
+                  f"iterations {cell['iterations_mean']} \u00b1{cell['iterations_ci']:.0%}")
+
+    if args.profile is not None:
+        dump(merge(campaign.profiles), args.profile, script="autoparallel_sat_attack", scheme=args.scheme)
+    return results
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup()
+    plan = build_plan(args) if args.spec else None
+    if args.plan_only:
+        return
+    if args.sensitization:
+        ensure_results_header(RESULTS_HEADER + SENSITIZATION_HEADER)
+    asyncio.run(run_tasks(args, plan))
 
     # Call PDF generator
-    try:
-        subprocess.run(["python3", "scripts/gen_pdf_report.py"], check=True)
-    except Exception as e:
-        logging.error(f"PDF generation failed: {e}")
+    if not args.no_report:
+        try:
+            import gen_pdf_report
+            gen_pdf_report.main([])
+        except Exception as e:
+            logging.error(f"PDF generation failed: {e}")
 
     logging.info("All done. See CSV and PDF in results/")
     print("Task A completed with parallel execution. Report saved in 'results/'")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tools.utils.locking import batch_lock, bench_files, write_manifest
+from tools.utils.results_store import SCHEME_LABELS
+import sarlock
+import antisat
+import caclock
+import sarlock_trojan
+import antisat_trojan
+import cac_trojan
+
+"""
+Batch mode for the point-function locking generators
+- Takes .bench files and/or directories, several schemes, key sizes and seeds
+- Each design is parsed once per worker chunk and all its variants are
+  generated from that parse, across a process pool
+- Writes every variant to --output-path as <design>_<Scheme>_k_<K>_s<seed>.bench
+  and a manifest CSV (file, design, scheme, key size, seed, key, gate counts)
+  for the attack stages
+"""
+
+TRANSFORMS = {
+    "sarlock": sarlock.transform,
+    "antisat": antisat.transform,
+    "cac": caclock.transform,
+    "troll-sarlock": sarlock_trojan.transform,
+    "troll-antisat": antisat_trojan.transform,
+    "troll-cac": cac_trojan.transform,
+}
+# scheme -> (file name label, transform); the labels are the campaign's
+SCHEMES = {scheme: (SCHEME_LABELS[scheme], transform) for scheme, transform in TRANSFORMS.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench-path", "--bench_path", type=Path, nargs="+", required=True,
+                        help=".bench files and/or directories of them")
+    parser.add_argument("--schemes", nargs="+", choices=sorted(SCHEMES), default=["sarlock"])
+    parser.add_argument("--keysizes", type=int, nargs="+", required=True)
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--output-path", "--output_path", type=Path, default=Path("locked_circuits"))
+    parser.add_argument("--manifest", type=Path, default=None,
+                        help="Manifest CSV (default: <output-path>/manifest.csv)")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: all CPUs)")
+    args = parser.parse_args(argv)
+
+    designs = bench_files(args.bench_path)
+    if not designs:
+        parser.error("No .bench files found")
+    variants = [(scheme, k, seed) for scheme in args.schemes for k in args.keysizes for seed in args.seeds]
+
+    start = time.time()
+    rows = batch_lock(designs, SCHEMES, variants, args.output_path, args.workers)
+    manifest = args.manifest or args.output_path / "manifest.csv"
+    write_manifest(rows, manifest)
+    print(f"Locked {len(designs)} designs x {len(variants)} variants = {len(rows)} files "
+          f"in {time.time() - start:.2f}s; manifest: {manifest}")
+
+
+if __name__ == "__main__":
+    main()
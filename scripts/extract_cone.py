@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tools.utils.netlist import parse_netlist, write_netlist, extract_key_cone
+
+"""
+Locked-output cone extraction
+- Keeps only the transitive fan-in of outputs that depend on key inputs
+- Proves the other outputs structurally identical to the original
+- Writes a reduced locked/original pair for sld and lcmp
+"""
+
+
+def cone_paths(locked_path, output_dir):
+    locked_path = Path(locked_path)
+    output_dir = Path(output_dir)
+    return (
+        output_dir / f"{locked_path.stem}_cone.bench",
+        output_dir / f"{locked_path.stem}_orig_cone.bench",
+    )
+
+
+def extract(locked_path, original_path, output_dir):
+    """Write the reduced pair and return (locked_cone_path, original_cone_path, report)."""
+    locked = parse_netlist(locked_path)
+    original = parse_netlist(original_path)
+    locked_red, original_red, report = extract_key_cone(locked, original)
+    if not locked_red.outputs:
+        raise ValueError(f"No output of {locked_path} depends on a key input")
+
+    locked_out, original_out = cone_paths(locked_path, output_dir)
+    write_netlist(locked_red, locked_out)
+    write_netlist(original_red, original_out)
+    return locked_out, original_out, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--locked", type=Path, required=True)
+    parser.add_argument("--original", type=Path, required=True)
+    parser.add_argument("--output-dir", "--output_dir", type=Path, default=Path("locked_circuits/cones"))
+    args = parser.parse_args(argv)
+
+    locked_out, original_out, report = extract(args.locked, args.original, args.output_dir)
+
+    print(f"Key-dependent outputs: {len(report['key_outputs'])}, "
+          f"structurally identical: {len(report['identical_outputs'])}, "
+          f"kept for checking: {len(report['mismatched_outputs'])}")
+    print(f"Locked gates: {report['locked_gates']} -> {report['locked_cone_gates']}")
+    print(f"Original gates: {report['original_gates']} -> {report['original_cone_gates']}")
+    print(f"Reduced pair saved to: {locked_out} {original_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,29 @@ import os
 import json
 
 DATA_FOLDER = "data"
+CONFIG_FILE = os.path.join("config", "circuits.json")
 
-circuits = []
-for filename in os.listdir(DATA_FOLDER):
-    if filename.endswith(".bench"):
-        name = filename.split(".")[0]
-        key_sizes = [16, 32] if name.startswith("c") else [128, 256]
-        circuits.append({"name": name, "file": filename, "key_sizes": key_sizes})
 
-config = {"circuits": circuits, "iterations": 10}
+def generate(data_folder=DATA_FOLDER, config_file=CONFIG_FILE, iterations=10):
+    """Write a campaign config with every .bench design in `data_folder`."""
+    circuits = []
+    for filename in sorted(os.listdir(data_folder)):
+        if filename.endswith(".bench"):
+            name = os.path.splitext(filename)[0]
+            key_sizes = [16, 32] if name.startswith("c") else [128, 256]
+            circuits.append({"name": name, "file": filename, "key_sizes": key_sizes})
 
-with open("config/circuits.json", "w") as f:
-    json.dump(config, f, indent=4)
+    config = {"circuits": circuits, "iterations": iterations}
+    os.makedirs(os.path.dirname(config_file) or ".", exist_ok=True)
+    with open(config_file, "w") as f:
+        json.dump(config, f, indent=4)
+    return config
 
-print("Configuration file 'config/circuits.json' has been generated!")
+
+def main(argv=None):
+    generate()
+    print(f"Configuration file '{CONFIG_FILE}' has been generated!")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,32 @@
 #!/usr/bin/env python3
 import argparse
+import base64
+import html
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tools.utils.results_store import SCHEME_LABELS, scheme_of
 
+"""
+PDF (and optional HTML) report for SAT-attack campaign results
+- Summarizes first: per circuit / key size / scheme statistics, runtime and
+  iterations vs key size, key success rates; raw rows are only included on
+  request (--raw-rows)
+- Each page is rendered to PNG in a process pool and the pages are merged
+  into one PDF with Pillow
+- pandas and matplotlib are imported only when a report is built
+"""
 
-def parse_args():
+DPI = 100
+PAGE_SIZE = (11, 8.5)  # US Letter landscape
+TITLE = "Fred IoT Security Assignment"
+
+
+def parse_args(argv=None):
     p = argparse.ArgumentParser(
         description="Generate a PDF report from a SAT-attack CSV results file."
     )
@@ -29,53 +48,168 @@ def parse_args():
         default=30,
         help="Number of table rows per PDF page"
     )
-    return p.parse_args()
+    p.add_argument(
+        "--html",
+        type=Path,
+        default=None,
+        help="Also write a self-contained HTML report to this path"
+    )
+    p.add_argument(
+        "--raw-rows",
+        type=int,
+        default=0,
+        help="Append up to this many raw result rows as table pages (default: none)"
+    )
+    p.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes used to render pages"
+    )
+    return p.parse_args(argv)
+
 
+def load_data(csv_path: Path):
+    import pandas as pd
 
-def load_data(csv_path: Path) -> pd.DataFrame:
     if not csv_path.exists():
         raise FileNotFoundError(f"CSV file not found: {csv_path}")
-    return pd.read_csv(csv_path)
-
+    df = pd.read_csv(csv_path)
+    df["Scheme"] = [SCHEME_LABELS[scheme_of(f) or "rll"] for f in df["Locked File"].astype(str)]
+    df["Solved"] = (df["Key Correct"] == "YES").astype(float)
+    return df
+
+
+def summarize(df):
+    """Per (circuit, key size, scheme) statistics, as a DataFrame."""
+    runtime = "SAT Attack Runtime (s)"
+    grouped = df.groupby(["Circuit", "Key Size", "Scheme"])
+    summary = grouped.agg(
+        Runs=(runtime, "size"),
+        Mean_s=(runtime, "mean"),
+        Median_s=(runtime, "median"),
+        P95_s=(runtime, lambda s: s.quantile(0.95)),
+        Max_s=(runtime, "max"),
+        Mean_Iterations=("Iterations", "mean"),
+        Success_Rate=("Solved", "mean"),
+    ).reset_index()
+    summary.columns = [c.replace("_", " ") for c in summary.columns]
+    return summary.round(3)
+
+
+def plot_series(summary, column):
+    """{circuit (scheme): ([key sizes], [values])} for a summary column."""
+    series = {}
+    for (circuit, scheme), group in summary.groupby(["Circuit", "Scheme"]):
+        group = group.sort_values("Key Size")
+        series[f"{circuit} ({scheme})"] = (group["Key Size"].tolist(), group[column].tolist())
+    return series
+
+
+def page_specs(df, summary, rows_per_page, raw_rows):
+    """Picklable descriptions of every page, in order."""
+    specs = []
+    columns = list(summary.columns)
+    rows = summary.astype(str).values.tolist()
+    for start in range(0, len(rows), rows_per_page):
+        chunk = rows[start:start + rows_per_page]
+        specs.append(("table", f"{TITLE}: summary ({start + 1}–{start + len(chunk)} of {len(rows)} groups)",
+                      {"columns": columns, "rows": chunk}))
+    specs.append(("lines", f"{TITLE}: median SAT attack runtime vs key size",
+                  {"series": plot_series(summary, "Median s"), "ylabel": "Median runtime (s)", "log": True}))
+    specs.append(("lines", f"{TITLE}: mean DIP iterations vs key size",
+                  {"series": plot_series(summary, "Mean Iterations"), "ylabel": "Mean iterations", "log": False}))
+    labels = [f"{c} K{k} {s}" for c, k, s in summary[["Circuit", "Key Size", "Scheme"]].values.tolist()]
+    specs.append(("bars", f"{TITLE}: key recovery success rate",
+                  {"labels": labels, "values": summary["Success Rate"].tolist(), "ylabel": "Success rate"}))
+
+    raw = df.drop(columns=["Scheme", "Solved"]).head(raw_rows)
+    raw_values = raw.astype(str).values.tolist()
+    for start in range(0, len(raw_values), rows_per_page):
+        chunk = raw_values[start:start + rows_per_page]
+        specs.append(("table", f"{TITLE} (Rows {start + 1}–{start + len(chunk)})",
+                      {"columns": list(raw.columns), "rows": chunk}))
+    return specs
+
+
+def render_page(spec):
+    """Render one page spec to PNG bytes; runs in a worker process."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    kind, title, data = spec
+    fig, ax = plt.subplots(figsize=PAGE_SIZE)
+    if kind == "table":
+        ax.axis("off")
+        table = ax.table(cellText=data["rows"], colLabels=data["columns"], cellLoc="center", loc="center")
+        table.auto_set_font_size(False)
+        table.set_fontsize(8)
+        table.scale(1.1, 1.1)
+    elif kind == "lines":
+        for label, (x, y) in data["series"].items():
+            ax.plot(x, y, marker="o", label=label)
+        ax.set_xscale("log", base=2)
+        if data["log"]:
+            ax.set_yscale("log")
+        ax.set_xlabel("Key size")
+        ax.set_ylabel(data["ylabel"])
+        ax.grid(True, alpha=0.3)
+        ax.legend(fontsize=7, ncol=2)
+    elif kind == "bars":
+        ax.bar(range(len(data["values"])), data["values"])
+        ax.set_xticks(range(len(data["labels"])))
+        ax.set_xticklabels(data["labels"], rotation=90, fontsize=6)
+        ax.set_ylim(0, 1.05)
+        ax.set_ylabel(data["ylabel"])
+    ax.set_title(title, fontsize=12, pad=12)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=DPI)
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def render_pages(specs, jobs):
+    if jobs > 1 and len(specs) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(specs))) as pool:
+            return list(pool.map(render_page, specs))
+    return [render_page(spec) for spec in specs]
+
+
+def write_pdf(pages, pdf_path: Path):
+    from PIL import Image
 
-def render_table_pages(df: pd.DataFrame, pdf_path: Path, rows_per_page: int):
     pdf_path.parent.mkdir(parents=True, exist_ok=True)
-    with PdfPages(pdf_path) as pdf:
-        total_rows = len(df)
-        num_pages = (total_rows + rows_per_page - 1) // rows_per_page
-
-        for page in range(num_pages):
-            start = page * rows_per_page
-            end = min(start + rows_per_page, total_rows)
-            slice_df = df.iloc[start:end]
-
-            fig, ax = plt.subplots(
-                figsize=(11, 8.5),  # US Letter landscape
-            )
-            ax.axis("off")
-
-            table = ax.table(
-                cellText=slice_df.values,
-                colLabels=slice_df.columns,
-                cellLoc="center",
-                loc="center"
-            )
-            table.auto_set_font_size(False)
-            table.set_fontsize(8)
-            table.scale(1.1, 1.1)
-
-            title = f"Fred IoT Security Assignment (Rows {start+1}–{end})"
-            ax.set_title(title, fontsize=12, pad=12)
-
-            pdf.savefig(fig, bbox_inches="tight")
-            plt.close(fig)
-
-
-def main():
-    args = parse_args()
+    images = [Image.open(io.BytesIO(png)).convert("RGB") for png in pages]
+    images[0].save(pdf_path, "PDF", resolution=DPI, save_all=True, append_images=images[1:])
+
+
+def write_html(summary, specs, pages, html_path: Path):
+    """Summary as an HTML table plus the plot pages as inline PNGs."""
+    html_path.parent.mkdir(parents=True, exist_ok=True)
+    parts = [f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(TITLE)}</title>",
+             "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+             "td,th{border:1px solid #ccc;padding:2px 8px;text-align:right}</style></head><body>",
+             f"<h1>{html.escape(TITLE)}</h1>", summary.to_html(index=False)]
+    for (kind, title, _), png in zip(specs, pages):
+        if kind != "table":
+            parts.append(f"<h2>{html.escape(title)}</h2>"
+                         f"<img src='data:image/png;base64,{base64.b64encode(png).decode()}'>")
+    parts.append("</body></html>")
+    html_path.write_text("\n".join(parts))
+
+
+def main(argv=None):
+    args = parse_args(argv)
     df = load_data(args.input_csv)
-    render_table_pages(df, args.output_pdf, args.rows_per_page)
+    summary = summarize(df)
+    specs = page_specs(df, summary, args.rows_per_page, args.raw_rows)
+    pages = render_pages(specs, args.jobs)
+    write_pdf(pages, args.output_pdf)
     print(f"PDF report generated: {args.output_pdf}")
+    if args.html is not None:
+        write_html(summary, specs, pages, args.html)
+        print(f"HTML report generated: {args.html}")
 
 
 if __name__ == "__main__":
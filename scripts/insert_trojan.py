@@ -2,8 +2,12 @@
 
 import argparse
 import random
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tools.utils.profiling import current, profiled, add_profile_argument
+
 def parse_bench(path):
     with open(path, 'r') as f:
         lines = [line.strip() for line in f if line.strip()]
@@ -73,7 +77,10 @@ def modify_output_target(logic, target_output, payload):
     return new_logic
 
 def insert_trojan(in_path, trigger_size, num_trojans, out_dir):
-    inputs, outputs, logic, floating_nets = parse_bench(in_path)
+    prof = current()
+    with prof.phase("parse"):
+        inputs, outputs, logic, floating_nets = parse_bench(in_path)
+    prof.count("gates_parsed", len(logic))
     valid_inputs = [i for i in inputs if i not in floating_nets]
     if len(valid_inputs) < trigger_size:
         print(f"Error: Not enough valid inputs to insert Trojan in {in_path.name}")
@@ -83,39 +90,45 @@ def insert_trojan(in_path, trigger_size, num_trojans, out_dir):
     target = outputs[0]
 
     for t in range(1, num_trojans + 1):
-        trojan_logic, payload = generate_trojan_logic(valid_inputs, trigger_size, t)
-        modified_logic = modify_output_target(logic, target, payload)
-        full_logic = modified_logic + trojan_logic
+        with prof.phase("transform"):
+            trojan_logic, payload = generate_trojan_logic(valid_inputs, trigger_size, t)
+            modified_logic = modify_output_target(logic, target, payload)
+            full_logic = modified_logic + trojan_logic
 
-        out_lines = ["#"]  # Atalanta-compatible
-        out_lines += [f"INPUT({inp})" for inp in inputs]
-        out_lines += [f"OUTPUT({out})" for out in outputs]
-        out_lines += [f"OUTPUT({payload})"]  # Make payload not floating
-        out_lines += full_logic
+            out_lines = ["#"]  # Atalanta-compatible
+            out_lines += [f"INPUT({inp})" for inp in inputs]
+            out_lines += [f"OUTPUT({out})" for out in outputs]
+            out_lines += [f"OUTPUT({payload})"]  # Make payload not floating
+            out_lines += full_logic
 
         out_file = out_dir / f"{stem}_HT_trigger_{trigger_size}_{t:02d}.bench"
-        with open(out_file, 'w') as f:
-            for line in out_lines:
-                f.write(f"{line}\n")
+        text = "".join(f"{line}\n" for line in out_lines)
+        with prof.phase("write"):
+            with open(out_file, 'w') as f:
+                f.write(text)
+        prof.count("gates_emitted", len(full_logic))
+        prof.count("bytes_written", len(text))
         print(f"Generated: {out_file}")
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument("--bench_path", type=Path, required=True)
     parser.add_argument("--trigger_size", type=int, default=3)
     parser.add_argument("--num_trojans", type=int, default=50)
-    args = parser.parse_args()
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
 
     out_dir = Path("locked_circuits")
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    if args.bench_path.is_file() and args.bench_path.suffix == ".bench":
-        insert_trojan(args.bench_path, args.trigger_size, args.num_trojans, out_dir)
-    elif args.bench_path.is_dir():
-        for file in args.bench_path.glob("*.bench"):
-            insert_trojan(file, args.trigger_size, args.num_trojans, out_dir)
-    else:
-        print("Error: Invalid --bench_path. Provide a .bench file or directory.")
+    with profiled(args.profile, "insert_trojan"):
+        if args.bench_path.is_file() and args.bench_path.suffix == ".bench":
+            insert_trojan(args.bench_path, args.trigger_size, args.num_trojans, out_dir)
+        elif args.bench_path.is_dir():
+            for file in args.bench_path.glob("*.bench"):
+                insert_trojan(file, args.trigger_size, args.num_trojans, out_dir)
+        else:
+            print("Error: Invalid --bench_path. Provide a .bench file or directory.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+import argparse
+import importlib
+import subprocess
+import sys
+from pathlib import Path
+
+"""
+Single entry point for the locking, Trojan, attack and campaign scripts
+    iotsec lock sarlock --bench_path data/c432.bench --keysize 16
+    iotsec trojan cac --bench_path data/c432.bench --keysize 16
+    iotsec attack sat --locked L.bench --original O.bench
+    iotsec verify --original O.bench --locked L.bench --key 0101...
+    iotsec campaign --scheme antisat --scratch ram
+    iotsec report --html results/report.html
+- Arguments after the command are passed to the script unchanged, so each
+  command takes the same options as the script it runs (`--help` included)
+- Only the script behind the chosen command is imported, and nothing touches
+  the filesystem until it runs; `iotsec --help` loads no project modules
+"""
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_FOLDER = ROOT / "scripts"
+TOOLS_FOLDER = ROOT / "tools"
+
+# command -> module, or {variant: module} for commands with several implementations
+COMMANDS = {
+    "lock": {"rll": "RLL", "sarlock": "sarlock", "antisat": "antisat", "cac": "caclock", "batch": "batch_lock"},
+    "trojan": {"insert": "insert_trojan", "sarlock": "sarlock_trojan", "antisat": "antisat_trojan",
+               "cac": "cac_trojan"},
+    "attack": {"sat": "sat_attack", "sensitization": "sensitization_attack", "sps": "sps_attack"},
+    "cone": "extract_cone",
+    "campaign": "autoparallel_sat_attack",
+    "config": "gen_circuits_json",
+    "report": "gen_pdf_report",
+    "query": "results_query",
+    "overhead": "overhead_report",
+    "mero": "mero_tests",
+}
+HELP = {
+    "lock": "Lock a netlist (RLL, SARLock, Anti-SAT, CAC), or many at once (batch)",
+    "trojan": "Insert hardware Trojans",
+    "attack": "In-process attacks on a locked netlist",
+    "verify": "Check a recovered key with lcmp",
+    "cone": "Extract the key-dependent output cone",
+    "campaign": "Run the lock -> attack -> verify campaign",
+    "config": "Generate config/circuits.json from data/",
+    "report": "PDF/HTML report of campaign results",
+    "query": "Query the results store",
+    "overhead": "Area, depth and power overhead of locked files vs their originals",
+    "mero": "N-detect test generation and Trojan detection coverage per design",
+}
+
+
+def run_module(name, argv, prog):
+    """Import one script and run its main(argv)."""
+    # Scripts' own usage/errors then read "iotsec <command> ..."
+    sys.argv[0] = prog
+    for folder in (ROOT, SCRIPTS_FOLDER, TOOLS_FOLDER):
+        if str(folder) not in sys.path:
+            sys.path.insert(0, str(folder))
+    return importlib.import_module(name).main(argv)
+
+
+def verify(argv):
+    parser = argparse.ArgumentParser(prog="iotsec verify", description=HELP["verify"])
+    parser.add_argument("--original", type=Path, required=True)
+    parser.add_argument("--locked", type=Path, required=True)
+    parser.add_argument("--key", required=True)
+    parser.add_argument("--tools-dir", type=Path, default=TOOLS_FOLDER, help="Folder holding the lcmp binary")
+    args = parser.parse_args(argv)
+
+    output = subprocess.run([str(args.tools_dir / "lcmp"), str(args.original), str(args.locked), f"key={args.key}"],
+                            capture_output=True, text=True).stdout
+    print(output.strip())
+    return 0 if "equivalent" in output else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="iotsec", description="IoT security locking and attack tools")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+    for command in [*COMMANDS, "verify"]:
+        sub = commands.add_parser(command, help=HELP[command])
+        if isinstance(COMMANDS.get(command), dict):
+            sub.add_argument("variant", choices=sorted(COMMANDS[command]))
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Only the command (and variant) are parsed here; the rest belongs to the script
+    split = 2 if argv and isinstance(COMMANDS.get(argv[0]), dict) else 1
+    args = build_parser().parse_args(argv[:split])
+    if args.command == "verify":
+        return verify(argv[split:])
+    target = COMMANDS[args.command]
+    module = target[args.variant] if isinstance(target, dict) else target
+    return run_module(module, argv[split:], " ".join(["iotsec", *argv[:split]]))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tools.utils.locking import bench_files
+from tools.utils.mero import N_DETECT, THETA, evaluate_all, trojan_jobs, write_table
+
+"""
+MERO-style N-detect test generation and Trojan detection coverage
+- Per design: finds the rare nets, builds a compact test set that drives each
+  to its rare value N times (see tools/utils/mero.py) and simulates it against
+  all of the design's *_HT_trigger_* variants
+- Also runs as many random patterns on the same variants, for comparison
+- Writes one CSV row per design and prints coverage, test-set size and runtime
+"""
+
+
+def print_summary(rows):
+    print(f"{'design':>8} {'rare':>6} {'covered':>7} {'tests':>6} {'trojans':>7} {'cov %':>6} {'rand %':>6} "
+          f"{'gen s':>7} {'sim s':>7}")
+    for row in rows:
+        print(f"{row['design']:>8} {row['rare_nets']:>6} {row['rare_covered']:>7} {row['patterns']:>6} "
+              f"{row['trojans']:>7} {row['coverage_pct'] or 0:>6.1f} {row['random_coverage_pct'] or 0:>6.1f} "
+              f"{row['generation_s']:>7.2f} {row['detection_s']:>7.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trojans", type=Path, nargs="+", default=[Path("locked_circuits")],
+                        help="Trojan-infected .bench files and/or directories of them (only *_HT_trigger_* are used)")
+    parser.add_argument("--data", type=Path, default=Path("data"), help="Folder with the original designs")
+    parser.add_argument("--designs", nargs="+", default=None, help="Only these designs (default: all with Trojans)")
+    parser.add_argument("-N", "--n-detect", "--n_detect", type=int, default=N_DETECT,
+                        help="Times each rare net must be driven to its rare value")
+    parser.add_argument("--theta", type=float, default=THETA, help="Rareness threshold on signal probability")
+    parser.add_argument("--batch-words", "--batch_words", type=int, default=16,
+                        help="Candidate patterns per round, in units of 64")
+    parser.add_argument("--flips", type=int, default=32, help="Input bits hill-climbed per round")
+    parser.add_argument("--max-rounds", "--max_rounds", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tests", type=Path, default=None, help="Also write each design's test set to this folder")
+    parser.add_argument("--output", type=Path, default=Path("results/mero.csv"))
+    parser.add_argument("--workers", type=int, default=None, help="Processes, one design each (default: all CPUs)")
+    args = parser.parse_args(argv)
+
+    jobs = trojan_jobs(bench_files(args.trojans), args.data)
+    if args.designs:
+        jobs = {o: v for o, v in jobs.items() if Path(o).stem in args.designs}
+    if not jobs:
+        parser.error("No *_HT_trigger_* files with an original design to test")
+
+    start = time.time()
+    rows = evaluate_all(jobs, args.workers, n_detect=args.n_detect, theta=args.theta, seed=args.seed,
+                        batch_words=args.batch_words, flips=args.flips, max_rounds=args.max_rounds,
+                        tests_folder=args.tests)
+    write_table(rows, args.output)
+    print_summary(rows)
+    print(f"Tested {sum(r['trojans'] for r in rows)} Trojan files of {len(rows)} designs in "
+          f"{time.time() - start:.1f}s; table: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
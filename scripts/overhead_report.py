@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tools.utils.locking import bench_files
+from tools.utils.overhead import analyze_all, pair_with_originals, write_table
+
+"""
+Overhead of every locked / Trojan-infected file against its original
+- Gate count and per-type deltas, logic depth change and estimated switching
+  power (see tools/utils/overhead.py) for each file, across a process pool
+- Writes one CSV row per file and prints the mean overhead per design,
+  scheme and key size
+"""
+
+
+def print_summary(rows):
+    groups = {}
+    for row in rows:
+        if not row.get("error"):
+            groups.setdefault((row["design"], row["scheme"], row["key_size"] or 0), []).append(row)
+    print(f"{'design':>8} {'scheme':>14} {'K':>5} {'files':>5} {'gates %':>8} {'depth +':>7} {'power %':>8}")
+    for (design, scheme, key_size), group in sorted(groups.items()):
+        mean = lambda col: sum(r[col] or 0 for r in group) / len(group)
+        print(f"{design:>8} {scheme:>14} {key_size or '-':>5} {len(group):>5} "
+              f"{mean('gates_pct'):>8.2f} {mean('depth_delta'):>7.1f} {mean('power_pct'):>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--locked", type=Path, nargs="+", default=[Path("locked_circuits")],
+                        help="Locked .bench files and/or directories of them")
+    parser.add_argument("--data", type=Path, default=Path("data"), help="Folder with the original designs")
+    parser.add_argument("--output", type=Path, default=Path("results/overhead.csv"))
+    parser.add_argument("--words", type=int, default=64, help="64-pattern words simulated per file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: all CPUs)")
+    args = parser.parse_args(argv)
+
+    pairs, unmatched = pair_with_originals(bench_files(args.locked), args.data)
+    if unmatched:
+        print(f"Skipping {len(unmatched)} files with no original in {args.data}")
+    if not pairs:
+        parser.error("No locked files to analyze")
+
+    start = time.time()
+    rows = analyze_all(pairs, args.words, args.seed, args.workers)
+    write_table(rows, args.output)
+    print_summary(rows)
+    failed = sum(1 for r in rows if r.get("error"))
+    print(f"Analyzed {len(rows)} files ({failed} failed) in {time.time() - start:.1f}s; table: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tools.utils.results_store import ResultsStore, METRICS, GROUP_COLUMNS
+
+"""
+Query the campaign results store (results/results.db)
+- import:  load a campaign CSV as a named run
+- runs:    list runs and their row counts
+- summary: mean / p50 / p90 / p95 of a metric and key success rate per
+           circuit x key size x scheme (or a coarser grouping)
+- compare: median change per group between two runs, flagging regressions
+"""
+
+
+def fmt(value):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.4f}"
+    return str(value)
+
+
+def print_table(rows, as_csv=False):
+    if not rows:
+        print("No results")
+        return
+    header = list(rows[0])
+    if as_csv:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(header)
+        writer.writerows([[row[h] for h in header] for row in rows])
+        return
+    cells = [header] + [[fmt(row[h]) for h in header] for row in rows]
+    widths = [max(len(r[i]) for r in cells) for i in range(len(header))]
+    for r in cells:
+        print("  ".join(c.rjust(w) for c, w in zip(r, widths)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", type=Path, default=Path("results/results.db"))
+    parser.add_argument("--csv", action="store_true", help="Print CSV instead of a table")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", help="Load a campaign results CSV as a run")
+    p.add_argument("csv_file", type=Path)
+    p.add_argument("--run", required=True, help="Run label")
+    p.add_argument("--scheme", default=None, help="Scheme for every row (default: from the locked file name)")
+
+    sub.add_parser("runs", help="List runs")
+
+    p = sub.add_parser("summary", help="Aggregate a metric per group")
+    p.add_argument("--run", default=None, help="Run label (default: all runs)")
+    p.add_argument("--metric", choices=METRICS, default="sat_time")
+    p.add_argument("--by", nargs="+", choices=GROUP_COLUMNS, default=list(GROUP_COLUMNS))
+
+    p = sub.add_parser("compare", help="Median change per group between two runs")
+    p.add_argument("base")
+    p.add_argument("new")
+    p.add_argument("--metric", choices=METRICS, default="sat_time")
+    p.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    args.db.parent.mkdir(parents=True, exist_ok=True)
+    with ResultsStore(str(args.db)) as store:
+        if args.command == "import":
+            _, n = store.import_csv(args.csv_file, args.run, args.scheme)
+            print(f"Imported {n} rows into run {args.run}")
+        elif args.command == "runs":
+            print_table([{"run": label, "rows": n} for label, _, n in store.runs()], args.csv)
+        elif args.command == "summary":
+            print_table(store.summary(args.metric, args.run, args.by), args.csv)
+        else:
+            rows = store.compare(args.base, args.new, args.metric, args.threshold)
+            print_table(rows, args.csv)
+            if any(r["regression"] for r in rows):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
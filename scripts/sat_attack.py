@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tools.utils.netlist import parse_netlist, extract_key_cone
+from tools.utils.sat_attack import SatAttack, DIP_STRATEGIES
+from tools.utils.portfolio import run_portfolio, default_configs, config_label
+
+"""
+In-process SAT attack on a locked .bench file
+- exact: classic DIP loop, same result as sld
+- appsat: approximate attack for SAT-resilient schemes (SARLock, Anti-SAT);
+  stops once the candidate key's measured error rate is under --error-threshold
+- --portfolio N races N solver/seed/DIP-strategy configurations in separate
+  processes and keeps the first to finish
+Results are appended to results/sat_attack_inprocess_results.csv
+"""
+
+RESULTS_HEADER = [
+    "Circuit", "Locked File", "Key Size", "Mode", "SAT Attack Runtime (s)",
+    "Iterations", "Queries", "Error Rate", "Error Bound", "Status", "Key Correct",
+    "Configuration",
+]
+
+
+def attack(locked_path, original_path, mode="exact", extract_cone=False, config=None, **options):
+    config = config or {"solver": "g4", "seed": 0, "dip_strategy": "default"}
+    locked = parse_netlist(locked_path)
+    original = parse_netlist(original_path)
+    if extract_cone:
+        locked, original, _ = extract_key_cone(locked, original)
+
+    engine = SatAttack(locked, original, solver_name=config["solver"],
+                       seed=config["seed"], dip_strategy=config["dip_strategy"])
+    try:
+        result = engine.run(mode=mode, **options)
+    finally:
+        engine.close()
+    result["configuration"] = config_label(config)
+    return check_key(result, locked.key)
+
+
+def portfolio_attack(locked_path, original_path, configs, mode="exact", extract_cone=False, **options):
+    timeout = options.pop("timeout", None)
+    result, config, errors = run_portfolio(locked_path, original_path, configs, mode=mode,
+                                           extract_cone=extract_cone, timeout=timeout, **options)
+    for label, error in errors.items():
+        print(f"Portfolio configuration {label} failed: {error}")
+    if result is None:
+        raise RuntimeError("Every portfolio configuration failed or timed out")
+    result["configuration"] = config_label(config)
+    return check_key(result, parse_netlist(locked_path).key)
+
+
+def check_key(result, locked_key):
+    # An exact attack's key is functionally correct even if it differs from #key=
+    if result["status"] == "exact" or result["key"] == locked_key:
+        result["key_correct"] = "YES"
+    else:
+        result["key_correct"] = "NO" if locked_key is not None else "N/A"
+    return result
+
+
+def append_result(results_file, row):
+    results_file = Path(results_file)
+    results_file.parent.mkdir(parents=True, exist_ok=True)
+    new_file = not results_file.exists()
+    with open(results_file, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(RESULTS_HEADER)
+        writer.writerow(row)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--locked", type=Path, required=True)
+    parser.add_argument("--original", type=Path, required=True)
+    parser.add_argument("--mode", choices=["exact", "appsat"], default="exact")
+    parser.add_argument("--error-threshold", type=float, default=0.01,
+                        help="AppSAT: stop once the measured error rate is at most this")
+    parser.add_argument("--query-words", type=int, default=16,
+                        help="AppSAT: random queries per estimate, in units of 64 patterns")
+    parser.add_argument("--dip-interval", type=int, default=8,
+                        help="AppSAT: DIP iterations between error estimates")
+    parser.add_argument("--max-iterations", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds")
+    parser.add_argument("--solver", type=str, default="g4", help="pysat solver name")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dip-strategy", choices=DIP_STRATEGIES, default="default")
+    parser.add_argument("--portfolio", type=int, default=0,
+                        help="Race this many solver/seed/DIP-strategy configurations in parallel")
+    parser.add_argument("--extract-cone", action="store_true")
+    parser.add_argument("--results", type=Path, default=Path("results/sat_attack_inprocess_results.csv"))
+    args = parser.parse_args(argv)
+
+    options = dict(
+        error_threshold=args.error_threshold, query_words=args.query_words,
+        dip_interval=args.dip_interval, max_iterations=args.max_iterations, timeout=args.timeout,
+    )
+    if args.portfolio:
+        result = portfolio_attack(args.locked, args.original, default_configs(args.portfolio),
+                                  mode=args.mode, extract_cone=args.extract_cone, **options)
+    else:
+        config = {"solver": args.solver, "seed": args.seed, "dip_strategy": args.dip_strategy}
+        result = attack(args.locked, args.original, mode=args.mode,
+                        extract_cone=args.extract_cone, config=config, **options)
+    append_result(args.results, [
+        args.original.name, str(args.locked), len(result["key"]), args.mode, result["runtime"],
+        result["iterations"], result["queries"], result["error_rate"], result["error_bound"],
+        result["status"], result["key_correct"], result["configuration"],
+    ])
+
+    print(f"key={result['key']}")
+    print(f"iteration={result['iterations']}; queries={result['queries']}; "
+          f"error_rate={result['error_rate']}; error_bound={result['error_bound']}; "
+          f"status={result['status']}; runtime={result['runtime']}")
+    print(f"configuration={result['configuration']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tools.utils.netlist import parse_netlist
+from tools.utils.golden_cache import GoldenCache, error_rate
+from tools.utils.sensitization import SensitizationAttack
+from tools.utils.shared_netlist import attach
+
+"""
+Key-sensitization attack on RLL (XOR/XNOR key gate) locked .bench files
+- Resolves key bits from patterns that propagate them to an output (see tools/utils/sensitization.py)
+- Oracle is a simulator of the original design
+- Bits it cannot resolve are "x" in the printed key and the verdict is PARTIAL; the
+  candidate key (consistent with everything learned) and its error rate are printed too
+Results are appended to results/sensitization_attack_results.csv
+"""
+
+RESULTS_HEADER = [
+    "Circuit", "Locked File", "Key Size", "Sensitization Runtime (s)", "Resolved Bits",
+    "Queries", "Error Rate", "Key Correct",
+]
+
+
+@lru_cache(maxsize=16)
+def _original(path, mtime):
+    return parse_netlist(path)
+
+
+def attack(locked_path, original_path, seed=0, shared=None, golden_cache=None, **options):
+    """
+    `shared`: handle of the original published by SharedDesigns; the oracle then simulates the shared copy.
+    `golden_cache`: folder of cached golden responses to measure the final key's error rate against.
+    """
+    locked = parse_netlist(locked_path)
+    if shared is not None:
+        original = attach(shared)
+    else:
+        # Campaign workers attack many variants of few designs; parse each original once per process
+        original = _original(str(original_path), os.path.getmtime(original_path))
+    engine = SensitizationAttack(locked, original, seed=seed)
+    if golden_cache is not None:
+        cache = GoldenCache(golden_cache)
+        options["measure"] = lambda compiled, fixed: error_rate(
+            compiled, original_path, options.get("verify_words", 16), seed, fixed, cache)
+    result = engine.run(**options)
+    # Unresolved bits are "x" in the key; a sampled error rate of the candidate cannot vouch for them
+    if result["unresolved"]:
+        result["key_correct"] = "PARTIAL"
+    elif result["key"] == locked.key or result["error_rate"] == 0:
+        result["key_correct"] = "YES"
+    else:
+        result["key_correct"] = "NO"
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--locked", type=Path, required=True)
+    parser.add_argument("--original", type=Path, required=True)
+    parser.add_argument("--pattern-words", "--pattern_words", type=int, default=16,
+                        help="Random patterns per round, in units of 64")
+    parser.add_argument("--samples", type=int, default=16,
+                        help="Random assignments of the other key bits a pattern must hold for")
+    parser.add_argument("--max-rounds", "--max_rounds", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--golden-cache", type=Path, default=Path("results/golden_cache"),
+                        help="Folder of cached golden responses for the key check")
+    parser.add_argument("--results", type=Path, default=Path("results/sensitization_attack_results.csv"))
+    args = parser.parse_args(argv)
+
+    result = attack(args.locked, args.original, seed=args.seed, golden_cache=args.golden_cache,
+                    pattern_words=args.pattern_words, samples=args.samples, max_rounds=args.max_rounds)
+
+    args.results.parent.mkdir(parents=True, exist_ok=True)
+    new_file = not args.results.exists()
+    with open(args.results, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(RESULTS_HEADER)
+        writer.writerow([
+            args.original.name, str(args.locked), len(result["key"]), result["runtime"],
+            result["resolved"], result["queries"], result["error_rate"], result["key_correct"],
+        ])
+
+    print(f"key={result['key']}")
+    if result["unresolved"]:
+        print(f"candidate={result['candidate']}")
+    print(f"resolved={result['resolved']}/{len(result['key'])}; queries={result['queries']}; "
+          f"error_rate={result['error_rate']}; runtime={result['runtime']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tools.utils.netlist import parse_netlist, write_netlist, propagate_constants
+from tools.utils.simulate import compile_netlist, signal_probabilities
+from tools.utils import parallel_sim
+from tools.utils.golden_cache import GoldenCache, error_rate
+
+"""
+Signal-probability-skew (SPS) removal attack
+- One bit-parallel simulation pass gives the probability of every net
+- Key-dependent nets with extreme skew (Anti-SAT `antisat_out`, CAC `flip`,
+  SARLock `FLIP`) are ranked, most skewed first and deepest among equals
+- The top candidate is tied to its dominant value and the netlist is
+  re-synthesized by constant propagation; the attack succeeds when no key
+  input is left. The error rate against the original measures removal resistance.
+Results are appended to results/sps_attack_results.csv
+"""
+
+RESULTS_HEADER = [
+    "Circuit", "Locked File", "Key Size", "Candidate", "Skew", "Removal Runtime (s)",
+    "Key Inputs Left", "Error Rate", "Removed",
+]
+
+
+def rank_candidates(locked, compiled, probs, min_skew):
+    """
+    Key-dependent nets with |p - 0.5| >= min_skew, most skewed first; depth
+    only breaks ties, so a deep net on an output path that just passes
+    min_skew does not beat the flip signal.
+    """
+    tainted = set(locked.key_inputs)
+    for name in locked.topological_order():
+        if any(f in tainted for f in locked.gates[name][1]):
+            tainted.add(name)
+    ranked = []
+    for name in tainted:
+        if name not in locked.gates:
+            continue
+        idx = compiled.index[name]
+        skew = probs[idx] - 0.5
+        if abs(skew) >= min_skew:
+            ranked.append((name, float(skew), int(compiled.level[idx])))
+    ranked.sort(key=lambda c: (-abs(c[1]), -c[2], c[0]))
+    return ranked
+
+
+def sps_attack(locked_path, original_path=None, n_words=64, min_skew=0.45, tries=8, seed=0, workers=1, cache=None):
+    start = time.time()
+    rng = np.random.default_rng(seed)
+    locked = parse_netlist(locked_path)
+    compiled = compile_netlist(locked)
+    if workers > 1:
+        probs = parallel_sim.signal_probabilities(compiled, n_words, seed, workers)
+    else:
+        probs = signal_probabilities(compiled, n_words, rng)
+    ranked = rank_candidates(locked, compiled, probs, min_skew)
+
+    best = None
+    for name, skew, _ in ranked[:tries]:
+        removed = propagate_constants(locked, {name: int(skew > 0)})
+        left = len(removed.key_inputs)
+        if best is None or left < best[3]:
+            best = (name, skew, removed, left)
+        if left == 0:
+            break
+    runtime = round(time.time() - start, 3)
+
+    result = {"ranked": ranked, "runtime": runtime, "candidate": None, "skew": None,
+              "netlist": None, "keys_left": len(locked.key_inputs), "error_rate": None}
+    if best is not None:
+        result.update(candidate=best[0], skew=best[1], netlist=best[2], keys_left=best[3])
+        if original_path is not None:
+            result["error_rate"] = error_rate(compile_netlist(best[2]), original_path, n_words, seed, cache=cache)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--locked", type=Path, required=True)
+    parser.add_argument("--original", type=Path, default=None,
+                        help="Original design, to measure the error rate after removal")
+    parser.add_argument("--patterns", type=int, default=64, help="Random patterns, in units of 64")
+    parser.add_argument("--min-skew", "--min_skew", type=float, default=0.45)
+    parser.add_argument("--tries", type=int, default=8, help="Candidates to attempt removal with")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--golden-cache", type=Path, default=Path("results/golden_cache"),
+                        help="Folder of cached original-design responses")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for the probability pass (pattern-parallel, shared memory)")
+    parser.add_argument("--output-path", "--output_path", type=Path, default=Path("locked_circuits/sps"))
+    parser.add_argument("--results", type=Path, default=Path("results/sps_attack_results.csv"))
+    args = parser.parse_args(argv)
+
+    locked = parse_netlist(args.locked)
+    result = sps_attack(args.locked, args.original, args.patterns, args.min_skew, args.tries, args.seed, args.workers,
+                        GoldenCache(args.golden_cache))
+
+    for name, skew, level in result["ranked"][:10]:
+        print(f"{name:30s} skew={skew:+.4f} level={level}")
+    removed = result["candidate"] is not None and result["keys_left"] == 0
+    if result["netlist"] is not None:
+        out_file = args.output_path / f"{args.locked.stem}_SPS_removed.bench"
+        write_netlist(result["netlist"], out_file)
+        print(f"Removed block at {result['candidate']}, {result['keys_left']} key inputs left, "
+              f"error rate {result['error_rate']}: {out_file}")
+    else:
+        print("No skewed key-dependent net found")
+    print(f"SPS attack time: {result['runtime']}s")
+
+    args.results.parent.mkdir(parents=True, exist_ok=True)
+    new_file = not args.results.exists()
+    with open(args.results, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(RESULTS_HEADER)
+        writer.writerow([
+            args.original.name if args.original else "", str(args.locked), len(locked.key_inputs),
+            result["candidate"], result["skew"], result["runtime"], result["keys_left"],
+            result["error_rate"], "YES" if removed else "NO",
+        ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+# The scripts import each other by module name, as when run from scripts/
+sys.path[:0] = [str(ROOT), str(ROOT / "scripts")]
@@ -0,0 +1,30 @@
+import csv
+import json
+from pathlib import Path
+
+import autoparallel_sat_attack as campaign
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_sensitization_campaign_writes_rows(tmp_path, monkeypatch):
+    # Lock workers are forked before any design is published to shared memory
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(campaign, "LOCKED_FOLDER", str(tmp_path / "locked"))
+    monkeypatch.setattr(campaign, "RESULTS_FOLDER", str(tmp_path))
+    monkeypatch.setattr(campaign, "results_file", str(tmp_path / "results.csv"))
+    monkeypatch.setattr(campaign, "log_file", str(tmp_path / "campaign.log"))
+    config = tmp_path / "circuits.json"
+    config.write_text(json.dumps({"circuits": [{"name": "c432", "file": "c432.bench", "key_sizes": [16]}],
+                                  "iterations": 1}))
+
+    campaign.main(["--tools-dir", str(ROOT / "benchmarks" / "stubs"), "--no-report", "--sensitization",
+                   "--lock-workers", "2", "--config", str(config), "--events", str(tmp_path / "events.jsonl"),
+                   "--store", str(tmp_path / "results.db"), "--golden-cache", str(tmp_path / "golden")])
+
+    with open(tmp_path / "results.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == campaign.RESULTS_HEADER + campaign.SENSITIZATION_HEADER
+    assert len(rows) == 2
+    assert rows[1][0] == "c432.bench" and rows[1][5] == "YES"
+    assert rows[1][7] in ("YES", "NO", "PARTIAL")
@@ -0,0 +1,38 @@
+import asyncio
+import subprocess
+import sys
+import time
+
+from tools.utils.runner import _reap, _terminate, run_stage
+
+# Exits 0.3s after SIGTERM, inside the kill grace period
+LINGER = "import signal, sys, time; signal.signal(signal.SIGTERM, lambda *a: (time.sleep(0.3), sys.exit(3))); " \
+         "print('started', flush=True); time.sleep(30)"
+
+
+def zombie(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        return f.read().rsplit(")", 1)[1].split()[0] == "Z"
+
+
+def test_timeout_child_exits_during_grace():
+    output, runtime, returncode, usage = asyncio.run(run_stage([sys.executable, "-c", LINGER], timeout=0.5))
+    assert returncode is None
+    assert output == "started"
+    assert runtime < 5
+    assert usage["cpu_time"] >= 0
+
+
+def test_terminate_child_that_exited_before_reaper_ran():
+    async def scenario():
+        proc = subprocess.Popen([sys.executable, "-c", "pass"])
+        reaper = asyncio.ensure_future(_reap(proc))
+        # The child exits while the loop is blocked, so the reaper has not seen it yet
+        while not zombie(proc.pid):
+            time.sleep(0.01)
+        await _terminate(proc, reaper)
+        return proc.returncode, reaper.result()
+
+    returncode, usage = asyncio.run(scenario())
+    assert returncode == 0
+    assert "cpu_time" in usage
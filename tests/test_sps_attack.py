@@ -0,0 +1,27 @@
+from sps_attack import sps_attack
+from tools.utils.golden_cache import GoldenCache
+
+# o = AND(d4, a5), d4 = AND(a0..a4). The lock XORs d4 with `flip`, which is 1
+# only when all eight key gates see a 1 (p = 1/256). The key-dependent `o` is
+# deeper than `flip` and also passes min_skew (p = 1/64), but tying it to 0
+# would remove the output logic, not the lock.
+GATES = ["d1 = AND(a0, a1)", "d2 = AND(d1, a2)", "d3 = AND(d2, a3)", "d4 = AND(d3, a4)"]
+ORIGINAL = [f"INPUT(a{i})" for i in range(8)] + ["OUTPUT(o)"] + GATES + ["o = AND(d4, a5)"]
+LOCKED = (["#key=11111111"] + [f"INPUT(a{i})" for i in range(8)] + [f"INPUT(keyinput{i})" for i in range(8)]
+          + ["OUTPUT(o)"] + GATES + [f"x{i} = XNOR(a{i}, keyinput{i})" for i in range(8)]
+          + ["flip = AND(" + ", ".join(f"x{i}" for i in range(8)) + ")", "t = XOR(d4, flip)", "o = AND(t, a5)"])
+
+
+def test_most_skewed_net_beats_deeper_one(tmp_path):
+    original, locked = tmp_path / "original.bench", tmp_path / "locked.bench"
+    original.write_text("\n".join(ORIGINAL) + "\n")
+    locked.write_text("\n".join(LOCKED) + "\n")
+
+    result = sps_attack(locked, original, n_words=64, min_skew=0.45, tries=1,
+                        cache=GoldenCache(tmp_path / "golden"))
+
+    names = [name for name, _, _ in result["ranked"]]
+    assert "o" in names and names.index("flip") < names.index("o")
+    assert result["candidate"] == "flip"
+    assert result["keys_left"] == 0
+    assert result["error_rate"] == 0
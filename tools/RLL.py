@@ -1,8 +1,13 @@
 import argparse
 import subprocess
 import os
+import sys
+from pathlib import Path
 from utils import parse_bench_file, defining_keyinputs, insert_key_gates, write_list_to_file
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tools.utils.profiling import NULL, current, profiled, add_profile_argument
+
 def run_command(original_circuit, encrypted_circuit, key):
     # command = f"./lcmp {original_circuit} {encrypted_circuit} key={key}"
     command = f"{os.path.dirname(__file__)}/lcmp {original_circuit} {encrypted_circuit} key={key}"
@@ -14,46 +19,58 @@ def run_command(original_circuit, encrypted_circuit, key):
         print(f"Error executing command: {command}\n{e}")
 
 def run(bench_path: str, key: list, save_path: str):
-    inputs, outputs, gates, existing_key_inputs = parse_bench_file(bench_path)
+    prof = current()
+    with prof.phase("parse"):
+        inputs, outputs, gates, existing_key_inputs = parse_bench_file(bench_path)
+    prof.count("gates_parsed", len(gates))
     start_num = len(existing_key_inputs)  # Start numbering new keyinputs after existing ones
 
-    new_keyinput_list = defining_keyinputs(key, existing_key_inputs)
-    new_keyinput_labels = [ki.split("(")[1].split(")")[0] for ki in new_keyinput_list]
-    inputs.extend(new_keyinput_labels)
+    with prof.phase("transform"):
+        new_keyinput_list = defining_keyinputs(key, existing_key_inputs)
+        new_keyinput_labels = [ki.split("(")[1].split(")")[0] for ki in new_keyinput_list]
+        inputs.extend(new_keyinput_labels)
 
-    insert_key_gates(key, gates, start_num)
+        insert_key_gates(key, gates, start_num)
 
-    all_gates = [f"INPUT({i})" for i in inputs] + [f"OUTPUT({o})" for o in outputs] + gates
+        all_gates = [f"INPUT({i})" for i in inputs] + [f"OUTPUT({o})" for o in outputs] + gates
     
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    write_list_to_file(all_gates, save_path, key)
+    with prof.phase("write"):
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        write_list_to_file(all_gates, save_path, key)
+    prof.count("gates_emitted", len(gates))
+    if prof is not NULL:
+        # Only worth a stat() when profiling
+        prof.count("bytes_written", os.path.getsize(save_path))
 
-def parse_args():
+def parse_args(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument("--bench_path", type=str, required=True)
     parser.add_argument("--key", type=str, required=True)
     parser.add_argument("--save_path", type=str, required=True)
     parser.add_argument("--iter", type=int, default=1, help="Number of iterations to run the locking process")
-    args = parser.parse_args()
-    return args.bench_path, [int(k) for k in args.key], args.save_path, args.iter
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    return args.bench_path, [int(k) for k in args.key], args.save_path, args.iter, args.profile
 
-def main():
-    bench_path, key, save_path_base, iterations = parse_args()
+def main(argv=None):
+    bench_path, key, save_path_base, iterations, profile = parse_args(argv)
 
     base_name, extension = save_path_base.rsplit(".", 1)
     key_str = ''.join(str(k) for k in key)
 
     # for i in range(iterations):
     #     save_path = f"{base_name}_{i}.{extension}"
-    for i in range(iterations):
-        if iterations == 1:
-            save_path = f"{base_name}.{extension}"
-        else:
-            save_path = f"{base_name}_{i}.{extension}"
-
-        run(bench_path, key, save_path)
-        # Run the command after each benchmark file is written
-        run_command(bench_path, save_path, key_str)
+    with profiled(profile, "RLL") as prof:
+        for i in range(iterations):
+            if iterations == 1:
+                save_path = f"{base_name}.{extension}"
+            else:
+                save_path = f"{base_name}_{i}.{extension}"
+
+            run(bench_path, key, save_path)
+            # Run the command after each benchmark file is written
+            with prof.phase("lcmp"):
+                run_command(bench_path, save_path, key_str)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,152 @@
+"""
+Adaptive iteration counts for campaign cells (circuit x key size x scheme)
+- Every cell runs at least min_iterations; after that it keeps running only
+  while the 95% confidence interval of its attack time or DIP iteration count
+  is wider than the target (half-width relative to the mean), up to
+  max_iterations
+- The total number of tasks is capped by a budget (by default what the fixed
+  config would have run); tasks not needed by tight, cheap cells go to the
+  cells whose intervals are widest
+- The scheduler is an async task source for the pipeline: it hands out a task
+  when the pipeline has room, and waits for results when every open cell
+  already has enough tasks in flight
+"""
+
+import asyncio
+import math
+
+# Two-sided 95% Student t quantiles for 1..30 degrees of freedom
+T95 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+       2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+       2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+Z95 = 1.960
+METRICS = ("sat_time", "iterations")
+
+
+def t95(df):
+    return T95[df - 1] if df <= len(T95) else Z95
+
+
+class RunningStats:
+    """Welford mean/variance."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else float("inf")
+
+    def relative_width(self):
+        """95% CI half-width over the mean (inf until there are two samples)."""
+        if self.n < 2:
+            return float("inf")
+        if self.mean == 0:
+            return 0.0 if self.m2 == 0 else float("inf")
+        return t95(self.n - 1) * self.std / math.sqrt(self.n) / abs(self.mean)
+
+    def required(self, target):
+        """Samples needed for a relative half-width of `target`, at the current spread."""
+        if self.n < 2:
+            return float("inf")
+        if self.mean == 0:
+            return self.n
+        return (Z95 * self.std / (target * abs(self.mean))) ** 2
+
+
+class Cell:
+    def __init__(self, template):
+        self.template = template
+        self.stats = {m: RunningStats() for m in METRICS}
+        self.issued = 0
+        self.finished = 0
+
+    @property
+    def in_flight(self):
+        return self.issued - self.finished
+
+    def width(self):
+        widths = [s.relative_width() for s in self.stats.values() if s.n]
+        return max(widths) if widths else float("inf")
+
+    def wanted(self, min_iterations, max_iterations, target):
+        """Total tasks this cell should get, given what it has seen so far."""
+        if self.finished < min_iterations:
+            return min_iterations
+        if not any(s.n for s in self.stats.values()):
+            # Only failures so far; more runs will not tighten anything
+            return self.finished
+        if self.width() <= target:
+            return self.finished
+        need = max(s.required(target) for s in self.stats.values() if s.n)
+        if need == float("inf"):
+            return min(max_iterations, self.finished + 1)
+        return min(max_iterations, max(self.finished + 1, math.ceil(need)))
+
+
+class AdaptiveScheduler:
+    def __init__(self, templates, min_iterations=3, max_iterations=30, target=0.1, budget=None):
+        """`templates` are task dicts for each cell; `iteration` is filled in per task."""
+        self.cells = [Cell(t) for t in templates]
+        self.min_iterations = min_iterations
+        self.max_iterations = max_iterations
+        self.target = target
+        self.budget = budget if budget is not None else max_iterations * len(self.cells)
+        self.issued = 0
+        self._changed = asyncio.Event()
+
+    def _next_cell(self):
+        """Open cell with room for another task: unfinished minimums first, then widest interval."""
+        best, best_key = None, None
+        for cell in self.cells:
+            wanted = cell.wanted(self.min_iterations, self.max_iterations, self.target)
+            if cell.issued >= wanted:
+                continue
+            key = (cell.finished >= self.min_iterations, -cell.width(), cell.issued)
+            if best is None or key < best_key:
+                best, best_key = cell, key
+        return best
+
+    def record(self, task, failed=False):
+        """Feed back a finished (or failed) task."""
+        cell = task["cell"]
+        cell.finished += 1
+        if not failed:
+            for m in METRICS:
+                if task.get(m) is not None:
+                    cell.stats[m].add(float(task[m]))
+        self._changed.set()
+
+    def __aiter__(self):
+        return self._tasks()
+
+    async def _tasks(self):
+        while self.issued < self.budget:
+            cell = self._next_cell()
+            if cell is None:
+                if not any(c.in_flight for c in self.cells):
+                    return
+                # Every open cell has enough in flight; wait for a result to decide
+                self._changed.clear()
+                await self._changed.wait()
+                continue
+            task = dict(cell.template, iteration=cell.issued, cell=cell)
+            cell.issued += 1
+            self.issued += 1
+            yield task
+
+    def summary(self):
+        return [
+            {**{k: v for k, v in c.template.items() if k != "bench_file"}, "runs": c.finished,
+             **{f"{m}_mean": round(c.stats[m].mean, 3) for m in METRICS},
+             **{f"{m}_ci": round(c.stats[m].relative_width(), 3) for m in METRICS}}
+            for c in self.cells
+        ]
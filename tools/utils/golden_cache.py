@@ -0,0 +1,152 @@
+"""
+On-disk cache of golden (original design) responses to random pattern sets
+- A pattern set is (seed, n_words): 64 * n_words random patterns over the
+  design's inputs in declaration order, drawn with default_rng(seed), so any
+  tool can regenerate the inputs and only the outputs need storing
+- Entries are .npy files of packed output words (n_outputs x n_words uint64)
+  named by the SHA-256 of the design file's content plus seed and size, so
+  renamed or copied designs share entries and edited ones do not
+- Entries are written to a temporary file and renamed into place, and read
+  back memory-mapped, so any number of tools and worker processes can share
+  one cache folder
+- A hit refreshes the entry's mtime; after every write the least recently
+  used entries are deleted until the folder fits the disk budget
+- Users: the SPS attack's error rate, the sensitization attack's key check,
+  and the campaign's verify stage, which screens a recovered key against the
+  cached responses before running lcmp
+"""
+
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from .netlist import parse_netlist
+from .simulate import assign_inputs, compile_netlist, constant_words, popcount, random_words, simulate
+
+DEFAULT_FOLDER = Path("results/golden_cache")
+DEFAULT_BUDGET = 1 << 30  # bytes
+
+
+@lru_cache(maxsize=256)
+def _hash(path, mtime_ns, size):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def design_hash(path):
+    """SHA-256 of a design file, computed once per process for an unchanged file."""
+    st = os.stat(path)
+    return _hash(str(path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=64)
+def _ports(path, mtime_ns):
+    original = parse_netlist(path)
+    return tuple(original.inputs), tuple(original.outputs)
+
+
+def ports(path):
+    """(inputs, outputs) of a design in declaration order, the order of the pattern and response rows."""
+    return _ports(str(path), os.stat(path).st_mtime_ns)
+
+
+def pattern_words(n_inputs, seed, n_words):
+    """Input words (n_inputs x n_words) of the pattern set (seed, n_words)."""
+    return random_words(n_inputs, n_words, np.random.default_rng(seed))
+
+
+class GoldenCache:
+    def __init__(self, folder=DEFAULT_FOLDER, budget=DEFAULT_BUDGET):
+        self.folder = Path(folder)
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+
+    def entry(self, design_path, seed, n_words):
+        return self.folder / f"{design_hash(design_path)}_s{seed}_w{n_words}.npy"
+
+    def responses(self, design_path, seed, n_words):
+        """Output words of the original at `design_path` for the pattern set (seed, n_words), memory-mapped."""
+        path = self.entry(design_path, seed, n_words)
+        try:
+            words = np.load(path, mmap_mode="r")
+            os.utime(path)
+            self.hits += 1
+            return words
+        except (FileNotFoundError, ValueError):
+            pass
+        self.misses += 1
+        original = compile_netlist(parse_netlist(design_path))
+        values = simulate(original, pattern_words(len(original.input_names), seed, n_words))
+        self._store(path, values[original.outputs])
+        return np.load(path, mmap_mode="r")
+
+    def _store(self, path, words):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.ascontiguousarray(words))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.evict(keep=path)
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the folder fits the budget."""
+        entries = []
+        for path in self.folder.glob("*.npy"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.budget:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def size(self):
+        return sum(p.stat().st_size for p in self.folder.glob("*.npy"))
+
+
+def error_rate(compiled, original_path, n_words, seed=0, fixed=None, cache=None):
+    """
+    Fraction of the pattern set (seed, n_words) on which any output of
+    `compiled` differs from the cached golden responses of the original.
+    Inputs the original does not have (key inputs) take their bit from `fixed`.
+    """
+    cache = cache or GoldenCache()
+    golden = cache.responses(original_path, seed, n_words)
+    inputs, outputs = ports(original_path)
+    rand = dict(zip(inputs, pattern_words(len(inputs), seed, n_words)))
+    fixed = fixed or {}
+    named = {n: rand[n] if n in rand else constant_words(fixed.get(n, 0), n_words) for n in compiled.input_names}
+    values = simulate(compiled, assign_inputs(compiled, named, n_words))
+    wrong = np.zeros(n_words, dtype=np.uint64)
+    for row, name in enumerate(outputs):
+        if name in compiled.index:
+            wrong |= values[compiled.index[name]] ^ golden[row]
+    return popcount(wrong) / (n_words * 64)
+
+
+def key_error_rate(locked_path, original_path, key, n_words=16, seed=0, cache=None):
+    """error_rate() of a locked file with the bits of `key` on its key inputs, in declaration order."""
+    locked = parse_netlist(locked_path)
+    fixed = dict(zip(locked.key_inputs, (int(b) for b in key)))
+    return error_rate(compile_netlist(locked), original_path, n_words, seed, fixed, cache)
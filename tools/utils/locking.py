@@ -0,0 +1,274 @@
+"""
+Shared plumbing for the point-function locking generators (SARLock, Anti-SAT,
+CAC and their TroLL variants)
+- Every generator is a transform(inputs, outputs, gates, keysize) ->
+  (key, key_inputs, logic); parsing, target replacement and writing live here
+- SARLock, Anti-SAT and CAC also take `targets`: every listed output is
+  XOR-tapped off one shared comparator/flip network (select_targets picks
+  outputs by name, "all", or the fan-out cone of a net)
+- Locked files are rendered to one string and written with a single call
+- lock_design() makes many variants (scheme x key size x seed) of a design
+  from one parse; batch_lock() spreads designs over a process pool and
+  returns manifest rows for the attack stages
+- GateBuilder emits the comparator and DTL trees: multi-input gates up to
+  MAX_FANIN, minimum gate count at minimum depth, identical gates emitted
+  once, and comparisons against known bits as literals instead of XNORs
+  with constant nets
+"""
+
+import csv
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .netlist import BASE_GATES, COMMUTATIVE, INVERTED, netlist_stats, parse_gate
+from .profiling import current
+
+MANIFEST_COLUMNS = ["file", "design", "scheme", "key_size", "seed", "key", "gates_original", "gates_locked"]
+# Widest gate the lock logic uses; the ISCAS/ITC designs in data/ go up to 8 inputs
+MAX_FANIN = 8
+
+
+class GateBuilder:
+    """Collects lock logic as .bench lines; wires are named `<prefix>_<n>`."""
+
+    def __init__(self, prefix, max_fanin=MAX_FANIN):
+        self.prefix = prefix
+        self.max_fanin = max_fanin
+        self.logic = []
+        self._seen = {}
+
+    def gate(self, gate_type, fanins, name=None):
+        """Output wire of `gate_type(fanins)`; an identical unnamed gate is reused."""
+        key = (gate_type, tuple(sorted(fanins)) if gate_type in COMMUTATIVE else tuple(fanins))
+        if name is None:
+            if key in self._seen:
+                return self._seen[key]
+            name = f"{self.prefix}_{len(self.logic)}"
+            self._seen[key] = name
+        self.logic.append(f"{name} = {gate_type}({', '.join(fanins)})")
+        return name
+
+    def tree(self, gate_type, terms, name=None):
+        """
+        `gate_type` over all `terms` (AND, OR, NAND or NOR) as a balanced tree:
+        ceil((n-1)/(f-1)) gates in ceil(log_f n) levels. Inverting types only
+        invert at the root.
+        """
+        base, invert = BASE_GATES[gate_type]
+        terms = list(terms)
+        if len(terms) == 1:
+            if invert:
+                return self.gate("NOT", terms, name)
+            return self.gate("BUF", terms, name) if name else terms[0]
+        f = self.max_fanin
+        while len(terms) > f:
+            # Shrink to exactly f**(depth-1) terms, so every later level is full
+            cap = 1
+            while cap * f < len(terms):
+                cap *= f
+            excess = len(terms) - cap
+            gates = -(-excess // (f - 1))
+            sizes = [excess - (gates - 1) * (f - 1) + 1] + [f] * (gates - 1)
+            merged, start = [], 0
+            for size in sizes:
+                merged.append(self.gate(base, terms[start:start + size]))
+                start += size
+            terms = merged + terms[start:]
+        return self.gate(INVERTED[base] if invert else base, terms, name)
+
+    def literals(self, wires, bits):
+        """Terms whose AND is 1 iff `wires` carry `bits`: the 1-bit wires and one NOR of the 0-bit wires."""
+        ones = [w for w, b in zip(wires, bits) if b == "1"]
+        zeros = [w for w, b in zip(wires, bits) if b != "1"]
+        return ones + ([self.tree("NOR", zeros)] if zeros else [])
+
+
+def parse_bench(path):
+    with open(path, 'r') as f:
+        lines = [line.strip() for line in f if line.strip()]
+    inputs, outputs, gates = [], [], []
+    for line in lines:
+        if line.startswith("INPUT("):
+            inputs.append(line.split("(")[1].split(")")[0])
+        elif line.startswith("OUTPUT("):
+            outputs.append(line.split("(")[1].split(")")[0])
+        else:
+            gates.append(line)
+    return inputs, outputs, gates
+
+
+def replace_target(gates, target):
+    """Rename the driver of `target` to `<target>_enc` so the lock logic can drive `target`."""
+    return replace_targets(gates, [target])
+
+
+def replace_targets(gates, targets):
+    """replace_target() for several nets in one pass over the gates."""
+    targets = set(targets)
+    new_gates = []
+    for line in gates:
+        name, eq, rhs = line.partition("=")
+        if eq and name.strip() in targets:
+            new_gates.append(f"{name.strip()}_enc = {rhs.strip()}")
+        else:
+            new_gates.append(line)
+    return new_gates
+
+
+def cone_outputs(outputs, gates, net):
+    """Primary outputs in the transitive fan-out of `net`, in output order."""
+    fanout = {}
+    for line in gates:
+        if "=" in line and not line.startswith("#"):
+            name, _, fanins = parse_gate(line)
+            for f in fanins:
+                fanout.setdefault(f, []).append(name)
+    reached, stack = {net}, [net]
+    while stack:
+        for succ in fanout.get(stack.pop(), ()):
+            if succ not in reached:
+                reached.add(succ)
+                stack.append(succ)
+    return [o for o in outputs if o in reached]
+
+
+def select_targets(outputs, gates, names=None, cone=None):
+    """
+    Outputs to lock: `names` ("all" for every output), the outputs in the
+    fan-out cone of `cone`, or by default the first output.
+    """
+    if cone is not None:
+        targets = cone_outputs(outputs, gates, cone)
+        if not targets:
+            raise ValueError(f"No outputs in the fan-out cone of '{cone}'")
+    elif names in (None, []):
+        targets = outputs[:1]
+    elif names == ["all"]:
+        targets = list(outputs)
+    else:
+        unknown = [n for n in names if n not in outputs]
+        if unknown:
+            raise ValueError(f"Not primary outputs: {unknown}")
+        targets = list(dict.fromkeys(names))
+    driven = {line.partition("=")[0].strip() for line in gates if "=" in line}
+    undriven = [t for t in targets if t not in driven]
+    if undriven:
+        raise ValueError(f"Outputs not driven by a gate cannot be locked: {undriven}")
+    return targets
+
+
+def add_target_arguments(parser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--outputs", nargs="+", default=None, metavar="NET",
+                       help="Outputs to lock through one shared flip signal ('all' for every output; "
+                            "default: the first output)")
+    group.add_argument("--cone", default=None, metavar="NET",
+                       help="Lock every output in the fan-out cone of NET")
+
+
+def bench_text(key, inputs, key_inputs, outputs, logic):
+    lines = [f"#key={key}"]
+    lines += [f"INPUT({i})" for i in inputs]
+    lines += [f"INPUT({k})" for k in key_inputs]
+    lines += [f"OUTPUT({o})" for o in outputs]
+    lines += logic
+    lines.append("")
+    return "\n".join(lines)
+
+
+def write_bench(out_path, key, inputs, key_inputs, outputs, logic):
+    """Write a locked netlist in one call; returns the bytes written."""
+    data = bench_text(key, inputs, key_inputs, outputs, logic).encode()
+    with open(out_path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def lock_file(transform, bench_path, keysize, out_file, targets=None, cone=None):
+    """
+    Parse, lock with `transform` and write one file; returns the key.
+    `targets`/`cone` pick the outputs to lock (see select_targets), for
+    transforms that take a `targets` argument.
+    """
+    prof = current()
+    with prof.phase("parse"):
+        inputs, outputs, gates = parse_bench(bench_path)
+    prof.count("gates_parsed", len(gates))
+    options = {}
+    if targets is not None or cone is not None:
+        options["targets"] = select_targets(outputs, gates, targets, cone)
+        prof.count("outputs_locked", len(options["targets"]))
+    with prof.phase("transform"):
+        key, key_inputs, logic = transform(inputs, outputs, gates, keysize, **options)
+    with prof.phase("write"):
+        size = write_bench(out_file, key, inputs, key_inputs, outputs, logic)
+    prof.count("gates_emitted", len(logic))
+    prof.count("bytes_written", size)
+    return key
+
+
+def variant_name(bench_path, label, key_size, seed):
+    return f"{Path(bench_path).stem}_{label}_k_{key_size}_s{seed}.bench"
+
+
+def lock_design(bench_path, variants, schemes, out_dir):
+    """
+    Every (scheme, key_size, seed) in `variants` for one design, parsed once.
+    `schemes` maps scheme -> (label, transform). Returns manifest rows; their
+    gate counts come from netlist_stats, as parse_bench keeps comment lines.
+    """
+    prof = current()
+    with prof.phase("parse"):
+        inputs, outputs, gates = parse_bench(bench_path)
+    prof.count("gates_parsed", len(gates))
+    gates_original = netlist_stats(bench_path)["gates"]
+    rows = []
+    for scheme, key_size, seed in variants:
+        label, transform = schemes[scheme]
+        random.seed(seed)
+        with prof.phase("transform"):
+            key, key_inputs, logic = transform(inputs, outputs, gates, key_size)
+        out_file = os.path.join(out_dir, variant_name(bench_path, label, key_size, seed))
+        with prof.phase("write"):
+            size = write_bench(out_file, key, inputs, key_inputs, outputs, logic)
+        prof.count("gates_emitted", len(logic))
+        prof.count("bytes_written", size)
+        rows.append({"file": out_file, "design": Path(bench_path).stem, "scheme": scheme, "key_size": key_size,
+                     "seed": seed, "key": key, "gates_original": gates_original,
+                     "gates_locked": netlist_stats(out_file)["gates"]})
+    return rows
+
+
+def bench_files(paths):
+    """.bench files named directly or found in directories, in order."""
+    files = []
+    for path in map(Path, paths):
+        files += sorted(path.glob("*.bench")) if path.is_dir() else [path]
+    return files
+
+
+def batch_lock(designs, schemes, variants, out_dir, workers=None):
+    """
+    Lock every design in every variant across a process pool. Each design's
+    variants are split into a few chunks so a small batch still uses every
+    worker; each chunk parses its design once. Returns all manifest rows.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+    chunks = max(1, min(len(variants), workers // max(len(designs), 1)))
+    jobs = [(str(design), variants[i::chunks]) for design in designs for i in range(chunks)]
+    if workers == 1:
+        return [row for design, part in jobs for row in lock_design(design, part, schemes, out_dir)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(lock_design, design, part, schemes, out_dir) for design, part in jobs]
+        return [row for future in futures for row in future.result()]
+
+
+def write_manifest(rows, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=MANIFEST_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,257 @@
+"""
+MERO-style N-detect test generation for hardware Trojan detection
+- Rare nets: gate nets that take one value with probability below `theta`
+  under random inputs (bit-parallel random simulation); that value is the
+  net's rare value. Trojan triggers built from such nets seldom fire under
+  random testing
+- Each round draws a batch of 64 * batch_words random patterns and
+  hill-climbs all of them at once, MERO-style: one input at a time is
+  flipped in every pattern, only that input's fan-out cone is re-simulated,
+  and the flip is kept in the patterns where it raises the number of
+  still-needed rare nets at their rare value
+- The batch is then scanned best-first; a pattern joins the test set if it
+  drives some rare net to its rare value that has not been there N times yet
+- A reverse-order pass drops patterns whose rare hits all stay covered N
+  times (or as often as the whole set manages) without them
+- Detection: the test set is simulated once on the original, and every
+  Trojan variant is evaluated as an Overlay on that simulation, so only the
+  Trojan's own logic is simulated per variant. A variant is detected when
+  any output of the original differs on any test pattern
+"""
+
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .netlist import parse_netlist
+from .overhead import pair_with_originals, variant_of
+from .shared_netlist import Overlay
+from .simulate import compile_netlist, evaluate, random_words, signal_probabilities, simulate
+
+THETA = 0.1
+N_DETECT = 10
+COLUMNS = ["design", "inputs", "gates", "rare_nets", "n_detect", "rare_covered", "patterns",
+           "trojans", "detected", "coverage_pct", "random_detected", "random_coverage_pct",
+           "generation_s", "detection_s", "errors"]
+
+
+def rare_nets(compiled, theta=THETA, n_words=256, rng=None):
+    """(net indices, rare values) of the gate nets at one value with probability below `theta`."""
+    p = signal_probabilities(compiled, n_words, rng or np.random.default_rng(0))
+    gates = np.arange(compiled.first_gate, compiled.n_nets)
+    ones, zeros = p[gates] < theta, p[gates] > 1 - theta
+    rare = ones | zeros
+    return gates[rare], ones[rare]
+
+
+def rare_hits(values, nets, rare):
+    """Words with a 1 wherever each of `nets` is at its rare value."""
+    words = values[nets]
+    return np.where(rare[:, None], words, ~words)
+
+
+def unpack(words):
+    """(rows x n_words) uint64 -> (rows x 64*n_words) bool; pattern p is bit p % 64 of word p // 64."""
+    return np.unpackbits(np.ascontiguousarray(words).view(np.uint8), axis=-1, bitorder="little").astype(bool)
+
+
+def pack(bits):
+    """(rows x n) bool -> (rows x ceil(n/64)) uint64 words, zero padded."""
+    n_words = -(-bits.shape[1] // 64)
+    padded = np.zeros((bits.shape[0], n_words * 64), dtype=bool)
+    padded[:, :bits.shape[1]] = bits
+    return np.packbits(padded, axis=1, bitorder="little").view(np.uint64)
+
+
+class NDetect:
+    """Builds a test set that drives every rare net of `compiled` to its rare value `n_detect` times."""
+
+    def __init__(self, compiled, n_detect=N_DETECT, theta=THETA, seed=0, prob_words=256):
+        self.compiled = compiled
+        self.n_detect = n_detect
+        self.rng = np.random.default_rng(seed)
+        self.nets, self.rare = rare_nets(compiled, theta, prob_words, self.rng)
+        self.counts = np.zeros(len(self.nets), dtype=np.int64)
+        self.tests = []  # accepted patterns, one bool row per pattern in input order
+        self._cones = {}
+
+    def _scores(self, values, need):
+        """Per pattern: how many still-needed rare nets it drives to their rare value."""
+        return unpack(rare_hits(values, self.nets[need], self.rare[need])).sum(axis=0)
+
+    def _cone(self, net):
+        if net not in self._cones:
+            self._cones[net] = self.compiled.groups_for(self.compiled.fanout_gates([net]))
+        return self._cones[net]
+
+    def _climb(self, words, values, need, flips):
+        """Bit-flip hill climbing of every pattern in the batch at once; updates words and values in place."""
+        scores = self._scores(values, need)
+        for row in self.rng.permutation(len(words))[:flips]:
+            net = int(self.compiled.inputs[row])
+            trial = values.copy()
+            trial[net] = ~trial[net]
+            evaluate(trial, self._cone(net))
+            new = self._scores(trial, need)
+            better = new > scores
+            if better.any():
+                mask = pack(better[None])[0]
+                words[row] ^= mask
+                values ^= (values ^ trial) & mask
+                scores = np.where(better, new, scores)
+        return scores
+
+    def round(self, batch_words=16, flips=32):
+        """Climb one random batch and add the patterns that still help; returns how many were added."""
+        need = self.counts < self.n_detect
+        words = random_words(len(self.compiled.inputs), batch_words, self.rng)
+        values = simulate(self.compiled, words)
+        scores = self._climb(words, values, need, flips)
+        hits = unpack(rare_hits(values, self.nets, self.rare))
+        patterns = unpack(words).T
+        added = 0
+        for p in np.argsort(-scores, kind="stable"):
+            if scores[p] == 0:
+                break
+            if (hits[:, p] & (self.counts < self.n_detect)).any():
+                self.counts += hits[:, p]
+                self.tests.append(patterns[p])
+                added += 1
+        return added
+
+    def compact(self):
+        """Drop patterns, last added first, whose rare hits all stay at the target count without them."""
+        if not self.tests:
+            return
+        hits = unpack(rare_hits(simulate(self.compiled, self.words()), self.nets, self.rare))[:, :len(self.tests)]
+        counts = hits.sum(axis=1)
+        target = np.minimum(counts, self.n_detect)
+        keep = np.ones(len(self.tests), dtype=bool)
+        for p in range(len(self.tests) - 1, -1, -1):
+            hit = hits[:, p]
+            if (counts[hit] > target[hit]).all():
+                counts -= hit
+                keep[p] = False
+        self.tests = [t for t, k in zip(self.tests, keep) if k]
+        self.counts = counts
+
+    def run(self, batch_words=16, flips=32, max_rounds=50, patience=3):
+        """
+        Rounds until every rare net is covered N times, `patience` rounds in a
+        row add nothing, or `max_rounds`; then compact. Returns the test words.
+        """
+        idle = 0
+        for _ in range(max_rounds):
+            if (self.counts >= self.n_detect).all() or idle >= patience:
+                break
+            idle = 0 if self.round(batch_words, flips) else idle + 1
+        self.compact()
+        return self.words()
+
+    def words(self):
+        """The test set as input words (n_inputs x ceil(patterns/64)); padding bits are all-zero patterns."""
+        bits = np.array(self.tests, dtype=bool).T if self.tests else np.zeros((len(self.compiled.inputs), 0), bool)
+        return pack(bits)
+
+
+def detected(overlay, values, n_patterns):
+    """Whether any output of the original differs in the variant on the first `n_patterns` simulated patterns."""
+    new = overlay.extend(values)
+    base = overlay.base
+    diff = np.zeros(values.shape[1], dtype=np.uint64)
+    for name, net in zip(base.output_names, base.outputs):
+        diff |= new[overlay.index[name]] ^ values[net]
+    valid = pack(np.ones((1, n_patterns), dtype=bool))[0]
+    return bool((diff & valid).any())
+
+
+def coverage(compiled, test_sets, variants):
+    """
+    Variants detected by each test set ((words, n_patterns) pairs), and the
+    number of variants that could not be checked. Each variant is parsed once.
+    """
+    values = [simulate(compiled, words) for words, _ in test_sets]
+    hits, errors = [0] * len(test_sets), 0
+    for path in variants:
+        try:
+            overlay = Overlay(compiled, parse_netlist(path))
+        except (ValueError, KeyError):
+            errors += 1
+            continue
+        for i, (v, (_, n_patterns)) in enumerate(zip(values, test_sets)):
+            hits[i] += detected(overlay, v, n_patterns)
+    return hits, errors
+
+
+def evaluate_design(original_path, variants, n_detect=N_DETECT, theta=THETA, seed=0,
+                    batch_words=16, flips=32, max_rounds=50, tests_folder=None):
+    """
+    One report row (see COLUMNS): generate the N-detect set for a design and
+    run it, and as many random patterns for comparison, on its Trojan variants.
+    """
+    original = parse_netlist(original_path)
+    compiled = compile_netlist(original)
+    start = time.time()
+    engine = NDetect(compiled, n_detect, theta, seed)
+    words = engine.run(batch_words, flips, max_rounds)
+    n_patterns = len(engine.tests)
+    generation = time.time() - start
+
+    start = time.time()
+    baseline = random_words(len(compiled.inputs), max(words.shape[1], 1), np.random.default_rng(seed + 1))
+    (hits, random_hits), errors = coverage(compiled, [(words, n_patterns), (baseline, n_patterns)], variants)
+    detection = time.time() - start
+
+    if tests_folder is not None:
+        write_tests(Path(tests_folder) / f"{Path(original_path).stem}_mero_N{n_detect}.txt",
+                    original.inputs, engine.tests)
+    n = len(variants) - errors
+    return {
+        "design": Path(original_path).stem, "inputs": len(original.inputs), "gates": len(original.gates),
+        "rare_nets": len(engine.nets), "n_detect": n_detect,
+        "rare_covered": int((engine.counts >= n_detect).sum()), "patterns": n_patterns,
+        "trojans": len(variants), "detected": hits, "coverage_pct": round(100 * hits / n, 2) if n else None,
+        "random_detected": random_hits, "random_coverage_pct": round(100 * random_hits / n, 2) if n else None,
+        "generation_s": round(generation, 3), "detection_s": round(detection, 3), "errors": errors,
+    }
+
+
+def write_tests(path, inputs, tests):
+    """One pattern per line as 0/1 characters, in the order of the `# inputs` header line."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        f.write(f"# {' '.join(inputs)}\n")
+        for bits in tests:
+            f.write("".join("1" if b else "0" for b in bits) + "\n")
+
+
+def trojan_jobs(files, data_folder):
+    """{original path: [Trojan variant paths]} for the *_HT_trigger_* files whose design is in `data_folder`."""
+    pairs, _ = pair_with_originals(files, data_folder)
+    jobs = {}
+    for variant, original in pairs:
+        if variant_of(Path(variant).stem, Path(original).stem)[0] == "HT":
+            jobs.setdefault(original, []).append(variant)
+    return jobs
+
+
+def evaluate_all(jobs, workers=None, **options):
+    """Rows for every design in `jobs`, one design per task across a process pool."""
+    workers = min(workers or os.cpu_count() or 1, max(len(jobs), 1))
+    if workers == 1:
+        return [evaluate_design(original, variants, **options) for original, variants in jobs.items()]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(evaluate_design, original, variants, **options) for original, variants in jobs.items()]
+        return [future.result() for future in futures]
+
+
+def write_table(rows, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,292 @@
+"""
+Gate-level netlist helpers for .bench files
+- Parses original, locked and Trojan-infected designs into a gate graph
+- Transitive fan-in cones and key-dependence of outputs
+- Structural hashing to prove two output cones identical without simulation
+- Writes (reduced) netlists back out in the format sld/lcmp expect
+"""
+
+import os
+import re
+from pathlib import Path
+
+GATE_RE = re.compile(r"^\s*([^=\s]+)\s*=\s*([A-Za-z]+)\s*\((.*)\)\s*$")
+COMMUTATIVE = {"AND", "NAND", "OR", "NOR", "XOR", "XNOR"}
+# gate type -> (base function, inverted output)
+BASE_GATES = {
+    "AND": ("AND", False), "NAND": ("AND", True),
+    "OR": ("OR", False), "NOR": ("OR", True),
+    "XOR": ("XOR", False), "XNOR": ("XOR", True),
+    "BUF": ("AND", False), "NOT": ("AND", True),
+}
+INVERTED = {"AND": "NAND", "OR": "NOR", "XOR": "XNOR"}
+
+
+class Netlist:
+    def __init__(self, inputs, outputs, gates, key=None):
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        # gate name -> (gate type, [fanin nets]), kept in file order
+        self.gates = dict(gates)
+        self.key = key
+
+    @property
+    def key_inputs(self):
+        return [i for i in self.inputs if "keyinput" in i]
+
+    @property
+    def primary_inputs(self):
+        return [i for i in self.inputs if "keyinput" not in i]
+
+    def fanin_cone(self, roots):
+        """Return every net (gates and inputs) in the transitive fan-in of `roots`."""
+        seen = set()
+        stack = list(roots)
+        while stack:
+            net = stack.pop()
+            if net in seen:
+                continue
+            seen.add(net)
+            gate = self.gates.get(net)
+            if gate is not None:
+                stack.extend(gate[1])
+        return seen
+
+    def key_dependent_outputs(self):
+        """Outputs whose fan-in cone reaches at least one key input."""
+        keys = set(self.key_inputs)
+        if not keys:
+            return []
+        # Propagate key dependence forward once instead of walking every cone
+        tainted = set(keys)
+        for name in self.topological_order():
+            if any(f in tainted for f in self.gates[name][1]):
+                tainted.add(name)
+        return [o for o in self.outputs if o in tainted]
+
+    def topological_order(self):
+        """Gate names ordered so every gate follows its fan-ins."""
+        order, state = [], {}
+        for root in self.gates:
+            if root in state:
+                continue
+            stack = [(root, False)]
+            while stack:
+                net, expanded = stack.pop()
+                if expanded:
+                    state[net] = 2
+                    order.append(net)
+                    continue
+                if state.get(net) == 2:
+                    continue
+                if state.get(net) == 1:
+                    raise ValueError(f"Combinational loop through {net}")
+                state[net] = 1
+                stack.append((net, True))
+                for f in self.gates[net][1]:
+                    if f in self.gates and state.get(f) != 2:
+                        stack.append((f, False))
+        return order
+
+    def subcircuit(self, outputs, inputs=None):
+        """Netlist restricted to the fan-in of `outputs`, keeping file order."""
+        cone = self.fanin_cone(outputs)
+        if inputs is None:
+            inputs = [i for i in self.inputs if i in cone]
+        gates = {name: g for name, g in self.gates.items() if name in cone}
+        return Netlist(inputs, outputs, gates, key=self.key)
+
+
+def parse_gate(line):
+    m = GATE_RE.match(line)
+    if not m:
+        raise ValueError(f"Malformed gate line: {line!r}")
+    name, gate_type, args = m.groups()
+    fanins = [a.strip() for a in args.split(",") if a.strip()]
+    return name, gate_type.upper(), fanins
+
+
+def parse_netlist(path):
+    inputs, outputs, gates, key = [], [], {}, None
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("#"):
+                if line.startswith("#key="):
+                    key = line[len("#key="):].strip()
+                continue
+            if line.startswith("INPUT"):
+                inputs.append(line.split("(")[1].split(")")[0].strip())
+            elif line.startswith("OUTPUT"):
+                outputs.append(line.split("(")[1].split(")")[0].strip())
+            elif "=" in line:
+                name, gate_type, fanins = parse_gate(line)
+                gates[name] = (gate_type, fanins)
+    return Netlist(inputs, outputs, gates, key=key)
+
+
+def netlist_stats(path):
+    """Line-count sizes of a .bench file without building the gate graph."""
+    stats = {"inputs": 0, "outputs": 0, "gates": 0, "bytes": os.path.getsize(path)}
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("INPUT"):
+                stats["inputs"] += 1
+            elif line.startswith("OUTPUT"):
+                stats["outputs"] += 1
+            elif "=" in line:
+                stats["gates"] += 1
+    return stats
+
+
+def write_netlist(netlist, path, key=None):
+    key = netlist.key if key is None else key
+    lines = []
+    if key is not None:
+        lines.append(f"#key={key}")
+    lines += [f"INPUT({i})" for i in netlist.inputs]
+    lines += [f"OUTPUT({o})" for o in netlist.outputs]
+    lines += [f"{name} = {t}({', '.join(fanins)})" for name, (t, fanins) in netlist.gates.items()]
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+class StructuralHasher:
+    """
+    Assigns every net an integer id such that two nets get the same id iff
+    their cones are built from the same gates over the same primary inputs.
+    Internal net names are ignored, so renamed copies (e.g. `G_enc`) still match.
+    One hasher must be shared by all netlists being compared.
+    """
+
+    def __init__(self):
+        self.table = {}
+
+    def _intern(self, sig):
+        return self.table.setdefault(sig, len(self.table))
+
+    def hash_outputs(self, netlist, outputs):
+        ids = {}
+        for name in netlist.topological_order():
+            gate_type, fanins = netlist.gates[name]
+            child = [ids[f] if f in ids else self._intern(("I", f)) for f in fanins]
+            if gate_type in COMMUTATIVE:
+                child.sort()
+            ids[name] = self._intern((gate_type, tuple(child)))
+        return {o: ids[o] if o in ids else self._intern(("I", o)) for o in outputs}
+
+
+def simplify_gate(gate_type, fanins, consts):
+    """
+    Fold known constant fan-ins into one gate.
+    Returns ("CONST", bit), or (gate type, remaining fan-ins).
+    """
+    base, invert = BASE_GATES[gate_type]
+    live = []
+    for f in fanins:
+        if f not in consts:
+            live.append(f)
+        elif base == "XOR":
+            invert ^= bool(consts[f])
+        elif consts[f] == (base == "OR"):
+            # controlling value: 0 for AND, 1 for OR
+            return "CONST", int(consts[f]) ^ invert
+    if not live:
+        return "CONST", int(base == "AND") ^ invert
+    if len(live) == 1:
+        return ("NOT" if invert else "BUF"), live
+    return (INVERTED[base] if invert else base), live
+
+
+def propagate_constants(netlist, consts):
+    """
+    Tie the nets in `consts` (name -> 0/1) to constants, simplify every gate
+    they reach and sweep logic that no longer drives an output. Key inputs
+    cut off by the constants are dropped; primary inputs are all kept.
+    """
+    consts = dict(consts)
+    gates = {}
+    for name in netlist.topological_order():
+        if name in consts:
+            continue
+        gate_type, fanins = netlist.gates[name]
+        simplified = simplify_gate(gate_type, fanins, consts)
+        if simplified[0] == "CONST":
+            consts[name] = simplified[1]
+        else:
+            gates[name] = simplified
+
+    anchor = netlist.primary_inputs[0] if netlist.primary_inputs else netlist.inputs[0]
+    const_nets = {0: "const_zero", 1: "const_one"}
+    const_used = set()
+    for name, (gate_type, fanins) in list(gates.items()):
+        if any(f in consts for f in fanins):
+            gates[name] = (gate_type, [const_nets[consts[f]] if f in consts else f for f in fanins])
+            const_used.update(consts[f] for f in fanins if f in consts)
+    for o in netlist.outputs:
+        if o in consts:
+            gates[o] = ("BUF", [const_nets[consts[o]]])
+            const_used.add(consts[o])
+    # SLD-safe constants built from a primary input, only if something needs them
+    if const_used:
+        gates = {
+            "const_not": ("NOT", [anchor]),
+            "const_zero": ("AND", [anchor, "const_not"]),
+            "const_one": ("NAND", [anchor, "const_not"]),
+            **gates,
+        }
+
+    result = Netlist(netlist.inputs, netlist.outputs, gates, key=netlist.key)
+    reduced = result.subcircuit(netlist.outputs)
+    cone = reduced.fanin_cone(netlist.outputs)
+    reduced.inputs = netlist.primary_inputs + [k for k in netlist.key_inputs if k in cone]
+    if not reduced.key_inputs:
+        reduced.key = None
+    return reduced
+
+
+def extract_key_cone(locked, original):
+    """
+    Reduce a locked/original pair to the outputs that can see a key input.
+
+    The remaining outputs are checked for structural identity against the
+    original; any that fail are kept in the reduced pair so the downstream
+    tools still check them. Returns (locked_cone, original_cone, report).
+    """
+    missing = [o for o in locked.outputs if o not in original.outputs]
+    if missing:
+        raise ValueError(f"Outputs missing from original design: {missing}")
+
+    keyed = set(locked.key_dependent_outputs())
+    others = [o for o in locked.outputs if o not in keyed]
+
+    hasher = StructuralHasher()
+    locked_ids = hasher.hash_outputs(locked, others)
+    original_ids = hasher.hash_outputs(original, others)
+    mismatched = [o for o in others if locked_ids[o] != original_ids[o]]
+
+    kept = [o for o in locked.outputs if o in keyed or o in mismatched]
+    locked_cone = locked.fanin_cone(kept)
+    original_cone = original.fanin_cone(kept)
+    # Both sides must declare the same primary inputs; key inputs keep their order
+    shared = [i for i in original.inputs if i in locked_cone or i in original_cone]
+    locked_inputs = shared + locked.key_inputs
+
+    report = {
+        "key_outputs": sorted(keyed, key=locked.outputs.index),
+        "identical_outputs": [o for o in others if o not in mismatched],
+        "mismatched_outputs": mismatched,
+        "locked_gates": len(locked.gates),
+        "original_gates": len(original.gates),
+    }
+    locked_red = locked.subcircuit(kept, locked_inputs)
+    original_red = original.subcircuit(kept, shared)
+    report["locked_cone_gates"] = len(locked_red.gates)
+    report["original_cone_gates"] = len(original_red.gates)
+    return locked_red, original_red, report
@@ -0,0 +1,160 @@
+"""
+Area, depth and switching-activity overhead of locked and Trojan-infected
+netlists against their originals
+- Each file is matched to its original in data/ by the longest design name
+  its file name starts with; the scheme and key size come from the rest of
+  the name (<design>_<Scheme>_k_<K>..., <design>_RLL_K<K>_<i>,
+  <design>_HT_trigger_<n>_<i>)
+- Area: gate count and count per gate type
+- Depth: logic levels on the longest input-to-output path, from the
+  simulator's levelization
+- Power: sum over nets of switching activity 2p(1-p) times load (fan-out,
+  plus one for primary outputs), with p from bit-parallel random simulation.
+  The original and the locked file see the same patterns on shared inputs;
+  key inputs are held at the file's #key (random when it has none)
+- Files are analyzed across a process pool, in chunks grouped by design so
+  each original is analyzed about once per process
+"""
+
+import csv
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from .netlist import parse_netlist
+from .simulate import assign_inputs, compile_netlist, constant_words, random_words, row_popcount, simulate
+
+GATE_TYPES = ("AND", "NAND", "OR", "NOR", "XOR", "XNOR", "NOT", "BUF")
+VARIANT_RE = re.compile(r"^_(?:HT_trigger_(?P<trigger>\d+)_\d+|(?P<scheme>.+?)_(?:k_|K)(?P<key_size>\d+)(?:_s?\d+)?)$")
+COLUMNS = ["file", "design", "scheme", "key_size",
+           "gates_original", "gates_locked", "gates_delta", "gates_pct",
+           "depth_original", "depth_locked", "depth_delta",
+           "power_original", "power_locked", "power_pct",
+           *(f"d_{t}" for t in GATE_TYPES), "error"]
+
+
+def match_design(stem, designs):
+    """Longest name in `designs` that `stem` starts with (followed by '_'), or None."""
+    best = None
+    for design in designs:
+        if stem.startswith(design + "_") and (best is None or len(design) > len(best)):
+            best = design
+    return best
+
+
+def variant_of(stem, design):
+    """(scheme, key size) from a file name; Trojan files are scheme 'HT' with no key size."""
+    m = VARIANT_RE.match(stem[len(design):])
+    if m is None:
+        return stem[len(design) + 1:], None
+    if m["trigger"] is not None:
+        return "HT", None
+    return m["scheme"], int(m["key_size"])
+
+
+def input_patterns(inputs, n_words, seed):
+    """Random words per input name; the same names get the same words for the same seed."""
+    rng = np.random.default_rng(seed)
+    return dict(zip(inputs, random_words(len(inputs), n_words, rng)))
+
+
+def measure(netlist, patterns):
+    """Gate counts, depth and switching power of `netlist` under `patterns` (input name -> words)."""
+    compiled = compile_netlist(netlist)
+    n_words = len(next(iter(patterns.values())))
+    values = simulate(compiled, assign_inputs(compiled, patterns, n_words))
+    p = row_popcount(values) / (n_words * 64)
+    load = np.bincount(compiled.fanin_idx, minlength=compiled.n_nets).astype(np.float64)
+    load[compiled.outputs] += 1
+    return {
+        "gates": len(netlist.gates),
+        "types": Counter(gate_type for gate_type, _ in netlist.gates.values()),
+        "depth": int(compiled.level[compiled.outputs].max()) if len(compiled.outputs) else 0,
+        "power": float((2 * p * (1 - p) * load).sum()),
+    }
+
+
+@lru_cache(maxsize=None)
+def original_metrics(path, n_words, seed):
+    netlist = parse_netlist(path)
+    return measure(netlist, input_patterns(netlist.inputs, n_words, seed)), tuple(netlist.inputs)
+
+
+def analyze(locked_path, original_path, n_words=64, seed=0):
+    """One summary row (see COLUMNS) for a locked or Trojan-infected file."""
+    orig, orig_inputs = original_metrics(str(original_path), n_words, seed)
+    locked = parse_netlist(locked_path)
+    patterns = input_patterns(orig_inputs, n_words, seed)
+    keys = dict(zip(locked.key_inputs, locked.key or ""))
+    extra = [i for i in locked.inputs if i not in patterns and i not in keys]
+    patterns.update(input_patterns(extra, n_words, seed + 1))
+    patterns.update({k: constant_words(bit == "1", n_words) for k, bit in keys.items()})
+    new = measure(locked, patterns)
+
+    stem, design = Path(locked_path).stem, Path(original_path).stem
+    scheme, key_size = variant_of(stem, design)
+    row = {
+        "file": Path(locked_path).name, "design": design, "scheme": scheme, "key_size": key_size,
+        "gates_original": orig["gates"], "gates_locked": new["gates"],
+        "gates_delta": new["gates"] - orig["gates"],
+        "gates_pct": round(100 * (new["gates"] - orig["gates"]) / max(orig["gates"], 1), 2),
+        "depth_original": orig["depth"], "depth_locked": new["depth"], "depth_delta": new["depth"] - orig["depth"],
+        "power_original": round(orig["power"], 2), "power_locked": round(new["power"], 2),
+        "power_pct": round(100 * (new["power"] - orig["power"]) / orig["power"], 2) if orig["power"] else None,
+        "error": "",
+    }
+    row.update({f"d_{t}": new["types"][t] - orig["types"][t] for t in GATE_TYPES})
+    return row
+
+
+def _analyze_chunk(jobs, n_words, seed):
+    rows = []
+    for locked_path, original_path in jobs:
+        try:
+            rows.append(analyze(locked_path, original_path, n_words, seed))
+        except (ValueError, KeyError, OSError) as e:
+            rows.append({"file": Path(locked_path).name, "design": Path(original_path).stem, "error": str(e)})
+    return rows
+
+
+def pair_with_originals(files, data_folder):
+    """(locked, original) pairs for the files whose design is in `data_folder`, and the unmatched files."""
+    originals = {p.stem: p for p in Path(data_folder).glob("*.bench")}
+    pairs, unmatched = [], []
+    for path in files:
+        design = match_design(Path(path).stem, originals)
+        if design is None:
+            unmatched.append(path)
+        else:
+            pairs.append((str(path), str(originals[design])))
+    return pairs, unmatched
+
+
+def analyze_all(pairs, n_words=64, seed=0, workers=None):
+    """
+    Rows for every (locked, original) pair across a process pool; failures
+    become rows with `error` set. Pairs are sorted by design and handed out
+    in chunks, so a worker mostly analyzes each original once.
+    """
+    workers = workers or os.cpu_count() or 1
+    pairs = sorted(pairs, key=lambda p: (p[1], p[0]))
+    size = max(1, len(pairs) // (workers * 4))
+    chunks = [pairs[i:i + size] for i in range(0, len(pairs), size)]
+    if workers == 1:
+        return [row for chunk in chunks for row in _analyze_chunk(chunk, n_words, seed)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_analyze_chunk, chunk, n_words, seed) for chunk in chunks]
+        return [row for future in futures for row in future.result()]
+
+
+def write_table(rows, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, restval="")
+        writer.writeheader()
+        writer.writerows(rows)
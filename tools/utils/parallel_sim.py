@@ -0,0 +1,244 @@
+"""
+Multi-process bit-parallel simulation for large designs (b17_C, b22_C)
+- The compiled netlist's evaluation groups are packed into a few flat arrays
+  and placed in shared memory once; workers attach to them without copying
+- Pattern-parallel: the pattern words are cut into chunks and every worker
+  simulates whole chunks
+- Cone-parallel: the outputs are split into partitions with fan-in cones of
+  about equal size (logic shared between partitions is evaluated in each)
+  and every worker simulates only the gates of one partition
+- Workers write output words into a shared result array, and per-net
+  one-counts into their own row of a shared count array, so no large array
+  is pickled between processes
+- Random patterns are drawn per chunk from (seed, chunk index), so results
+  do not depend on the number of workers
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Value, resource_tracker, shared_memory
+
+import numpy as np
+
+from .simulate import ALL_ONES, ONE, ZERO, evaluate, random_words, row_popcount
+
+CHUNK_WORDS = 256
+MODES = ("patterns", "cones")
+
+# Per-process state: attached shared arrays and the unpacked groups
+_state = {}
+
+
+class SharedArrays:
+    """NumPy arrays in shared memory blocks; `spec` is what workers attach with."""
+
+    def __init__(self):
+        # Started before any worker pool forks, so every worker reports to this
+        # tracker; a worker forked earlier would start its own, and that one
+        # unlinks the blocks it saw when the worker exits
+        resource_tracker.ensure_running()
+        self.blocks = []
+        self.arrays = {}
+        self.spec = {}
+
+    def add(self, name, shape, dtype, fill=None):
+        dtype = np.dtype(dtype)
+        block = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+        self.blocks.append(block)
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        if fill is not None:
+            array[...] = fill
+        self.arrays[name] = array
+        self.spec[name] = (block.name, tuple(shape), dtype.str)
+        return array
+
+    def close(self):
+        self.arrays.clear()
+        for block in self.blocks:
+            block.close()
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach(spec):
+    """Arrays from a SharedArrays spec, plus the blocks that must stay open while they are used."""
+    arrays, blocks = {}, []
+    for name, (block_name, shape, dtype) in spec.items():
+        # Only the creator unlinks; before 3.13 the attach registers a duplicate with the creator's tracker
+        block = (shared_memory.SharedMemory(name=block_name, track=False) if sys.version_info >= (3, 13)
+                 else shared_memory.SharedMemory(name=block_name))
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return arrays, blocks
+
+
+def pack_groups(groups):
+    """Evaluation groups as (table, outs, fans) flat arrays; table rows are (op, invert, out offset, rows, fan offset, width)."""
+    table = np.zeros((len(groups), 6), dtype=np.int64)
+    out_off = fan_off = 0
+    for i, (op, invert, out, fan) in enumerate(groups):
+        table[i] = (op, invert, out_off, len(out), fan_off, fan.shape[1])
+        out_off += len(out)
+        fan_off += fan.size
+    outs = np.concatenate([g[2] for g in groups]) if groups else np.zeros(0, dtype=np.int64)
+    fans = np.concatenate([g[3].ravel() for g in groups]) if groups else np.zeros(0, dtype=np.int64)
+    return table, outs, fans
+
+
+def unpack_groups(table, outs, fans):
+    """Groups as views into the packed arrays (no copies)."""
+    groups = []
+    for op, invert, out_off, rows, fan_off, width in table.tolist():
+        groups.append((op, bool(invert), outs[out_off:out_off + rows],
+                       fans[fan_off:fan_off + rows * width].reshape(rows, width)))
+    return groups
+
+
+def partition_cones(compiled, n_parts):
+    """
+    Split the outputs into up to `n_parts` partitions of about n_gates/n_parts
+    cone gates each, keeping neighbouring outputs together. Returns
+    [(output positions, gate indices)].
+    """
+    n_gates = len(compiled.op)
+    target = max(1, n_gates // max(n_parts, 1))
+    parts, rows, seen, size = [], [], np.zeros(n_gates, dtype=bool), 0
+    for pos, net in enumerate(compiled.outputs.tolist()):
+        stack = [net]
+        while stack:
+            g = stack.pop() - compiled.first_gate
+            if g >= 0 and not seen[g]:
+                seen[g] = True
+                size += 1
+                stack.extend(compiled.fanin_idx[compiled.fanin_ptr[g]:compiled.fanin_ptr[g + 1]].tolist())
+        rows.append(pos)
+        if size >= target and len(parts) < n_parts - 1:
+            parts.append((rows, np.nonzero(seen)[0]))
+            rows, seen, size = [], np.zeros(n_gates, dtype=bool), 0
+    if rows:
+        parts.append((rows, np.nonzero(seen)[0]))
+    return parts
+
+
+def _init_worker(spec, meta, slots):
+    arrays, blocks = attach(spec)
+    _state.update(arrays=arrays, blocks=blocks, meta=meta)
+    _state["groups"] = [unpack_groups(arrays[f"table{i}"], arrays[f"outs{i}"], arrays[f"fans{i}"])
+                        for i in range(meta["n_group_sets"])]
+    if slots is not None:
+        with slots.get_lock():
+            _state["slot"] = slots.value
+            slots.value += 1
+
+
+def _chunk_values(inputs, group_set):
+    meta = _state["meta"]
+    values = np.empty((meta["n_nets"], inputs.shape[1]), dtype=np.uint64)
+    values[ZERO] = 0
+    values[ONE] = ALL_ONES
+    values[meta["first_input"]:meta["first_input"] + inputs.shape[0]] = inputs
+    evaluate(values, _state["groups"][group_set])
+    return values
+
+
+def _simulate_task(start, stop, group_set):
+    """Output words for patterns [start, stop) of the shared inputs, written into the shared result."""
+    arrays, meta = _state["arrays"], _state["meta"]
+    values = _chunk_values(arrays["inputs"][:, start:stop], group_set)
+    rows = meta["part_rows"][group_set]
+    arrays["result"][rows, start:stop] = values[arrays["outputs"][rows]]
+
+
+def _count_task(chunk, n_words):
+    """One-counts of every net over a chunk of random patterns, added to this worker's row."""
+    arrays, meta = _state["arrays"], _state["meta"]
+    rng = np.random.default_rng([meta["seed"], chunk])
+    values = _chunk_values(random_words(meta["n_inputs"], n_words, rng), 0)
+    arrays["counts"][_state["slot"]] += row_popcount(values)
+
+
+def _run(shared, meta, tasks, workers, slots=None):
+    """Run `tasks` (function, args) over a pool attached to `shared`, or in-process for one worker."""
+    if workers <= 1 or len(tasks) <= 1:
+        saved = dict(_state)
+        try:
+            if slots is not None:
+                slots.value = 0
+            _init_worker(shared.spec, meta, slots)
+            for func, args in tasks:
+                func(*args)
+        finally:
+            blocks = _state.get("blocks", [])
+            # Views into the blocks have to go before the blocks can close
+            _state.clear()
+            for block in blocks:
+                block.close()
+            _state.update(saved)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(shared.spec, meta, slots)) as pool:
+        for future in [pool.submit(func, *args) for func, args in tasks]:
+            future.result()
+
+
+def _share_netlist(shared, compiled, group_sets):
+    shared.add("outputs", compiled.outputs.shape, np.int64, compiled.outputs)
+    for i, groups in enumerate(group_sets):
+        for name, array in zip(("table", "outs", "fans"), pack_groups(groups)):
+            shared.add(f"{name}{i}", array.shape, array.dtype, array)
+    return {"n_nets": compiled.n_nets, "first_input": 2, "n_inputs": len(compiled.input_names),
+            "n_group_sets": len(group_sets)}
+
+
+def simulate_outputs(compiled, input_words, workers=None, mode="patterns", chunk_words=CHUNK_WORDS):
+    """
+    Output words (n_outputs x n_words) for `input_words` (n_inputs x n_words),
+    split over processes by pattern words or by output cones.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}' (choose from {list(MODES)})")
+    workers = workers or os.cpu_count() or 1
+    input_words = np.asarray(input_words, dtype=np.uint64)
+    n_words = input_words.shape[1]
+    n_outputs = len(compiled.outputs)
+    if mode == "cones":
+        parts = partition_cones(compiled, workers)
+        group_sets = [compiled.groups_for(gates) for _, gates in parts]
+        part_rows = [rows for rows, _ in parts]
+    else:
+        group_sets, part_rows = [compiled.groups], [list(range(n_outputs))]
+
+    with SharedArrays() as shared:
+        meta = _share_netlist(shared, compiled, group_sets)
+        meta["part_rows"] = part_rows
+        shared.add("inputs", input_words.shape, np.uint64, input_words)
+        shared.add("result", (n_outputs, n_words), np.uint64)
+        chunks = [(s, min(s + chunk_words, n_words)) for s in range(0, n_words, chunk_words)]
+        tasks = [(_simulate_task, (start, stop, part)) for part in range(len(group_sets)) for start, stop in chunks]
+        _run(shared, meta, tasks, workers)
+        return shared.arrays["result"].copy()
+
+
+def signal_probabilities(compiled, n_words, seed=0, workers=None, chunk_words=CHUNK_WORDS):
+    """Probability of every net being 1 under uniformly random inputs, pattern-parallel."""
+    workers = workers or os.cpu_count() or 1
+    n_chunks = -(-n_words // chunk_words)
+    workers = min(workers, n_chunks)
+    sizes = [min(chunk_words, n_words - c * chunk_words) for c in range(n_chunks)]
+    slots = Value("i", 0)
+    with SharedArrays() as shared:
+        meta = _share_netlist(shared, compiled, [compiled.groups])
+        meta["seed"] = seed
+        shared.add("counts", (workers, compiled.n_nets), np.int64, 0)
+        _run(shared, meta, [(_count_task, (c, size)) for c, size in enumerate(sizes)], workers, slots)
+        return shared.arrays["counts"].sum(axis=0) / (n_words * 64)
@@ -0,0 +1,81 @@
+"""
+Staged asyncio pipeline
+- Each stage has its own worker count and a bounded input queue, so a slow
+  stage applies backpressure to the one before it instead of piling up work
+- Items flow source -> stage 0 -> stage 1 -> ... -> on_done
+"""
+
+import asyncio
+import logging
+
+_DONE = object()
+
+
+class Stage:
+    def __init__(self, name, func, workers, queue_size=None):
+        """`func` is an async callable item -> item; returning None drops the item."""
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue_size = queue_size if queue_size is not None else 2 * workers
+
+
+async def run_pipeline(source, stages, on_done, on_error=None):
+    """
+    Push every item of `source` (iterable or async iterable) through `stages`.
+    `on_done(item)` receives finished items; `on_error(stage, item, exc)` is
+    called when a stage raises, and the item is dropped.
+    """
+    queues = [asyncio.Queue(maxsize=s.queue_size) for s in stages]
+
+    async def feed():
+        if hasattr(source, "__aiter__"):
+            async for item in source:
+                await queues[0].put(item)
+        else:
+            for item in source:
+                await queues[0].put(item)
+
+    async def worker(i):
+        stage = stages[i]
+        while True:
+            item = await queues[i].get()
+            if item is _DONE:
+                return
+            try:
+                out = await stage.func(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if on_error is not None:
+                    on_error(stage, item, e)
+                else:
+                    logging.error("Stage %s failed: %s", stage.name, e)
+                continue
+            if out is None:
+                continue
+            if i + 1 < len(stages):
+                await queues[i + 1].put(out)
+            else:
+                on_done(out)
+
+    async def close(i, upstream):
+        # Once every worker feeding stage i has exited (or failed), tell its workers to stop
+        await asyncio.wait([upstream])
+        for _ in range(stages[i].workers):
+            await queues[i].put(_DONE)
+
+    feeder = upstream = asyncio.ensure_future(feed())
+    tasks = [upstream]
+    for i, stage in enumerate(stages):
+        closer = asyncio.ensure_future(close(i, upstream))
+        workers = [asyncio.ensure_future(worker(i)) for _ in range(stage.workers)]
+        upstream = asyncio.ensure_future(asyncio.gather(*workers))
+        tasks += [closer, *workers, upstream]
+    try:
+        await upstream
+        await feeder
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,187 @@
+"""
+Declarative campaign specs and the planner that expands them
+- A spec lists designs, locking schemes with their key sizes, seeds, attack
+  engines, Trojan insertions and a budget (see config/campaign.json)
+- The planner expands it into a DAG: design -> lock variant -> attack per
+  engine, plus design -> Trojan insertion. Nodes are keyed by what they
+  compute, so work the spec asks for twice (a design listed twice, engines
+  attacking the same locked file) is one node
+- Attacks of the same seed that already have a key verdict in the results
+  store are dropped before anything runs, along with locks and designs
+  nothing is left to use
+- The cost estimate uses the mean attack time of each (circuit, scheme, key
+  size) in the store, falling back to the per-attack timeout
+"""
+
+import json
+import os
+
+from .netlist import netlist_stats
+
+DATA_FOLDER = "data"
+ENGINES = ("sld", "sensitization")
+SPEC_KEYS = {"designs", "locking", "seeds", "attacks", "trojans", "budget"}
+
+
+class Node:
+    def __init__(self, key, kind, params, deps=()):
+        self.key = key
+        self.kind = kind
+        self.params = params
+        self.deps = list(deps)
+
+    def __repr__(self):
+        return f"Node({self.key})"
+
+
+def load_spec(path, schemes):
+    """Read and validate a spec; `schemes` are the locking schemes that can run."""
+    with open(path) as f:
+        spec = json.load(f)
+    unknown = set(spec) - SPEC_KEYS
+    if unknown:
+        raise ValueError(f"Unknown campaign spec keys: {sorted(unknown)}")
+    for scheme in spec.get("locking", {}):
+        if scheme not in schemes:
+            raise ValueError(f"Unknown locking scheme '{scheme}' (choose from {sorted(schemes)})")
+    for engine in spec.get("attacks", []):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown attack engine '{engine}' (choose from {list(ENGINES)})")
+    if not spec.get("designs"):
+        raise ValueError("Campaign spec lists no designs")
+    # sld attacks every locked variant; other engines run alongside it
+    spec["attacks"] = ["sld", *(e for e in spec.get("attacks", []) if e != "sld")]
+    return spec
+
+
+class Plan:
+    def __init__(self):
+        self.nodes = {}
+        self.skipped = 0
+
+    def add(self, key, kind, params, deps=()):
+        """Node for `key`, shared if an earlier part of the spec already asked for it."""
+        if key not in self.nodes:
+            self.nodes[key] = Node(key, kind, params, deps)
+        return self.nodes[key]
+
+    def of_kind(self, kind):
+        return [n for n in self.nodes.values() if n.kind == kind]
+
+    def skip_done(self, done):
+        """
+        Drop locked variants whose attacks are all in `done`, a set of
+        (circuit, scheme, key_size, seed, engine). A variant with any
+        engine left keeps all of its attacks, since they run as one task.
+        """
+        attacks = {}
+        for node in self.of_kind("attack"):
+            attacks.setdefault(node.deps[0], []).append(node)
+        for nodes in attacks.values():
+            if all((p["name"], p["scheme"], p["key_size"], p["seed"], p["engine"]) in done
+                   for p in (n.params for n in nodes)):
+                for node in nodes:
+                    del self.nodes[node.key]
+                self.skipped += len(nodes)
+        self._prune()
+
+    def skip_trojans(self, folder):
+        """Drop Trojan insertions whose output files all exist in `folder`."""
+        for node in self.of_kind("trojan"):
+            p = node.params
+            stem = os.path.splitext(os.path.basename(p["bench_file"]))[0]
+            if all(os.path.exists(os.path.join(folder, f"{stem}_HT_trigger_{p['trigger_size']}_{t:02d}.bench"))
+                   for t in range(1, p["count"] + 1)):
+                del self.nodes[node.key]
+                self.skipped += 1
+        self._prune()
+
+    def limit(self, max_tasks):
+        """Keep the first `max_tasks` locked variants (and their attacks)."""
+        for node in self.of_kind("lock")[max_tasks:]:
+            for attack in self.of_kind("attack"):
+                if node.key in attack.deps:
+                    del self.nodes[attack.key]
+            del self.nodes[node.key]
+        self._prune()
+
+    def _prune(self):
+        for kind in ("lock", "design"):
+            needed = {dep for n in self.nodes.values() for dep in n.deps}
+            for node in self.of_kind(kind):
+                if node.key not in needed:
+                    del self.nodes[node.key]
+
+    def tasks(self):
+        """One campaign task per locked variant, carrying the engines that attack it."""
+        tasks = {}
+        for node in self.of_kind("attack"):
+            lock = self.nodes[node.deps[0]]
+            design = self.nodes[lock.deps[0]]
+            task = tasks.setdefault(lock.key, {
+                "name": design.params["name"], "bench_file": design.params["bench_file"],
+                "key_size": lock.params["key_size"], "iteration": lock.params["seed"],
+                "scheme": lock.params["scheme"], "seed": lock.params["seed"], "engines": [],
+                "original_stats": design.params["stats"],
+            })
+            task["engines"].append(node.params["engine"])
+        return list(tasks.values())
+
+    def estimate(self, history, timeout=None, workers=1):
+        """
+        Expected attack seconds from `history` {(circuit, scheme, key_size): mean
+        seconds}; attacks without history count at `timeout` (or as unknown).
+        """
+        seconds, unknown = 0.0, 0
+        for node in self.of_kind("attack"):
+            p = node.params
+            if p["engine"] != "sld":
+                continue
+            mean = history.get((p["name"], p["scheme"], p["key_size"]))
+            if mean is None:
+                mean = timeout
+            if mean is None:
+                unknown += 1
+            else:
+                seconds += mean
+        return {
+            "designs": len(self.of_kind("design")), "locks": len(self.of_kind("lock")),
+            "attacks": len(self.of_kind("attack")), "trojans": len(self.of_kind("trojan")),
+            "skipped": self.skipped, "attack_seconds": round(seconds, 1),
+            "wall_seconds": round(seconds / max(workers, 1), 1), "no_history": unknown,
+        }
+
+
+def design_entry(design):
+    """Spec design (a name, or {"name", "file"}) -> (name, bench file)."""
+    if isinstance(design, str):
+        return design, os.path.join(DATA_FOLDER, f"{design}.bench")
+    return design["name"], os.path.join(DATA_FOLDER, design.get("file", f"{design['name']}.bench"))
+
+
+def expand(spec):
+    plan = Plan()
+    seeds = spec.get("seeds", [0])
+    engines = spec.get("attacks", ["sld"])
+    for design in spec["designs"]:
+        name, bench_file = design_entry(design)
+        if ("design", name) not in plan.nodes:
+            # Parsed once per design, however many variants use it
+            stats = netlist_stats(bench_file)
+            plan.add(("design", name), "design", {"name": name, "bench_file": bench_file, "stats": stats})
+        design_key = ("design", name)
+        for scheme, key_sizes in spec.get("locking", {}).items():
+            for key_size in key_sizes:
+                for seed in seeds:
+                    lock = plan.add(("lock", name, scheme, key_size, seed), "lock",
+                                    {"scheme": scheme, "key_size": key_size, "seed": seed}, [design_key])
+                    for engine in engines:
+                        plan.add(("attack", name, scheme, key_size, seed, engine), "attack",
+                                 {"name": name, "scheme": scheme, "key_size": key_size, "seed": seed,
+                                  "engine": engine}, [lock.key])
+        for trojan in spec.get("trojans", []):
+            trigger_size, count = trojan.get("trigger_size", 3), trojan.get("count", 50)
+            plan.add(("trojan", name, trigger_size, count), "trojan",
+                     {"name": name, "bench_file": bench_file, "trigger_size": trigger_size, "count": count},
+                     [design_key])
+    return plan
@@ -0,0 +1,138 @@
+"""
+SAT attack portfolio
+- Races several attack configurations (solver backend, DIP strategy, seed for
+  seeded strategies) on one locked netlist, one process each
+- The first configuration to finish wins; the others are terminated
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+
+# Each backend brings its own restart/branching heuristics (glucose: LBD-driven
+# restarts, minisat: Luby restarts, MapleChrono: chronological backtracking).
+# Only backends that support interrupting a solve can honour the timeout.
+PORTFOLIO_SOLVERS = ("g4", "m22", "mc", "g3")
+# Extra seconds past the timeout for workers to report their final estimate
+GRACE_SECONDS = 10
+# How often the coordinator checks for workers that died without reporting
+POLL_SECONDS = 0.5
+
+
+def default_configs(n):
+    """
+    First `n` configurations, varying solver fastest, then DIP strategy, then
+    seed. Seeds past 0 only come with seeded DIP strategies (see race_key).
+    """
+    from .sat_attack import DIP_STRATEGIES, SEEDED_STRATEGIES
+    configs, seed = [], 0
+    while len(configs) < n:
+        for strategy in DIP_STRATEGIES:
+            if seed and strategy not in SEEDED_STRATEGIES:
+                continue
+            for solver in PORTFOLIO_SOLVERS:
+                configs.append({"solver": solver, "dip_strategy": strategy, "seed": seed})
+        seed += 1
+    return configs[:n]
+
+
+def race_key(config):
+    """
+    What makes two configurations race differently. The seed only steers
+    seeded DIP strategies: pysat backends take no seed, so with the default
+    strategy every seed runs the same search.
+    """
+    from .sat_attack import SEEDED_STRATEGIES
+    seed = config["seed"] if config["dip_strategy"] in SEEDED_STRATEGIES else None
+    return config["solver"], config["dip_strategy"], seed
+
+
+def config_label(config):
+    return f"{config['solver']}/{config['dip_strategy']}/seed{config['seed']}"
+
+
+def _worker(index, config, locked_path, original_path, extract_cone, options, results):
+    # Imported in the child so a failing backend cannot take the coordinator down
+    from .netlist import parse_netlist, extract_key_cone
+    from .sat_attack import SatAttack
+    try:
+        locked = parse_netlist(locked_path)
+        original = parse_netlist(original_path)
+        if extract_cone:
+            locked, original, _ = extract_key_cone(locked, original)
+        engine = SatAttack(locked, original, solver_name=config["solver"],
+                           seed=config["seed"], dip_strategy=config["dip_strategy"])
+        try:
+            result = engine.run(**options)
+        finally:
+            engine.close()
+        results.put((index, result, None))
+    except Exception as e:
+        results.put((index, None, f"{type(e).__name__}: {e}"))
+
+
+def run_portfolio(locked_path, original_path, configs, extract_cone=False, timeout=None, **options):
+    """
+    Returns (result, winning config, errors). A configuration wins by
+    reaching an exact or approximate key; if none does, the first run that
+    stopped on its own budget is returned instead, or None if all failed.
+    Configurations that would run the same search (same race_key) are raced
+    once, as the first of them.
+    """
+    unique = {}
+    for cfg in configs:
+        unique.setdefault(race_key(cfg), cfg)
+    configs = list(unique.values())
+    options["timeout"] = timeout
+    ctx = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, daemon=True,
+                    args=(i, cfg, str(locked_path), str(original_path), extract_cone, options, results))
+        for i, cfg in enumerate(configs)
+    ]
+    for p in procs:
+        p.start()
+
+    deadline = None if timeout is None else time.time() + timeout + GRACE_SECONDS
+    winner, fallback, errors, pending = None, None, {}, len(procs)
+    reported, exited = set(), set()
+    try:
+        while pending and winner is None:
+            if deadline is not None and time.time() >= deadline:
+                break
+            wait = POLL_SECONDS if deadline is None else min(POLL_SECONDS, max(0.0, deadline - time.time()))
+            try:
+                index, result, error = results.get(timeout=wait)
+            except queue.Empty:
+                # A worker killed (e.g. out of memory) or crashed in the native solver never
+                # reports; it gets one more poll in case its result is still in the pipe
+                for i, p in enumerate(procs):
+                    if i in reported or p.exitcode is None:
+                        continue
+                    if i in exited:
+                        reported.add(i)
+                        pending -= 1
+                        errors[config_label(configs[i])] = f"worker exited with code {p.exitcode} without a result"
+                    exited.add(i)
+                continue
+            reported.add(index)
+            pending -= 1
+            if error is not None:
+                errors[config_label(configs[index])] = error
+            elif result["status"] in ("exact", "approximate"):
+                winner = (result, configs[index])
+            elif fallback is None:
+                fallback = (result, configs[index])
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        for p in procs:
+            p.join()
+
+    winner = winner or fallback
+    if winner is None:
+        return None, None, errors
+    return winner[0], winner[1], errors
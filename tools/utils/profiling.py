@@ -0,0 +1,137 @@
+"""
+Opt-in profiling for the locking and Trojan scripts (--profile PATH)
+- Function-level profile (cProfile), reduced to the hottest functions
+- Hot-path counters (gates parsed, gates emitted, bytes written, ...)
+- Wall time per phase (parse / transform / write)
+- Dumped as JSON; merge() sums profiles from many workers into one report
+Scripts call current() and use its phase()/count(); without --profile that is
+a no-op profiler, so the hot paths pay nothing.
+"""
+
+import json
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+TOP_FUNCTIONS = 40
+
+_active = []
+
+
+class Profiler:
+    def __init__(self, functions=True):
+        self.functions = functions
+        self.counters = Counter()
+        self.phases = Counter()
+        self.wall_time = 0.0
+        self._profile = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - start
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def __enter__(self):
+        _active.append(self)
+        if self.functions:
+            import cProfile  # cProfile/pstats load only when profiling; they dominate startup otherwise
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall_time += time.perf_counter() - self._start
+        if self._profile is not None:
+            self._profile.disable()
+        _active.remove(self)
+
+    def snapshot(self):
+        """JSON-able summary; function rows are keyed by file:line(name)."""
+        functions = {}
+        if self._profile is not None:
+            import pstats
+            stats = pstats.Stats(self._profile)
+            rows = sorted(stats.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:TOP_FUNCTIONS]
+            for (filename, line, name), (_, ncalls, tottime, cumtime, _) in rows:
+                functions[f"{os.path.basename(filename)}:{line}({name})"] = {
+                    "ncalls": ncalls, "tottime": round(tottime, 6), "cumtime": round(cumtime, 6)}
+        return {
+            "runs": 1,
+            "wall_time": round(self.wall_time, 6),
+            "phases": {k: round(v, 6) for k, v in self.phases.items()},
+            "counters": dict(self.counters),
+            "functions": functions,
+        }
+
+
+class _NullProfiler:
+    @contextmanager
+    def phase(self, name):
+        yield
+
+    def count(self, name, n=1):
+        pass
+
+
+NULL = _NullProfiler()
+
+
+def current():
+    """The innermost active profiler, or a no-op one."""
+    return _active[-1] if _active else NULL
+
+
+def merge(snapshots):
+    """Sum snapshots (e.g. one per locking task of a campaign) into one report."""
+    report = {"runs": 0, "wall_time": 0.0, "phases": Counter(), "counters": Counter(), "functions": {}}
+    for snap in snapshots:
+        report["runs"] += snap.get("runs", 1)
+        report["wall_time"] += snap["wall_time"]
+        report["phases"].update(snap["phases"])
+        report["counters"].update(snap["counters"])
+        for name, row in snap["functions"].items():
+            total = report["functions"].setdefault(name, {"ncalls": 0, "tottime": 0.0, "cumtime": 0.0})
+            for field in total:
+                total[field] += row[field]
+    report["wall_time"] = round(report["wall_time"], 6)
+    report["phases"] = {k: round(v, 6) for k, v in report["phases"].items()}
+    report["counters"] = dict(report["counters"])
+    top = sorted(report["functions"].items(), key=lambda kv: kv[1]["tottime"], reverse=True)[:TOP_FUNCTIONS]
+    report["functions"] = {name: {k: round(v, 6) for k, v in row.items()} for name, row in top}
+    return report
+
+
+def dump(report, path, **meta):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({**meta, **report}, f, indent=2)
+
+
+def add_profile_argument(parser):
+    parser.add_argument("--profile", type=Path, default=None, metavar="PATH",
+                        help="Write a JSON profile (hot functions, counters, phase times) to PATH")
+
+
+@contextmanager
+def profiled(path, script):
+    """Profile the enclosed block and dump it to `path`; does nothing if path is None."""
+    if path is None:
+        yield NULL
+        return
+    profiler = Profiler()
+    try:
+        with profiler:
+            yield profiler
+    finally:
+        dump(profiler.snapshot(), path, script=script, argv=sys.argv[1:])
+        print(f"Profile written to: {path}")
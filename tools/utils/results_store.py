@@ -0,0 +1,200 @@
+"""
+Indexed SQLite store for campaign results
+- Typed columns instead of CSV text; one row per task, unique on its identity
+  (run, circuit, scheme, key size, iteration), so re-running a run replaces
+  its rows instead of duplicating them
+- Runs are named by a label (git commit by default), which is what
+  comparisons between runs use
+- Aggregations (mean / percentiles / success rate) run inside SQLite with
+  window functions over the (circuit, key_size, scheme) index, so queries
+  stay fast at hundreds of thousands of rows
+"""
+
+import csv
+import json
+import os
+import re
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    label TEXT NOT NULL UNIQUE,
+    started REAL NOT NULL,
+    meta TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    circuit TEXT NOT NULL,
+    scheme TEXT NOT NULL,
+    key_size INTEGER NOT NULL,
+    iteration INTEGER NOT NULL,
+    seed INTEGER,
+    locked_file TEXT,
+    sat_time REAL,
+    iterations INTEGER,
+    key_correct INTEGER,
+    sensitization_time REAL,
+    sensitization_correct INTEGER,
+    recorded REAL NOT NULL,
+    PRIMARY KEY (run_id, circuit, scheme, key_size, iteration)
+);
+CREATE INDEX IF NOT EXISTS results_group ON results (circuit, key_size, scheme);
+"""
+
+# Columns an aggregate can be taken over, and the groupings allowed
+METRICS = ("sat_time", "iterations", "sensitization_time")
+GROUP_COLUMNS = ("circuit", "key_size", "scheme")
+PERCENTILES = (0.5, 0.9, 0.95)
+
+COLUMNS = ("circuit", "scheme", "key_size", "iteration", "seed", "locked_file", "sat_time", "iterations",
+           "key_correct", "sensitization_time", "sensitization_correct")
+
+
+# Campaign scheme -> label in its locked file names (<circuit>_<label>_K<key size>_<iteration>.bench)
+SCHEME_LABELS = {
+    "rll": "RLL", "sarlock": "SARLock", "antisat": "AntiSAT", "cac": "CAC",
+    "troll-sarlock": "TroLL_SARLock", "troll-antisat": "TroLL_AntiSAT", "troll-cac": "TroLL_CAC",
+}
+
+
+def scheme_of(locked_file):
+    """Campaign scheme of a locked file from its name, or None; longest label first, so TroLL_SARLock is not SARLock."""
+    name = os.path.basename(str(locked_file))
+    for scheme, label in sorted(SCHEME_LABELS.items(), key=lambda item: -len(item[1])):
+        if re.search(rf"_{re.escape(label)}_(?:K|k_)\d+", name):
+            return scheme
+    return None
+
+
+def verdict(value):
+    """'YES'/'NO'/'N/A' (as written to the CSV) -> 1/0/NULL; a PARTIAL key (unresolved bits) is not correct."""
+    return {"YES": 1, "NO": 0, "PARTIAL": 0}.get(str(value).strip().upper())
+
+
+class ResultsStore:
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        # Stores created before results had a seed column
+        if "seed" not in {row[1] for row in self.db.execute("PRAGMA table_info(results)")}:
+            self.db.execute("ALTER TABLE results ADD COLUMN seed INTEGER")
+            self.db.commit()
+
+    def run(self, label, **meta):
+        """Id of the run named `label`, creating it if needed."""
+        row = self.db.execute("SELECT run_id FROM runs WHERE label = ?", (label,)).fetchone()
+        if row:
+            return row[0]
+        cur = self.db.execute("INSERT INTO runs (label, started, meta) VALUES (?, ?, ?)",
+                              (label, time.time(), json.dumps(meta)))
+        self.db.commit()
+        return cur.lastrowid
+
+    def add(self, run_id, rows):
+        """Insert result dicts (keys from COLUMNS); a task already in the run is replaced."""
+        now = time.time()
+        self.db.executemany(
+            f"INSERT OR REPLACE INTO results (run_id, {', '.join(COLUMNS)}, recorded) "
+            f"VALUES (?, {', '.join('?' * len(COLUMNS))}, ?)",
+            [(run_id, *(row.get(c) for c in COLUMNS), now) for row in rows])
+        self.db.commit()
+
+    def import_csv(self, path, label, scheme=None):
+        """Load a campaign CSV; scheme and iteration are taken from the locked file name."""
+        run_id = self.run(label, source=str(path))
+        rows = []
+        with open(path, newline="") as f:
+            for rec in csv.DictReader(f):
+                match = re.search(r"_K\d+_(\d+)\.bench$", rec["Locked File"])
+                rows.append({
+                    "circuit": rec["Circuit"].replace(".bench", ""),
+                    "scheme": scheme or scheme_of(rec["Locked File"]) or "rll",
+                    "key_size": int(rec["Key Size"]),
+                    "iteration": int(match.group(1)) if match else len(rows),
+                    "locked_file": rec["Locked File"],
+                    "sat_time": float(rec["SAT Attack Runtime (s)"]) if rec["SAT Attack Runtime (s)"] else None,
+                    "iterations": int(rec["Iterations"]) if rec["Iterations"] not in ("", "None") else None,
+                    "key_correct": verdict(rec["Key Correct"]),
+                    "sensitization_time": float(rec["Sensitization Runtime (s)"])
+                    if rec.get("Sensitization Runtime (s)") else None,
+                    "sensitization_correct": verdict(rec.get("Sensitization Key Correct")),
+                })
+        self.add(run_id, rows)
+        return run_id, len(rows)
+
+    def completed(self):
+        """
+        (circuit, scheme, key_size, seed, engine) of every seeded result in any
+        run that reached a key verdict; failed and timed-out attacks are not done.
+        """
+        done = set()
+        for circuit, scheme, key_size, seed, key_correct, sensitization in self.db.execute(
+                "SELECT circuit, scheme, key_size, seed, key_correct, sensitization_correct FROM results "
+                "WHERE seed IS NOT NULL"):
+            if key_correct is not None:
+                done.add((circuit, scheme, key_size, seed, "sld"))
+            if sensitization is not None:
+                done.add((circuit, scheme, key_size, seed, "sensitization"))
+        return done
+
+    def runs(self):
+        return self.db.execute(
+            "SELECT r.label, r.started, COUNT(x.run_id) FROM runs r LEFT JOIN results x USING (run_id) "
+            "GROUP BY r.run_id ORDER BY r.started").fetchall()
+
+    def summary(self, metric="sat_time", run=None, by=GROUP_COLUMNS):
+        """
+        Per group: count, mean, percentiles of `metric` and key success rate.
+        Percentiles are nearest-rank, computed with window functions in SQLite.
+        """
+        if metric not in METRICS or any(c not in GROUP_COLUMNS for c in by):
+            raise ValueError(f"Unknown metric or grouping: {metric}, {by}")
+        group = ", ".join(by)
+        where, params = f"WHERE r.{metric} IS NOT NULL", []
+        if run is not None:
+            where += " AND r.run_id = (SELECT run_id FROM runs WHERE label = ?)"
+            params.append(run)
+        picks = ", ".join(
+            f"MIN(CASE WHEN rn = CAST({q} * (n - 1) AS INTEGER) + 1 THEN v END) AS p{int(q * 100)}"
+            for q in PERCENTILES)
+        sql = f"""
+            WITH ranked AS (
+                SELECT {group}, r.{metric} AS v, r.key_correct AS ok,
+                       ROW_NUMBER() OVER (PARTITION BY {group} ORDER BY r.{metric}) AS rn,
+                       COUNT(*) OVER (PARTITION BY {group}) AS n
+                FROM results r {where}
+            )
+            SELECT {group}, COUNT(*), AVG(v), {picks}, AVG(ok)
+            FROM ranked GROUP BY {group} ORDER BY {group}
+        """
+        names = [*by, "n", "mean", *(f"p{int(q * 100)}" for q in PERCENTILES), "success_rate"]
+        return [dict(zip(names, row)) for row in self.db.execute(sql, params)]
+
+    def compare(self, base, new, metric="sat_time", threshold=0.10):
+        """
+        Median `metric` per (circuit, key_size, scheme) in two runs; rows whose
+        median grew by more than `threshold` are marked as regressions.
+        """
+        base_rows = {tuple(r[c] for c in GROUP_COLUMNS): r for r in self.summary(metric, base)}
+        rows = []
+        for r in self.summary(metric, new):
+            key = tuple(r[c] for c in GROUP_COLUMNS)
+            if key not in base_rows:
+                continue
+            before, after = base_rows[key]["p50"], r["p50"]
+            change = (after - before) / before if before else None
+            rows.append({**dict(zip(GROUP_COLUMNS, key)), "base_p50": before, "new_p50": after,
+                         "change": change, "regression": change is not None and change > threshold})
+        return rows
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,158 @@
+"""
+asyncio subprocess runner for campaign stages (lock, sld, lcmp)
+- One event loop drives every in-flight stage; no thread per task
+- stdout is parsed line by line as it arrives, so solver progress is visible live
+- Timeouts and cancellation terminate the child (then kill it if it lingers);
+  only _reap ever waits on it
+- Children are started with subprocess.Popen and their stdout attached to the
+  loop with connect_read_pipe, rather than asyncio.create_subprocess_exec:
+  asyncio's child watcher would reap them itself and drop their rusage
+- Each child is reaped with wait4, so its CPU time is reported
+- Peak RSS is the child's VmHWM, sampled from /proc while it runs. wait4's
+  ru_maxrss is not used: the exec'd child inherits the forking process's RSS
+  as its maximum, so it reports the coordinator's size for small tools.
+  A child that exits before the first sample reports its start-up footprint
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import subprocess
+import time
+
+KILL_GRACE_SECONDS = 2
+RSS_POLL_SECONDS = 0.2
+
+
+class SldProgress:
+    """Incremental parser for sld output (`iteration=N; ...` and `key=...` lines)."""
+
+    def __init__(self):
+        self.iterations = None
+        self.key = None
+
+    def feed(self, line):
+        if line.startswith("key="):
+            self.key = line.replace("key=", "").strip()
+        elif line.startswith("iteration="):
+            try:
+                self.iterations = int(line.split(";")[0].split("=")[1].strip())
+            except (IndexError, ValueError):
+                pass
+
+
+def _usage(ru):
+    return {"cpu_time": round(ru.ru_utime + ru.ru_stime, 3)}
+
+
+def _hwm_kb(pid):
+    """Peak RSS so far (VmHWM) of a running process, or None once it has exited or without /proc."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+async def _watch_rss(pid, reaper):
+    """Highest VmHWM seen until the child is reaped."""
+    peak = None
+    while not reaper.done():
+        hwm = _hwm_kb(pid)
+        if hwm is not None:
+            peak = max(peak or 0, hwm)
+        await asyncio.wait([reaper], timeout=RSS_POLL_SECONDS)
+    return peak
+
+
+async def _reap(proc):
+    """
+    Wait for the child with os.wait4 so its own rusage (CPU time) is
+    kept; asyncio's child watchers reap with waitpid and discard it. Waits on a
+    pidfd from the event loop, or in a worker thread where pidfds are missing.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        fd = os.pidfd_open(proc.pid)
+    except (AttributeError, OSError):
+        _, status, ru = await loop.run_in_executor(None, os.wait4, proc.pid, 0)
+    else:
+        exited = loop.create_future()
+        loop.add_reader(fd, lambda: exited.done() or exited.set_result(None))
+        try:
+            await exited
+        finally:
+            loop.remove_reader(fd)
+            os.close(fd)
+        _, status, ru = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return _usage(ru)
+
+
+def _signal(proc, sig):
+    """
+    Signal the child with os.kill: Popen.terminate/kill poll() first, and a
+    poll that reaps a child that just exited leaves _reap's wait4 without one.
+    """
+    try:
+        os.kill(proc.pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+async def _terminate(proc, reaper):
+    if reaper.done():
+        return
+    _signal(proc, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(asyncio.shield(reaper), KILL_GRACE_SECONDS)
+    except asyncio.TimeoutError:
+        _signal(proc, signal.SIGKILL)
+        await reaper
+
+
+async def run_stage(args, on_line=None, timeout=None):
+    """
+    Run one external command. `on_line` is called with each stdout line as it
+    arrives. Returns (output, runtime, returncode, usage); returncode is None on
+    timeout and usage holds the child's CPU time and peak RSS.
+    Cancelling the awaiting task terminates the child.
+    """
+    loop = asyncio.get_running_loop()
+    start = time.time()
+    proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    reaper = asyncio.ensure_future(_reap(proc))
+    rss = asyncio.ensure_future(_watch_rss(proc.pid, reaper))
+    reader = asyncio.StreamReader()
+    transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), proc.stdout)
+    lines = []
+
+    async def pump():
+        async for raw in reader:
+            line = raw.decode(errors="replace").rstrip("\n")
+            lines.append(line)
+            if on_line is not None:
+                on_line(line)
+        await asyncio.shield(reaper)
+
+    timed_out = False
+    try:
+        await asyncio.wait_for(pump(), timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+        logging.error("Command timed out after %ss: %s", timeout, " ".join(map(str, args)))
+    finally:
+        transport.close()
+        await _terminate(proc, reaper)
+
+    usage = reaper.result()
+    usage["max_rss_kb"] = await rss
+    returncode = None if timed_out else proc.returncode
+    output = "\n".join(lines)
+    if returncode:
+        logging.error("Command failed: %s\nError: %s", " ".join(map(str, args)), output)
+    return output, round(time.time() - start, 3), returncode, usage
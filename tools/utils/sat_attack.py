@@ -0,0 +1,285 @@
+"""
+In-process oracle-guided SAT attack
+- Tseitin-encodes the locked netlist with pysat (key-independent logic is
+  shared between miter copies and folded to constants under a DIP)
+- Exact mode: add distinguishing input patterns (DIPs) until no two keys disagree
+- AppSAT mode: every few DIPs, measure the candidate key's error rate on random
+  oracle queries and stop once it falls under a threshold
+"""
+
+import math
+import threading
+import time
+
+import numpy as np
+
+from .simulate import (CompiledNetlist, compile_netlist, simulate, random_words, assign_inputs,
+                       constant_words, popcount, word_bit)
+
+try:
+    from pysat.solvers import Solver
+except ImportError:  # optional dependency, only needed for this engine
+    Solver = None
+
+
+class CnfBuilder:
+    def __init__(self, solver):
+        self.solver = solver
+        self.top = 0
+        self.true = self.new_var()
+        solver.add_clause([self.true])
+
+    def new_var(self):
+        self.top += 1
+        return self.top
+
+    def const(self, bit):
+        return self.true if bit else -self.true
+
+    def add_gate(self, gate_type, ins):
+        add = self.solver.add_clause
+        if gate_type in ("BUF", "NOT"):
+            return ins[0] if gate_type == "BUF" else -ins[0]
+        if gate_type in ("XOR", "XNOR"):
+            acc = ins[0]
+            for b in ins[1:]:
+                out = self.new_var()
+                add([-out, acc, b])
+                add([-out, -acc, -b])
+                add([out, -acc, b])
+                add([out, acc, -b])
+                acc = out
+            return acc if gate_type == "XOR" else -acc
+        out = self.new_var()
+        if gate_type in ("AND", "NAND"):
+            for a in ins:
+                add([-out, a])
+            add([out] + [-a for a in ins])
+        elif gate_type in ("OR", "NOR"):
+            for a in ins:
+                add([out, -a])
+            add([-out] + ins)
+        else:
+            raise ValueError(f"Unsupported gate type {gate_type}")
+        return out if gate_type in ("AND", "OR") else -out
+
+    def add_circuit(self, netlist, order, lits):
+        """Encode the gates in `order`; `lits` maps already-known nets to literals."""
+        lits = dict(lits)
+        for name in order:
+            gate_type, fanins = netlist.gates[name]
+            lits[name] = self.add_gate(gate_type, [lits[f] for f in fanins])
+        return lits
+
+
+class Oracle:
+    """Simulation of the original design, answering input-pattern queries."""
+
+    def __init__(self, netlist):
+        # An already compiled design (e.g. attached from shared memory) is used as is
+        self.compiled = netlist if isinstance(netlist, CompiledNetlist) else compile_netlist(netlist)
+        self.queries = 0
+
+    def query(self, named_words, n_patterns):
+        n_words = next(iter(named_words.values())).shape[0]
+        words = assign_inputs(self.compiled, named_words, n_words)
+        self.queries += n_patterns
+        values = simulate(self.compiled, words)
+        return {n: values[i] for n, i in zip(self.compiled.output_names, self.compiled.outputs)}
+
+
+# default: take whatever DIP the solver finds first
+# random-phase: re-randomize the input variables' preferred polarity before each DIP
+DIP_STRATEGIES = ("default", "random-phase")
+# Strategies whose DIP search depends on the seed
+SEEDED_STRATEGIES = ("random-phase",)
+
+
+def hoeffding_bound(error_rate, samples, confidence=0.95):
+    return min(1.0, error_rate + math.sqrt(math.log(1 / (1 - confidence)) / (2 * samples)))
+
+
+class SatAttack:
+    def __init__(self, locked, original, solver_name="g4", seed=0, dip_strategy="default"):
+        if Solver is None:
+            raise ImportError("The in-process SAT attack needs python-sat (pip install python-sat)")
+        self.locked = locked
+        self.oracle = Oracle(original)
+        self.compiled = compile_netlist(locked)
+        self.rng = np.random.default_rng(seed)
+        if dip_strategy not in DIP_STRATEGIES:
+            raise ValueError(f"Unknown DIP strategy {dip_strategy}")
+        self.dip_strategy = dip_strategy
+        self.pis = locked.primary_inputs
+        self.keys = locked.key_inputs
+        if not self.keys:
+            raise ValueError("Locked netlist has no key inputs")
+
+        order = locked.topological_order()
+        tainted = set(self.keys)
+        for name in order:
+            if any(f in tainted for f in locked.gates[name][1]):
+                tainted.add(name)
+        self.free_order = [g for g in order if g not in tainted]
+        self.key_order = [g for g in order if g in tainted]
+        self.key_outputs = [o for o in locked.outputs if o in tainted]
+
+        self.solver = Solver(name=solver_name)
+        # CaDiCaL and Lingeling cannot be interrupted; they only honour the timeout between DIPs
+        self.interruptible = not solver_name.startswith(("cd", "lgl"))
+        self.cnf = CnfBuilder(self.solver)
+        self.x = {p: self.cnf.new_var() for p in self.pis}
+        self.k1 = {k: self.cnf.new_var() for k in self.keys}
+        self.k2 = {k: self.cnf.new_var() for k in self.keys}
+
+        # Two copies share the key-independent logic and differ only on tainted gates
+        shared = self.cnf.add_circuit(locked, self.free_order, self.x)
+        copy1 = self.cnf.add_circuit(locked, self.key_order, {**shared, **self.k1})
+        copy2 = self.cnf.add_circuit(locked, self.key_order, {**shared, **self.k2})
+        diffs = []
+        for o in self.key_outputs:
+            d = self.cnf.new_var()
+            a, b = copy1[o], copy2[o]
+            self.solver.add_clause([-d, a, b])
+            self.solver.add_clause([-d, -a, -b])
+            diffs.append(d)
+        # The miter is switched on by assumption so the same solver yields keys
+        self.act = self.cnf.new_var()
+        self.solver.add_clause([-self.act] + diffs)
+
+        self.dips = 0
+        self.constraints = 0
+
+    def add_io_constraint(self, pattern, response):
+        """Pin both key copies to the oracle's response for one input pattern."""
+        named = {p: constant_words(pattern[p], 1) for p in self.pis}
+        for k in self.keys:
+            named[k] = constant_words(0, 1)
+        values = simulate(self.compiled, assign_inputs(self.compiled, named, 1))
+        # Key-independent nets are constants under a fixed pattern
+        consts = {}
+        for p in self.pis:
+            consts[p] = self.cnf.const(pattern[p])
+        for g in self.free_order:
+            consts[g] = self.cnf.const(values[self.compiled.index[g], 0] & 1)
+        for key_lits in (self.k1, self.k2):
+            lits = self.cnf.add_circuit(self.locked, self.key_order, {**consts, **key_lits})
+            for o in self.key_outputs:
+                self.solver.add_clause([lits[o] if response[o] else -lits[o]])
+        self.constraints += 1
+
+    def find_dip(self, deadline=None):
+        """Next DIP, None once the miter is UNSAT, or False if `deadline` passed."""
+        if self.dip_strategy == "random-phase":
+            flips = self.rng.random(len(self.x)) < 0.5
+            self.solver.set_phases([-v if f else v for v, f in zip(self.x.values(), flips)])
+        if deadline is not None and time.time() > deadline:
+            return False
+        if deadline is None or not self.interruptible:
+            sat = self.solver.solve(assumptions=[self.act])
+        else:
+            timer = threading.Timer(max(0.0, deadline - time.time()), self.solver.interrupt)
+            timer.start()
+            try:
+                sat = self.solver.solve_limited(assumptions=[self.act], expect_interrupt=True)
+            finally:
+                timer.cancel()
+                self.solver.clear_interrupt()
+            if sat is None:
+                return False
+        if not sat:
+            return None
+        model = self.solver.get_model()
+        return {p: int(model[v - 1] > 0) for p, v in self.x.items()}
+
+    def candidate_key(self):
+        if not self.solver.solve(assumptions=[-self.act]):
+            raise RuntimeError("No key is consistent with the oracle responses")
+        model = self.solver.get_model()
+        return "".join("1" if model[self.k1[k] - 1] > 0 else "0" for k in self.keys)
+
+    def query_pattern(self, pattern):
+        named = {p: constant_words(pattern[p], 1) for p in self.pis}
+        response = self.oracle.query(named, 1)
+        return {o: int(response[o][0] & np.uint64(1)) for o in self.key_outputs}
+
+    def estimate_error(self, key, n_words, reinforce=0):
+        """Error rate of `key` over n_words*64 random queries; failing queries become constraints."""
+        rand = random_words(len(self.pis), n_words, self.rng)
+        named = dict(zip(self.pis, rand))
+        golden = self.oracle.query(named, n_words * 64)
+        for k, bit in zip(self.keys, key):
+            named[k] = constant_words(bit == "1", n_words)
+        values = simulate(self.compiled, assign_inputs(self.compiled, named, n_words))
+        wrong = np.zeros(n_words, dtype=np.uint64)
+        for o in self.key_outputs:
+            wrong |= values[self.compiled.index[o]] ^ golden[o]
+        errors = popcount(wrong)
+        for pattern in self._failing_patterns(wrong, reinforce):
+            bits = {p: int(word_bit(rand[i], pattern)) for i, p in enumerate(self.pis)}
+            self.add_io_constraint(bits, {o: int(word_bit(golden[o], pattern)) for o in self.key_outputs})
+        return errors / (n_words * 64)
+
+    @staticmethod
+    def _failing_patterns(wrong, limit):
+        found = []
+        for w in np.nonzero(wrong)[0]:
+            bits = int(wrong[w])
+            while bits and len(found) < limit:
+                low = bits & -bits
+                found.append(int(w) * 64 + low.bit_length() - 1)
+                bits ^= low
+            if len(found) >= limit:
+                break
+        return found
+
+    def run(self, mode="exact", error_threshold=0.01, query_words=16, dip_interval=8,
+            reinforce=4, max_iterations=None, timeout=None):
+        """
+        Returns a dict with the recovered key, DIP count, oracle queries,
+        the measured error rate and its 95% Hoeffding bound, and the stop reason.
+        """
+        start = time.time()
+        deadline = None if timeout is None else start + timeout
+        error_rate, error_bound, status = None, None, None
+        while True:
+            if max_iterations is not None and self.dips >= max_iterations:
+                status = "max_iterations"
+                break
+            dip = self.find_dip(deadline)
+            if dip is False:
+                status = "timeout"
+                break
+            if dip is None:
+                status = "exact"
+                error_rate, error_bound = 0.0, 0.0
+                break
+            self.add_io_constraint(dip, self.query_pattern(dip))
+            self.dips += 1
+            if mode == "appsat" and self.dips % dip_interval == 0:
+                key = self.candidate_key()
+                error_rate = self.estimate_error(key, query_words, reinforce)
+                error_bound = hoeffding_bound(error_rate, query_words * 64)
+                if error_rate <= error_threshold:
+                    status = "approximate"
+                    break
+
+        # An approximate key is the one that was measured: estimate_error() has
+        # since added reinforcement constraints, so solving again could pick another
+        if status != "approximate":
+            key = self.candidate_key()
+        if status in ("timeout", "max_iterations"):
+            error_rate = self.estimate_error(key, query_words)
+            error_bound = hoeffding_bound(error_rate, query_words * 64)
+        return {
+            "key": key,
+            "iterations": self.dips,
+            "queries": self.oracle.queries,
+            "error_rate": error_rate,
+            "error_bound": error_bound,
+            "status": status,
+            "runtime": round(time.time() - start, 3),
+        }
+
+    def close(self):
+        self.solver.delete()
@@ -0,0 +1,77 @@
+"""
+Scratch area for intermediate netlists (locked variants, extracted cones)
+- "disk": files live in the given folder and are kept, as before
+- "ram": files live in a private directory on tmpfs (/dev/shm), so sld and
+  lcmp read them back from memory; falls back to the system temp dir when
+  there is no tmpfs
+- Only files passed to keep() are copied to persistent storage; everything
+  else is removed by release() or when the area is closed
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+
+RAM_ROOTS = ("/dev/shm",)
+
+
+def ram_root():
+    for root in RAM_ROOTS:
+        if os.path.isdir(root) and os.access(root, os.W_OK):
+            return root
+    logging.warning("No writable tmpfs found, using %s for scratch files", tempfile.gettempdir())
+    return None
+
+
+class Scratch:
+    def __init__(self, kind="disk", folder="locked_circuits"):
+        if kind not in ("disk", "ram"):
+            raise ValueError(f"Unknown scratch kind: {kind}")
+        self.kind = kind
+        self.folder = folder
+        if kind == "ram":
+            self.root = tempfile.mkdtemp(prefix="iotsec-", dir=ram_root())
+        else:
+            self.root = folder
+            os.makedirs(folder, exist_ok=True)
+
+    @property
+    def in_ram(self):
+        return self.kind == "ram"
+
+    def path(self, name):
+        """Path for a new intermediate file; `name` may contain subfolders."""
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def keep(self, path):
+        """Persist a scratch file under `folder`; returns the persistent path."""
+        if not self.in_ram:
+            return path
+        dest = os.path.join(self.folder, os.path.relpath(path, self.root))
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.copyfile(path, dest)
+        return dest
+
+    def release(self, *paths):
+        """Drop scratch files that are no longer needed (no-op on disk)."""
+        if not self.in_ram:
+            return
+        for path in paths:
+            if path and os.path.abspath(path).startswith(os.path.abspath(self.root) + os.sep):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def close(self):
+        if self.in_ram:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
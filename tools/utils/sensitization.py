@@ -0,0 +1,314 @@
+"""
+Oracle-guided key-sensitization attack for XOR/XNOR (RLL-style) key gates
+- Searches random input patterns on which an output is an XOR of some
+  unresolved key bits plus a constant, whatever those bits are: flipping each
+  unresolved bit either always or never flips the output (checked over many
+  random assignments of them). Usually that is one bit with the other key
+  gates muted; key gates on XOR paths to the same output give several
+- One oracle query on such a pattern gives a linear equation over GF(2) on
+  those bits; the equations are solved by elimination, and a bit is resolved
+  once the equations fix its value. Resolved bits are held constant in the
+  next round, which retries the rest with a fresh (and, after a round that
+  learned nothing, larger) pattern set
+- Key gates that reconverge through AND/OR logic give no such pattern. For
+  them, patterns where an output depends on at most JOINT_BITS unresolved bits
+  are simulated under every assignment of those bits; an oracle query keeps
+  the assignments that match, and a bit is resolved once all assignments
+  left for some set of bits agree on it
+- Patterns and key samples are packed into the same uint64 words, and only the
+  fan-out cone of the key bit under test is re-simulated
+- A candidate pattern is confirmed against many more key samples before it is
+  trusted, since one wrong equation would mislead every later round
+- Bits no equation fixes are reported as "x" in the key, not guessed; the
+  error rate is measured on a candidate key that satisfies every equation
+"""
+
+import time
+
+import numpy as np
+
+from .simulate import (compile_netlist, simulate, evaluate, random_words, constant_words,
+                       assign_inputs, mismatch_rate, word_bit, ALL_ONES)
+from .sat_attack import Oracle
+
+# Most unresolved bits an output may depend on for the joint pass
+JOINT_BITS = 6
+
+
+def _bits(words):
+    """Packed patterns as one bool per pattern, for every row of `words`."""
+    return np.unpackbits(np.ascontiguousarray(words).view(np.uint8), axis=-1, bitorder="little").astype(bool)
+
+
+def _first_bit(mask):
+    nz = np.nonzero(mask)[0]
+    if not len(nz):
+        return None
+    w = int(nz[0])
+    bits = int(mask[w])
+    return w * 64 + (bits & -bits).bit_length() - 1
+
+
+class Equations:
+    """Linear equations over GF(2) on key bit positions: the XOR of the bits in `mask` equals `value`."""
+
+    def __init__(self):
+        # pivot bit -> (mask, value), kept reduced: no row contains another row's pivot
+        self.rows = {}
+
+    def reduce(self, mask, value=0):
+        for pivot, (row, bit) in self.rows.items():
+            if mask >> pivot & 1:
+                mask ^= row
+                value ^= bit
+        return mask, value
+
+    def add(self, mask, value):
+        """Add one equation; False if it follows from the others."""
+        mask, value = self.reduce(mask, value)
+        if not mask:
+            return False
+        pivot = (mask & -mask).bit_length() - 1
+        for other, (row, bit) in self.rows.items():
+            if row >> pivot & 1:
+                self.rows[other] = (row ^ mask, bit ^ value)
+        self.rows[pivot] = (mask, value)
+        return True
+
+    def solved(self):
+        """{bit: value} for the bits the equations fix."""
+        return {pivot: bit for pivot, (row, bit) in self.rows.items() if row == 1 << pivot}
+
+    def solution(self):
+        """One assignment satisfying every equation, with the unfixed bits at 0."""
+        return {pivot: bit for pivot, (row, bit) in self.rows.items()}
+
+
+class SensitizationAttack:
+    def __init__(self, locked, original, seed=0):
+        self.locked = locked
+        self.compiled = compile_netlist(locked)
+        self.oracle = Oracle(original)
+        self.rng = np.random.default_rng(seed)
+        self.pis = locked.primary_inputs
+        self.keys = locked.key_inputs
+        if not self.keys:
+            raise ValueError("Locked netlist has no key inputs")
+        # Cone index: per key input, its fan-out gates (as evaluation groups) and outputs
+        out_pos = {int(idx): i for i, idx in enumerate(self.compiled.outputs)}
+        self.cones = {}
+        for k in self.keys:
+            gates = self.compiled.fanout_gates([self.compiled.index[k]])
+            nets = self.compiled.first_gate + gates
+            outs = np.array([out_pos[n] for n in nets if int(n) in out_pos], dtype=np.int64)
+            self.cones[k] = (self.compiled.groups_for(gates), outs)
+
+    def _assign(self, known, bits, n_words):
+        """Input words: pattern `bits` on the primary inputs, the known keys fixed, random other keys."""
+        named = {p: constant_words(b, n_words) for p, b in zip(self.pis, bits)}
+        for k in self.keys:
+            named[k] = constant_words(known[k], n_words) if k in known else random_words(1, n_words, self.rng)[0]
+        return named
+
+    def _confirm(self, known, bits, out, subset, confirm_words):
+        """
+        Re-check one pattern against confirm_words*64 assignments of the
+        unresolved keys: the output must be the XOR of the keys in `subset`
+        and a constant. Returns the constant, or None.
+        """
+        named = self._assign(known, bits, confirm_words)
+        values = simulate(self.compiled, assign_inputs(self.compiled, named, confirm_words))
+        rest = values[self.compiled.outputs[out]].copy()
+        for k in subset:
+            rest ^= named[k]
+        if np.all(rest == 0):
+            return 0
+        if np.all(rest == ALL_ONES):
+            return 1
+        return None
+
+    def _enumerate(self, known, bits, out, subset, confirm_words):
+        """
+        The output under every assignment of `subset` (assignment a sets
+        subset[i] to bit i of a), each checked against many random assignments
+        of the other unresolved keys. Returns the list of output bits, or None
+        if the other keys still matter.
+        """
+        size = 1 << len(subset)
+        # At least 64 samples of the other keys per assignment
+        confirm_words = max(confirm_words, size)
+        lane = np.arange(64 * confirm_words) % size
+        named = self._assign(known, bits, confirm_words)
+        for i, k in enumerate(subset):
+            named[k] = np.packbits((lane >> i & 1).astype(bool), bitorder="little").view(np.uint64)
+        values = simulate(self.compiled, assign_inputs(self.compiled, named, confirm_words))
+        response = _bits(values[self.compiled.outputs[out]])
+        table = []
+        for a in range(size):
+            seen = response[lane == a]
+            if seen.any() != seen.all():
+                return None
+            table.append(int(seen[0]))
+        return table
+
+    def _propagate(self, equations, joint):
+        """
+        Add every XOR of bits that all assignments left in a joint constraint
+        agree on (a single bit fixes it) to the equations.
+        """
+        added, changed = 0, True
+        while changed:
+            changed = False
+            solved = equations.solved()
+            for subset, candidates in joint.items():
+                candidates = {a for a in candidates
+                              if all(solved.get(p, a >> i & 1) == a >> i & 1 for i, p in enumerate(subset))}
+                joint[subset] = candidates
+                for mask in range(1, 1 << len(subset)) if candidates else ():
+                    parities = {bin(a & mask).count("1") & 1 for a in candidates}
+                    bits = sum(1 << p for i, p in enumerate(subset) if mask >> i & 1)
+                    if len(parities) == 1 and equations.add(bits, parities.pop()):
+                        added += 1
+                        changed = True
+        return added
+
+    def _joint(self, k, equations, joint, known, unresolved, never, pi_words, confirm_words, tries):
+        """
+        Query the oracle on patterns where bit k and at most JOINT_BITS - 1
+        other unresolved bits reach an output, until one narrows a joint
+        constraint or `tries` queries are spent. Returns whether one did.
+        """
+        position = {j: i for i, j in enumerate(self.keys)}
+        row = unresolved.index(k)
+        for o in self.cones[k][1]:
+            quiet = np.stack([never[j][o] for j in unresolved])
+            flips = ~_bits(quiet)
+            candidates = np.nonzero(flips[row] & (flips.sum(axis=0) <= JOINT_BITS))[0]
+            if not len(candidates):
+                continue
+            pattern = int(candidates[0])
+            subset = [j for j, f in zip(unresolved, flips[:, pattern]) if f]
+            bits = [int(word_bit(pi_words[i], pattern)) for i in range(len(self.pis))]
+            table = self._enumerate(known, bits, o, subset, confirm_words)
+            if table is None or len(set(table)) == 1:
+                continue
+            golden = self.oracle.query({p: constant_words(b, 1) for p, b in zip(self.pis, bits)}, 1)
+            answer = int(golden[self.compiled.output_names[o]][0] & np.uint64(1))
+            subset = tuple(position[j] for j in subset)
+            before = joint.get(subset, set(range(len(table))))
+            joint[subset] = before & {a for a, v in enumerate(table) if v == answer}
+            if len(joint[subset]) < len(before):
+                return True
+            tries -= 1
+            if not tries:
+                break
+        return False
+
+    def _round(self, equations, joint, pattern_words, samples, confirm_words, tries):
+        """
+        One pass over the unresolved bits with a fresh random pattern set;
+        returns how many queries added an equation or narrowed a joint constraint.
+        """
+        known = {self.keys[i]: v for i, v in equations.solved().items()}
+        unresolved = [k for k in self.keys if k not in known]
+        position = {k: i for i, k in enumerate(self.keys)}
+        n = pattern_words * samples
+        pi_words = random_words(len(self.pis), pattern_words, self.rng)
+        named = {p: np.tile(row, samples) for p, row in zip(self.pis, pi_words)}
+        for k in self.keys:
+            named[k] = constant_words(known[k], n) if k in known else random_words(1, n, self.rng)[0]
+        values = simulate(self.compiled, assign_inputs(self.compiled, named, n))
+        outputs = self.compiled.outputs
+
+        # Per unresolved bit, per output and pattern: flipping it flips the output for every sample / for none
+        always, never = {}, {}
+        for k in unresolved:
+            groups, outs = self.cones[k]
+            always[k] = np.zeros((len(outputs), pattern_words), dtype=np.uint64)
+            never[k] = np.full((len(outputs), pattern_words), ALL_ONES, dtype=np.uint64)
+            if not len(outs):
+                continue
+            row = self.compiled.index[k]
+            saved = values[row].copy()
+            responses = []
+            for bit in (0, 1):
+                values[row] = constant_words(bit, n)
+                evaluate(values, groups)
+                responses.append(values[outputs[outs]].reshape(len(outs), samples, pattern_words))
+            values[row] = saved
+            evaluate(values, groups)
+            flips = responses[0] ^ responses[1]
+            always[k][outs] = np.bitwise_and.reduce(flips, axis=1)
+            never[k][outs] = ~np.bitwise_or.reduce(flips, axis=1)
+        # Where every unresolved bit always or never flips the output, it is an XOR of the former
+        affine = np.full((len(outputs), pattern_words), ALL_ONES, dtype=np.uint64)
+        for k in unresolved:
+            affine &= always[k] | never[k]
+
+        added = 0
+        for k in unresolved:
+            good = always[k] & affine
+            found = False
+            for o in np.nonzero(good.any(axis=1))[0][:tries]:
+                pattern = _first_bit(good[o])
+                subset = [j for j in unresolved if word_bit(always[j][o], pattern)]
+                mask = sum(1 << position[j] for j in subset)
+                if not equations.reduce(mask)[0]:
+                    continue
+                bits = [int(word_bit(pi_words[i], pattern)) for i in range(len(self.pis))]
+                constant = self._confirm(known, bits, o, subset, confirm_words)
+                if constant is None:
+                    continue
+                golden = self.oracle.query({p: constant_words(b, 1) for p, b in zip(self.pis, bits)}, 1)
+                name = self.compiled.output_names[o]
+                found = equations.add(mask, int(golden[name][0] & np.uint64(1)) ^ constant)
+                break
+            if not found:
+                found = self._joint(k, equations, joint, known, unresolved, never, pi_words, confirm_words, tries)
+            added += found
+        self._propagate(equations, joint)
+        return added
+
+    def run(self, pattern_words=16, samples=16, max_rounds=32, confirm_words=16, tries=4,
+            patience=4, verify_words=16, measure=None, max_pattern_words=None):
+        """
+        Rounds until every bit is resolved, `patience` rounds in a row learn
+        nothing, or `max_rounds`. A round that learns nothing doubles the
+        pattern set, up to `max_pattern_words` (default 8x `pattern_words`).
+        The result's "key" has "x" for unresolved bits; "candidate" sets them to
+        satisfy every equation, and "error_rate" is the candidate's.
+        `measure(compiled, fixed)` gives that error rate (e.g. from cached golden
+        responses); by default the oracle is simulated.
+        """
+        start = time.time()
+        max_pattern_words = max_pattern_words or 8 * pattern_words
+        equations, joint = Equations(), {}
+        rounds, stalled = 0, 0
+        while len(equations.solved()) < len(self.keys) and rounds < max_rounds and stalled < patience:
+            rounds += 1
+            if self._round(equations, joint, pattern_words, samples, confirm_words, tries):
+                stalled = 0
+            else:
+                # Bits left may need rarer patterns
+                stalled += 1
+                pattern_words = min(2 * pattern_words, max_pattern_words)
+
+        solved, solution = equations.solved(), equations.solution()
+        key = "".join(str(solved[i]) if i in solved else "x" for i in range(len(self.keys)))
+        # Unresolved bits set to satisfy every equation; key gates in series are only known up to their XOR
+        candidate = "".join(str(solution.get(i, 0)) for i in range(len(self.keys)))
+        fixed = dict(zip(self.keys, (int(b) for b in candidate)))
+        if measure is not None:
+            error_rate = measure(self.compiled, fixed)
+        else:
+            error_rate = mismatch_rate(self.compiled, self.oracle.compiled, verify_words, self.rng, fixed)
+        return {
+            "key": key,
+            "candidate": candidate,
+            "resolved": len(solved),
+            "unresolved": len(self.keys) - len(solved),
+            "queries": self.oracle.queries,
+            "rounds": rounds,
+            "error_rate": error_rate,
+            "runtime": round(time.time() - start, 3),
+        }
@@ -0,0 +1,160 @@
+"""
+Compiled netlists shared between worker processes
+- The coordinator publishes each original design once: the CompiledNetlist
+  arrays, its packed evaluation groups and its net names go into shared
+  memory (SharedDesigns.publish returns a small picklable handle)
+- Workers attach read-only and get a CompiledNetlist whose arrays are views
+  into the shared blocks; only the name index is built per process, once
+- A variant (locked or Trojan-infected copy of the design) is an Overlay on
+  the attached original: gates identical to the original's are not
+  compiled again. The variant's new or changed gates, and the original gates
+  in their fan-out, form extra groups evaluated after the shared ones, so
+  per-process memory grows with the edits, not with the design
+"""
+
+import os
+import threading
+from collections import ChainMap
+
+import numpy as np
+
+from .netlist import parse_netlist
+from .parallel_sim import SharedArrays, attach as attach_arrays, pack_groups, unpack_groups
+from .simulate import GATE_OPS, PAD, CompiledNetlist, compile_netlist, evaluate
+
+ARRAYS = ("op", "invert", "fanin_ptr", "fanin_idx", "level", "inputs", "outputs")
+
+# Per-process cache of attached designs: handle id -> (CompiledNetlist, open blocks)
+_attached = {}
+
+
+class SharedDesigns:
+    """Coordinator side: publishes each design once and owns its shared blocks. Thread-safe."""
+
+    def __init__(self):
+        self.shared = SharedArrays()
+        self.handles = {}
+        self._lock = threading.Lock()
+
+    def publish(self, path):
+        """Handle for the compiled design at `path`, publishing it on first use."""
+        key = (os.path.abspath(path), os.path.getmtime(path))
+        with self._lock:
+            return self._publish(key, path)
+
+    def _publish(self, key, path):
+        if key not in self.handles:
+            compiled = compile_netlist(parse_netlist(path))
+            prefix = f"{len(self.handles)}."
+            for name in ARRAYS:
+                array = getattr(compiled, name)
+                self.shared.add(prefix + name, array.shape, array.dtype, array)
+            for name, array in zip(("table", "outs", "fans"), pack_groups(compiled.groups)):
+                self.shared.add(prefix + name, array.shape, array.dtype, array)
+            blob = np.frombuffer("\n".join(compiled.names).encode(), dtype=np.uint8)
+            self.shared.add(prefix + "names", blob.shape, np.uint8, blob)
+            spec = {k[len(prefix):]: v for k, v in self.shared.spec.items() if k.startswith(prefix)}
+            self.handles[key] = {"id": f"{os.getpid()}:{key[0]}:{key[1]}", "spec": spec,
+                                 "first_gate": compiled.first_gate}
+        return self.handles[key]
+
+    def close(self):
+        self.shared.close()
+        self.handles.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach(handle):
+    """The published design as a read-only CompiledNetlist, attached once per process."""
+    if handle["id"] not in _attached:
+        arrays, blocks = attach_arrays(handle["spec"])
+        for array in arrays.values():
+            array.flags.writeable = False
+        # Filled in directly: the arrays already exist, nothing to compile
+        compiled = CompiledNetlist.__new__(CompiledNetlist)
+        for name in ARRAYS:
+            setattr(compiled, name, arrays[name])
+        compiled.names = bytes(arrays["names"]).decode().split("\n")
+        compiled.index = {n: i for i, n in enumerate(compiled.names)}
+        compiled.first_gate = handle["first_gate"]
+        compiled.input_names = compiled.names[2:compiled.first_gate]
+        compiled.output_names = [compiled.names[i] for i in compiled.outputs]
+        compiled.groups = unpack_groups(arrays["table"], arrays["outs"], arrays["fans"])
+        _attached[handle["id"]] = (compiled, blocks)
+    return _attached[handle["id"]][0]
+
+
+class Overlay:
+    """
+    A variant of `base` (a CompiledNetlist, usually attached) for simulate():
+    its groups are the base groups followed by the variant's own. Net indices
+    of the base are kept; the variant's new nets are numbered after them.
+    extend() reuses a simulation of the base for the same input patterns.
+    """
+
+    def __init__(self, base, variant):
+        self.base = base
+        inputs = set(variant.inputs)
+        missing = [i for i in base.input_names if i not in inputs]
+        if missing:
+            raise ValueError(f"Variant drops inputs of the original: {missing[:5]}")
+        new = {}
+
+        def index(net):
+            if net in base.index:
+                return base.index[net]
+            if net not in new:
+                new[net] = base.n_nets + len(new)
+            return new[net]
+
+        for net in variant.inputs:
+            index(net)
+        # A gate is re-evaluated if it differs from the base or reads a net that does
+        dirty, level, buckets = set(new), {}, {}
+        for name in variant.topological_order():
+            gate_type, fanins = variant.gates[name]
+            if gate_type not in GATE_OPS:
+                raise ValueError(f"Unsupported gate type {gate_type} for {name}")
+            op, invert = GATE_OPS[gate_type]
+            idx = [index(f) for f in fanins]
+            g = base.index.get(name, -1) - base.first_gate
+            same = (g >= 0 and (base.op[g], base.invert[g]) == (op, invert)
+                    and base.fanin_idx[base.fanin_ptr[g]:base.fanin_ptr[g + 1]].tolist() == idx)
+            if same and not any(f in dirty for f in fanins):
+                continue
+            dirty.add(name)
+            level[name] = 1 + max((level.get(f, 0) for f in fanins), default=0)
+            buckets.setdefault((level[name], op, invert), []).append((index(name), idx))
+
+        self.own_groups = []
+        for (_, op, invert), members in sorted(buckets.items()):
+            width = max(len(idx) for _, idx in members)
+            fan = np.full((len(members), width), PAD[op], dtype=np.int64)
+            for row, (_, idx) in enumerate(members):
+                fan[row, :len(idx)] = idx
+            out = np.array([net for net, _ in members], dtype=np.int64)
+            self.own_groups.append((op, invert, out, fan))
+        self.groups = base.groups + self.own_groups
+        self.n_overlay_gates = len(dirty) - sum(1 for n in variant.inputs if n in new)
+
+        self.index = ChainMap(new, base.index)
+        self.n_nets = base.n_nets + len(new)
+        self.input_names = list(variant.inputs)
+        self.output_names = list(variant.outputs)
+        self.inputs = np.array([self.index[n] for n in variant.inputs], dtype=np.int64)
+        self.outputs = np.array([self.index[n] for n in variant.outputs], dtype=np.int64)
+        self.key = variant.key
+
+    def extend(self, base_values):
+        """Values of every variant net from the base's simulation of the same patterns (no new inputs)."""
+        if len(self.inputs) > len(self.base.inputs):
+            raise ValueError("Variant has inputs the original does not; simulate() it instead")
+        values = np.empty((self.n_nets, base_values.shape[1]), dtype=np.uint64)
+        values[:self.base.n_nets] = base_values
+        evaluate(values, self.own_groups)
+        return values
@@ -0,0 +1,199 @@
+"""
+Bit-parallel logic simulation with NumPy
+- Compiles a Netlist into flat index arrays (levelized, constants at 0 and 1)
+- Packs 64 patterns per uint64 word and evaluates each level/gate-type group
+  with one vectorized reduction
+"""
+
+import numpy as np
+
+AND, OR, XOR = 0, 1, 2
+GATE_OPS = {
+    "AND": (AND, False), "NAND": (AND, True),
+    "OR": (OR, False), "NOR": (OR, True),
+    "XOR": (XOR, False), "XNOR": (XOR, True),
+    "BUF": (AND, False), "NOT": (AND, True),
+}
+REDUCE = {AND: np.bitwise_and, OR: np.bitwise_or, XOR: np.bitwise_xor}
+ZERO, ONE = 0, 1
+# Identity element used to pad short fan-in rows in a group
+PAD = {AND: ONE, OR: ZERO, XOR: ZERO}
+ALL_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+class CompiledNetlist:
+    """
+    Index-based form of a Netlist. Net 0 is constant 0, net 1 is constant 1,
+    then the inputs in declaration order, then gates in topological order.
+    """
+
+    def __init__(self, netlist):
+        order = netlist.topological_order()
+        self.names = ["<zero>", "<one>"] + list(netlist.inputs) + order
+        self.index = {n: i for i, n in enumerate(self.names)}
+        self.input_names = list(netlist.inputs)
+        self.output_names = list(netlist.outputs)
+        self.inputs = np.arange(2, 2 + len(netlist.inputs), dtype=np.int64)
+        self.outputs = np.array([self.index[o] for o in netlist.outputs], dtype=np.int64)
+        self.first_gate = 2 + len(netlist.inputs)
+
+        n_gates = len(order)
+        self.op = np.empty(n_gates, dtype=np.int8)
+        self.invert = np.empty(n_gates, dtype=bool)
+        self.fanin_ptr = np.zeros(n_gates + 1, dtype=np.int64)
+        fanin_idx = []
+        self.level = np.zeros(len(self.names), dtype=np.int64)
+        for g, name in enumerate(order):
+            gate_type, fanins = netlist.gates[name]
+            if gate_type not in GATE_OPS:
+                raise ValueError(f"Unsupported gate type {gate_type} for {name}")
+            try:
+                idx = [self.index[f] for f in fanins]
+            except KeyError as e:
+                raise ValueError(f"Net {e.args[0]} used by {name} is never driven") from None
+            self.op[g], self.invert[g] = GATE_OPS[gate_type]
+            fanin_idx.extend(idx)
+            self.fanin_ptr[g + 1] = len(fanin_idx)
+            self.level[self.first_gate + g] = 1 + max(self.level[i] for i in idx)
+        self.fanin_idx = np.array(fanin_idx, dtype=np.int64)
+        self.groups = self._build_groups()
+
+    @property
+    def n_nets(self):
+        return len(self.names)
+
+    def fanins(self, net):
+        g = net - self.first_gate
+        return self.fanin_idx[self.fanin_ptr[g]:self.fanin_ptr[g + 1]]
+
+    def fanout_gates(self, nets):
+        """Gate indices (0-based, topological) in the transitive fan-out of `nets`."""
+        if not hasattr(self, "_fanout_ptr"):
+            owner = np.repeat(np.arange(len(self.op)), np.diff(self.fanin_ptr))
+            order = np.argsort(self.fanin_idx, kind="stable")
+            self._fanout_gate = owner[order]
+            self._fanout_ptr = np.searchsorted(self.fanin_idx[order], np.arange(self.n_nets + 1))
+        seen = np.zeros(len(self.op), dtype=bool)
+        stack = list(nets)
+        while stack:
+            net = stack.pop()
+            for g in self._fanout_gate[self._fanout_ptr[net]:self._fanout_ptr[net + 1]]:
+                if not seen[g]:
+                    seen[g] = True
+                    stack.append(self.first_gate + g)
+        return np.nonzero(seen)[0]
+
+    def groups_for(self, gates):
+        """Evaluation groups for a subset of gates, e.g. one key input's fan-out cone."""
+        return self._build_groups(gates)
+
+    def _build_groups(self, gates=None):
+        """Group gates by (level, op, invert) into padded fan-in matrices."""
+        if gates is None:
+            gates = np.arange(len(self.op))
+        buckets = {}
+        for g in gates:
+            key = (int(self.level[self.first_gate + g]), int(self.op[g]), bool(self.invert[g]))
+            buckets.setdefault(key, []).append(g)
+        groups = []
+        for (_, op, invert), members in sorted(buckets.items()):
+            width = max(self.fanin_ptr[g + 1] - self.fanin_ptr[g] for g in members)
+            fan = np.full((len(members), width), PAD[op], dtype=np.int64)
+            for row, g in enumerate(members):
+                f = self.fanin_idx[self.fanin_ptr[g]:self.fanin_ptr[g + 1]]
+                fan[row, :len(f)] = f
+            out = self.first_gate + np.array(members, dtype=np.int64)
+            groups.append((op, invert, out, fan))
+        return groups
+
+
+def compile_netlist(netlist):
+    return CompiledNetlist(netlist)
+
+
+def simulate(compiled, input_words, groups=None):
+    """
+    Evaluate every net for the packed patterns in `input_words`
+    (shape: n_inputs x n_words, uint64). Returns the n_nets x n_words value array.
+    """
+    input_words = np.asarray(input_words, dtype=np.uint64)
+    n_words = input_words.shape[1]
+    values = np.empty((compiled.n_nets, n_words), dtype=np.uint64)
+    values[ZERO] = 0
+    values[ONE] = ALL_ONES
+    values[compiled.inputs] = input_words
+    evaluate(values, compiled.groups if groups is None else groups)
+    return values
+
+
+def evaluate(values, groups):
+    """Re-evaluate `groups` in place, reading fan-ins from `values`."""
+    for op, invert, out, fan in groups:
+        res = REDUCE[op].reduce(values[fan], axis=1)
+        if invert:
+            np.invert(res, out=res)
+        values[out] = res
+
+
+def random_words(n_rows, n_words, rng):
+    return rng.integers(0, ALL_ONES, size=(n_rows, n_words), dtype=np.uint64, endpoint=True)
+
+
+def assign_inputs(compiled, named_words, n_words):
+    """Build the input word array from a name -> word-row mapping."""
+    words = np.empty((len(compiled.input_names), n_words), dtype=np.uint64)
+    for row, name in enumerate(compiled.input_names):
+        if name not in named_words:
+            raise KeyError(f"No value given for input {name}")
+        words[row] = named_words[name]
+    return words
+
+
+def constant_words(bit, n_words):
+    return np.full(n_words, ALL_ONES if bit else 0, dtype=np.uint64)
+
+
+def popcount(words):
+    words = np.asarray(words, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(words).sum())
+    return int(np.unpackbits(words.view(np.uint8)).sum())
+
+
+def row_popcount(words):
+    """Number of set bits in each row of a 2-D word array."""
+    words = np.asarray(words, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    return np.unpackbits(words.view(np.uint8), axis=1).sum(axis=1, dtype=np.int64)
+
+
+def signal_probabilities(compiled, n_words, rng):
+    """Probability of every net being 1 under uniformly random inputs (one simulation pass)."""
+    values = simulate(compiled, random_words(len(compiled.input_names), n_words, rng))
+    return row_popcount(values) / (n_words * 64)
+
+
+def mismatch_rate(compiled, reference, n_words, rng, fixed=None):
+    """
+    Fraction of random patterns on which any shared output of `compiled`
+    differs from `reference`. Inputs missing from `reference` (key inputs)
+    take their bit from `fixed`.
+    """
+    fixed = fixed or {}
+    shared = [n for n in reference.input_names]
+    rand = dict(zip(shared, random_words(len(shared), n_words, rng)))
+    named = {n: rand[n] if n in rand else constant_words(fixed.get(n, 0), n_words)
+             for n in compiled.input_names}
+    values = simulate(compiled, assign_inputs(compiled, named, n_words))
+    golden = simulate(reference, assign_inputs(reference, rand, n_words))
+    wrong = np.zeros(n_words, dtype=np.uint64)
+    for name, idx in zip(reference.output_names, reference.outputs):
+        if name in compiled.index:
+            wrong |= values[compiled.index[name]] ^ golden[idx]
+    return popcount(wrong) / (n_words * 64)
+
+
+def word_bit(words, pattern):
+    """Value of one packed pattern, for every row of `words`."""
+    return (words[..., pattern // 64] >> np.uint64(pattern % 64)) & np.uint64(1)
@@ -0,0 +1,67 @@
+"""
+Structured per-task telemetry for campaigns
+- One JSON object per line (JSONL), appended as each task finishes, so a
+  crashed or interrupted campaign still leaves every completed record
+- Stage timings are collected on the task as it moves through the pipeline
+"""
+
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def git_commit():
+    """Short commit of the working tree, with -dirty for uncommitted changes."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if dirty else "")
+
+
+class StageTimer:
+    """Tracks queue wait and run time of one task across pipeline stages."""
+
+    def __init__(self):
+        self.queued_at = time.time()
+        self.stages = {}
+
+    def start(self, stage):
+        now = time.time()
+        self.stages[stage] = {"queue_wait": round(now - self.queued_at, 3)}
+        self._started = now
+        return self.stages[stage]
+
+    def stop(self, stage):
+        now = time.time()
+        self.stages[stage]["wall_time"] = round(now - self._started, 3)
+        self.queued_at = now
+        return self.stages[stage]
+
+
+class EventLog:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(path, "a")
+
+    def write(self, event):
+        event = {"timestamp": round(time.time(), 3), **event}
+        self.file.write(json.dumps(event) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()